@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Sequence
+
+DEV_DIR = Path(__file__).resolve().parents[1]
+PYTHON_PACKAGE_DIR = DEV_DIR / "python"
+if str(PYTHON_PACKAGE_DIR) not in sys.path:
+    sys.path.insert(0, str(PYTHON_PACKAGE_DIR))
+
+from drugbank_parse import aparse_drugbank_xml, parse_drugbank_xml  # noqa: E402
+
+TICK_SECONDS = 0.005
+
+
+def run_benchmark(
+    input_path: str | Path,
+    metrics_path: str | Path,
+    modules: list[str] | None = None,
+    batch_drugs: int = 1,
+) -> dict[str, Any]:
+    # Compares a blocking parse with the async iterator: when the first rows
+    # arrive, the total time, and how late a 5 ms ticker on the event loop
+    # ran while the parser thread was busy.
+    xml_path = Path(input_path)
+    metrics_file = Path(metrics_path)
+    selected_modules = modules if modules is not None else ["core"]
+
+    start = time.perf_counter()
+    result = parse_drugbank_xml(xml_path, modules=selected_modules, layout="rows")
+    blocking_seconds = time.perf_counter() - start
+    streamed = asyncio.run(_stream(xml_path, selected_modules, batch_drugs))
+
+    metrics: dict[str, Any] = {
+        "implementation": "python",
+        "input_path": str(xml_path),
+        "modules": selected_modules,
+        "batch_drugs": batch_drugs,
+        "blocking_seconds": round(blocking_seconds, 6),
+        **streamed,
+        "rows_match": streamed["table_rows"] == {table: len(rows) for table, rows in result.tables.items()},
+    }
+    metrics_file.parent.mkdir(parents=True, exist_ok=True)
+    metrics_file.write_text(
+        json.dumps(metrics, indent=2, sort_keys=True) + "\n",
+        encoding="utf-8",
+    )
+    return metrics
+
+
+async def _stream(xml_path: Path, modules: list[str], batch_drugs: int) -> dict[str, Any]:
+    lags: list[float] = []
+    ticker = asyncio.create_task(_tick(lags))
+    table_rows: dict[str, int] = {}
+    batches = 0
+    first_batch = None
+    start = time.perf_counter()
+    iterator = aparse_drugbank_xml(xml_path, modules=modules, batch_drugs=batch_drugs)
+    try:
+        async for batch in iterator:
+            if first_batch is None:
+                first_batch = time.perf_counter() - start
+            batches += 1
+            for table, rows in batch.items():
+                table_rows[table] = table_rows.get(table, 0) + len(rows)
+    finally:
+        await iterator.aclose()
+    elapsed = time.perf_counter() - start
+    ticker.cancel()
+    return {
+        "async_seconds": round(elapsed, 6),
+        "first_batch_seconds": round(first_batch, 6) if first_batch is not None else None,
+        "batches": batches,
+        "max_loop_lag_ms": round(max(lags, default=0.0) * 1000, 3),
+        "table_rows": table_rows,
+    }
+
+
+async def _tick(lags: list[float]) -> None:
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(TICK_SECONDS)
+        lags.append(time.perf_counter() - start - TICK_SECONDS)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Measure the async batch iterator against a blocking parse.")
+    parser.add_argument("--input", required=True, help="Path to DrugBank XML.")
+    parser.add_argument("--metrics", required=True, help="Path to write metrics JSON.")
+    parser.add_argument(
+        "--module",
+        action="append",
+        dest="modules",
+        help="Module to enable. May be passed multiple times. Default: core.",
+    )
+    parser.add_argument("--batch-drugs", type=int, default=1, help="Drugs per batch. Default: 1.")
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    metrics = run_benchmark(
+        input_path=args.input,
+        metrics_path=args.metrics,
+        modules=args.modules,
+        batch_drugs=args.batch_drugs,
+    )
+    print(json.dumps(metrics, indent=2, sort_keys=True))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
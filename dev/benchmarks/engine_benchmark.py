@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Sequence
+
+DEV_DIR = Path(__file__).resolve().parents[1]
+PYTHON_PACKAGE_DIR = DEV_DIR / "python"
+if str(PYTHON_PACKAGE_DIR) not in sys.path:
+    sys.path.insert(0, str(PYTHON_PACKAGE_DIR))
+
+from scaling_benchmark import peak_rss_bytes  # noqa: E402
+
+from drugbank_parse.models import PARSE_ENGINES  # noqa: E402
+
+FIXTURE_XML = DEV_DIR.parent / "test-database.xml"
+EXPECTED_DIR = DEV_DIR / "fixtures" / "expected" / "core"
+
+
+def run_benchmark(
+    input_path: str | Path,
+    metrics_path: str | Path,
+    engines: list[str] | None = None,
+    modules: list[str] | None = None,
+    repeats: int = 3,
+    prune: bool = True,
+) -> dict[str, Any]:
+    # Checks every engine against the expected core CSVs of the fixture, then
+    # times each one on ``input_path`` in fresh processes so peak RSS belongs
+    # to that engine alone. Elapsed time is the median over ``repeats`` runs.
+    xml_path = Path(input_path).resolve()
+    metrics_file = Path(metrics_path)
+    selected_engines = engines if engines is not None else list(PARSE_ENGINES)
+    selected_modules = modules if modules is not None else ["core"]
+    input_mb = xml_path.stat().st_size / (1024 * 1024)
+
+    runs: dict[str, Any] = {}
+    for engine in selected_engines:
+        samples = [_measure_in_subprocess(xml_path, selected_modules, engine, prune) for _ in range(repeats)]
+        elapsed = statistics.median(sample["elapsed_seconds"] for sample in samples)
+        drugs = samples[0]["table_rows"].get("drugs")
+        runs[engine] = {
+            "mismatched_files": check_conformance(engine),
+            "elapsed_seconds": round(elapsed, 6),
+            "drugs_per_second": round(drugs / elapsed, 1) if drugs is not None and elapsed else None,
+            "mb_per_second": round(input_mb / elapsed, 3) if elapsed else None,
+            "peak_rss_mb": max(sample["peak_rss_mb"] or 0.0 for sample in samples) or None,
+            "table_rows": samples[0]["table_rows"],
+        }
+
+    baseline = runs[selected_engines[0]]
+    metrics: dict[str, Any] = {
+        "implementation": "python",
+        "input_path": str(xml_path),
+        "input_mb": round(input_mb, 3),
+        "modules": selected_modules,
+        "prune": prune,
+        "repeats": repeats,
+        "runs": runs,
+        "conformant": all(not run["mismatched_files"] for run in runs.values()),
+        "rows_match": all(run["table_rows"] == baseline["table_rows"] for run in runs.values()),
+    }
+    metrics_file.parent.mkdir(parents=True, exist_ok=True)
+    metrics_file.write_text(
+        json.dumps(metrics, indent=2, sort_keys=True) + "\n",
+        encoding="utf-8",
+    )
+    return metrics
+
+
+def check_conformance(engine: str) -> list[str]:
+    # Names of the expected core CSVs the engine's output differs from.
+    from drugbank_parse import parse_drugbank_xml, write_drugbank_tables
+
+    with tempfile.TemporaryDirectory() as outdir:
+        write_drugbank_tables(parse_drugbank_xml(FIXTURE_XML, engine=engine), outdir)
+        return sorted(
+            expected.name
+            for expected in EXPECTED_DIR.glob("*.csv")
+            if not (Path(outdir) / expected.name).exists()
+            or (Path(outdir) / expected.name).read_text(encoding="utf-8") != expected.read_text(encoding="utf-8")
+        )
+
+
+def measure_parse(input_path: str | Path, modules: list[str], engine: str, prune: bool) -> dict[str, Any]:
+    from drugbank_parse import parse_drugbank_xml
+
+    start = time.perf_counter()
+    result = parse_drugbank_xml(input_path, modules=modules, engine=engine, prune=prune)
+    elapsed = time.perf_counter() - start
+    peak = peak_rss_bytes()
+    return {
+        "elapsed_seconds": round(elapsed, 6),
+        "peak_rss_mb": round(peak / (1024 * 1024), 3) if peak is not None else None,
+        "table_rows": {table: len(rows) for table, rows in result.tables.items()},
+    }
+
+
+def _measure_in_subprocess(xml_path: Path, modules: list[str], engine: str, prune: bool) -> dict[str, Any]:
+    command = [sys.executable, str(Path(__file__).resolve()), "--measure", str(xml_path), "--engine", engine]
+    for module in modules:
+        command.extend(["--module", module])
+    if not prune:
+        command.append("--no-prune")
+    completed = subprocess.run(command, check=True, capture_output=True, text=True)
+    return json.loads(completed.stdout)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Check and time the lxml, expat and sax parse engines.")
+    parser.add_argument("--input", help="Path to DrugBank XML to time.")
+    parser.add_argument("--metrics", help="Path to write metrics JSON.")
+    parser.add_argument(
+        "--engine",
+        action="append",
+        dest="engines",
+        choices=PARSE_ENGINES,
+        help="Engine to run. May be passed multiple times. Default: all.",
+    )
+    parser.add_argument(
+        "--module",
+        action="append",
+        dest="modules",
+        help="Module to enable. May be passed multiple times. Default: core.",
+    )
+    parser.add_argument("--repeats", type=int, default=3, help="Fresh processes per engine. Default: 3.")
+    parser.add_argument("--no-prune", dest="prune", action="store_false", help="Time the engines without pruning.")
+    parser.add_argument("--measure", help=argparse.SUPPRESS)
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.measure:
+        engine = args.engines[0] if args.engines else "lxml"
+        print(json.dumps(measure_parse(args.measure, args.modules or ["core"], engine, args.prune)))
+        return 0
+    if not args.input or not args.metrics:
+        parser.error("--input and --metrics are required")
+
+    metrics = run_benchmark(
+        input_path=args.input,
+        metrics_path=args.metrics,
+        engines=args.engines,
+        modules=args.modules,
+        repeats=args.repeats,
+        prune=args.prune,
+    )
+    print(json.dumps(metrics, indent=2, sort_keys=True))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
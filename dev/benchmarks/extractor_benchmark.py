@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Sequence
+
+DEV_DIR = Path(__file__).resolve().parents[1]
+PYTHON_PACKAGE_DIR = DEV_DIR / "python"
+if str(PYTHON_PACKAGE_DIR) not in sys.path:
+    sys.path.insert(0, str(PYTHON_PACKAGE_DIR))
+
+from lxml import etree  # noqa: E402
+
+from drugbank_parse.extractors import DRUGBANK_NS, build_record_extractors  # noqa: E402
+from drugbank_parse.schema import load_schema  # noqa: E402
+
+NS = {"db": DRUGBANK_NS}
+
+
+def run_benchmark(
+    input_path: str | Path,
+    metrics_path: str | Path,
+    repeat: int = 20,
+) -> dict[str, Any]:
+    xml_path = Path(input_path)
+    metrics_file = Path(metrics_path)
+    extractors = build_record_extractors(load_schema())
+
+    drugs = 0
+    xpath_seconds = 0.0
+    compiled_seconds = 0.0
+    context = etree.iterparse(str(xml_path), events=("end",), tag=f"{{{DRUGBANK_NS}}}drug")
+    for _, drug_node in context:
+        if drug_node.getparent() is None or drug_node.getparent().tag != f"{{{DRUGBANK_NS}}}drugbank":
+            continue
+        xpath_rows = _xpath_extract(drug_node)
+        compiled_rows = _compiled_extract(drug_node, extractors)
+        if xpath_rows != compiled_rows:
+            raise AssertionError(f"Extractors disagree on drug #{drugs + 1}")
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            _xpath_extract(drug_node)
+        xpath_seconds += time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            _compiled_extract(drug_node, extractors)
+        compiled_seconds += time.perf_counter() - start
+
+        drugs += 1
+        while drug_node.getprevious() is not None:
+            del drug_node.getparent()[0]
+        drug_node.clear()
+
+    calls = max(1, drugs * repeat)
+    metrics: dict[str, Any] = {
+        "implementation": "python",
+        "input_path": str(xml_path),
+        "drugs": drugs,
+        "repeat": repeat,
+        "xpath_us_per_drug": round(xpath_seconds / calls * 1e6, 3),
+        "compiled_us_per_drug": round(compiled_seconds / calls * 1e6, 3),
+        "speedup": round(xpath_seconds / compiled_seconds, 3) if compiled_seconds else None,
+    }
+
+    metrics_file.parent.mkdir(parents=True, exist_ok=True)
+    metrics_file.write_text(
+        json.dumps(metrics, indent=2, sort_keys=True) + "\n",
+        encoding="utf-8",
+    )
+    return metrics
+
+
+def _compiled_extract(drug_node: Any, extractors: dict[str, Any]) -> tuple[dict[str, str], list[dict[str, str]]]:
+    drug, collected = extractors["drug"].extract(drug_node)
+    targets = [extractors["target"].extract(node)[0] for node in collected["target"]]
+    return drug, targets
+
+
+# The per-call XPath extraction the parser used before field paths were
+# compiled from fields.yml, kept here as the comparison baseline.
+def _xpath_extract(drug_node: Any) -> tuple[dict[str, str], list[dict[str, str]]]:
+    drug = {
+        "drug_id": _first_text(drug_node, "db:drugbank-id[@primary='true']"),
+        "drug_name": _first_text(drug_node, "db:name"),
+        "indication": _first_text(drug_node, "db:indication"),
+        "inchi": _calculated_property(drug_node, "InChI"),
+    }
+    targets = []
+    for target_node in drug_node.xpath("db:targets/db:target", namespaces=NS):
+        polypeptide = target_node.find("db:polypeptide", namespaces=NS)
+        targets.append(
+            {
+                "target_id": (polypeptide.get("id", "") or "") if polypeptide is not None else "",
+                "target_name": _first_text(target_node, "db:name"),
+                "gene_name": _first_text(target_node, "db:polypeptide/db:gene-name"),
+                "organism": _first_text(target_node, "db:organism"),
+            }
+        )
+    return drug, targets
+
+
+def _first_text(node: Any, xpath: str) -> str:
+    values = node.xpath(xpath, namespaces=NS)
+    if not values:
+        return ""
+    value = values[0]
+    if isinstance(value, etree._Element):
+        return " ".join(value.itertext()).strip()
+    return str(value).strip()
+
+
+def _calculated_property(drug_node: Any, kind: str) -> str:
+    for property_node in drug_node.xpath("db:calculated-properties/db:property", namespaces=NS):
+        if _first_text(property_node, "db:kind") == kind:
+            return _first_text(property_node, "db:value")
+    return ""
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Compare XPath and compiled per-drug field extraction.")
+    parser.add_argument("--input", required=True, help="Path to DrugBank XML.")
+    parser.add_argument("--metrics", required=True, help="Path to write metrics JSON.")
+    parser.add_argument("--repeat", type=int, default=20, help="Extractions per drug. Default: 20.")
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    metrics = run_benchmark(
+        input_path=args.input,
+        metrics_path=args.metrics,
+        repeat=args.repeat,
+    )
+    print(json.dumps(metrics, indent=2, sort_keys=True))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
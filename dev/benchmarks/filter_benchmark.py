@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Sequence
+
+DEV_DIR = Path(__file__).resolve().parents[1]
+PYTHON_PACKAGE_DIR = DEV_DIR / "python"
+if str(PYTHON_PACKAGE_DIR) not in sys.path:
+    sys.path.insert(0, str(PYTHON_PACKAGE_DIR))
+
+from lxml import etree  # noqa: E402
+
+from drugbank_parse import parse_drugbank_xml  # noqa: E402
+from drugbank_parse.extractors import DRUGBANK_NS  # noqa: E402
+
+
+def run_benchmark(
+    input_path: str | Path,
+    metrics_path: str | Path,
+    filters: dict[str, dict[str, Any]],
+    modules: list[str] | None = None,
+) -> dict[str, Any]:
+    # Compares filtered parses with an unfiltered one and with the raw cost of
+    # tokenizing every <drug> and clearing it, the floor a filter can reach.
+    xml_path = Path(input_path)
+    metrics_file = Path(metrics_path)
+    selected_modules = modules if modules is not None else ["core"]
+
+    tokenize_seconds = _tokenize_only(xml_path)
+    runs: dict[str, Any] = {}
+    for name, where in {"unfiltered": {}, **filters}.items():
+        start = time.perf_counter()
+        result = parse_drugbank_xml(xml_path, modules=selected_modules, where=where)
+        elapsed = time.perf_counter() - start
+        runs[name] = {
+            "where": where,
+            "elapsed_seconds": round(elapsed, 6),
+            "to_tokenize_only": round(elapsed / tokenize_seconds, 3) if tokenize_seconds else None,
+            "drugs": len(result.rows("drugs")) if "drugs" in result.tables else None,
+        }
+
+    metrics: dict[str, Any] = {
+        "implementation": "python",
+        "input_path": str(xml_path),
+        "modules": selected_modules,
+        "tokenize_only_seconds": round(tokenize_seconds, 6),
+        "runs": runs,
+    }
+    metrics_file.parent.mkdir(parents=True, exist_ok=True)
+    metrics_file.write_text(
+        json.dumps(metrics, indent=2, sort_keys=True) + "\n",
+        encoding="utf-8",
+    )
+    return metrics
+
+
+def _tokenize_only(xml_path: Path) -> float:
+    start = time.perf_counter()
+    for _, node in etree.iterparse(str(xml_path), events=("end",), tag=f"{{{DRUGBANK_NS}}}drug"):
+        while node.getprevious() is not None:
+            del node.getparent()[0]
+        node.clear()
+    return time.perf_counter() - start
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Measure drug filter pushdown against unfiltered parsing.")
+    parser.add_argument("--input", required=True, help="Path to DrugBank XML.")
+    parser.add_argument("--metrics", required=True, help="Path to write metrics JSON.")
+    parser.add_argument(
+        "--drug-id",
+        action="append",
+        dest="drug_ids",
+        help="DrugBank id for the id-list filter. May be passed multiple times. Default: DB00001.",
+    )
+    parser.add_argument(
+        "--module",
+        action="append",
+        dest="modules",
+        help="Module to enable. May be passed multiple times. Default: core.",
+    )
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    metrics = run_benchmark(
+        input_path=args.input,
+        metrics_path=args.metrics,
+        filters={
+            "ids": {"ids": args.drug_ids or ["DB00001"]},
+            "approved_small_molecule": {"groups": "approved", "types": "small molecule"},
+            "human_targets": {"target_organisms": "Humans"},
+        },
+        modules=args.modules,
+    )
+    print(json.dumps(metrics, indent=2, sort_keys=True))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
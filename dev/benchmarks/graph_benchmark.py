@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Sequence
+
+DEV_DIR = Path(__file__).resolve().parents[1]
+PYTHON_PACKAGE_DIR = DEV_DIR / "python"
+if str(PYTHON_PACKAGE_DIR) not in sys.path:
+    sys.path.insert(0, str(PYTHON_PACKAGE_DIR))
+
+from drugbank_parse import DrugTargetGraph, build_drug_target_graph, parse_drugbank_xml  # noqa: E402
+
+
+def run_benchmark(
+    input_path: str | Path,
+    metrics_path: str | Path,
+    queries: int = 200,
+    hops: int = 2,
+    seed: int = 7,
+) -> dict[str, Any]:
+    # Builds drug-target-interaction adjacency two ways, as Python dicts of
+    # sets from the row dicts and as the CSR graph, then runs the same
+    # ``hops``-hop queries from ``queries`` random drugs on both, plus the
+    # target degree of every drug. Also times saving the graph and loading it
+    # back memory-mapped.
+    xml_path = Path(input_path)
+    metrics_file = Path(metrics_path)
+    result = parse_drugbank_xml(xml_path, modules=["core", "interactions"])
+
+    start = time.perf_counter()
+    adjacency = _python_adjacency(result)
+    python_build = time.perf_counter() - start
+    start = time.perf_counter()
+    graph = build_drug_target_graph(result, interactions=True)
+    csr_build = time.perf_counter() - start
+
+    sample = random.Random(seed).choices(graph.drug_ids.tolist(), k=queries)
+    start = time.perf_counter()
+    python_hops = [_python_k_hop(adjacency, drug_id, hops) for drug_id in sample]
+    python_query = time.perf_counter() - start
+    start = time.perf_counter()
+    csr_hops = [graph.k_hop(drugs=graph.drug_index(drug_id), k=hops, interactions=True) for drug_id in sample]
+    csr_query = time.perf_counter() - start
+    results_match = all(
+        (set(graph.drug_ids[drugs].tolist()), set(graph.target_ids[targets].tolist())) == expected
+        for (drugs, targets), expected in zip(csr_hops, python_hops)
+    )
+
+    start = time.perf_counter()
+    python_degrees = [len(adjacency["drug_targets"].get(drug_id, ())) for drug_id in graph.drug_ids.tolist()]
+    python_degree = time.perf_counter() - start
+    start = time.perf_counter()
+    csr_degrees = graph.drug_degree()
+    csr_degree = time.perf_counter() - start
+    results_match = results_match and csr_degrees.tolist() == python_degrees
+
+    with tempfile.TemporaryDirectory() as workdir:
+        start = time.perf_counter()
+        graph.save(Path(workdir) / "graph")
+        save_seconds = time.perf_counter() - start
+        saved_bytes = sum(path.stat().st_size for path in (Path(workdir) / "graph").iterdir())
+        start = time.perf_counter()
+        loaded = DrugTargetGraph.load(Path(workdir) / "graph")
+        loaded.k_hop(drugs=0, k=hops, interactions=True)
+        load_seconds = time.perf_counter() - start
+        del loaded
+
+    metrics: dict[str, Any] = {
+        "implementation": "python",
+        "input_path": str(xml_path),
+        "drugs": graph.drug_count,
+        "targets": graph.target_count,
+        "drug_target_edges": graph.edge_count,
+        "interaction_edges": len(graph.interaction_indices),
+        "queries": queries,
+        "hops": hops,
+        "python_build_seconds": round(python_build, 6),
+        "csr_build_seconds": round(csr_build, 6),
+        "python_query_ms": round(python_query / queries * 1000, 4),
+        "csr_query_ms": round(csr_query / queries * 1000, 4),
+        "python_degree_ms": round(python_degree * 1000, 4),
+        "csr_degree_ms": round(csr_degree * 1000, 4),
+        "results_match": results_match,
+        "save_seconds": round(save_seconds, 6),
+        "mmap_load_seconds": round(load_seconds, 6),
+        "saved_mb": round(saved_bytes / (1024 * 1024), 3),
+    }
+    metrics_file.parent.mkdir(parents=True, exist_ok=True)
+    metrics_file.write_text(
+        json.dumps(metrics, indent=2, sort_keys=True) + "\n",
+        encoding="utf-8",
+    )
+    return metrics
+
+
+def _python_adjacency(result) -> dict[str, dict[str, set[str]]]:
+    adjacency: dict[str, dict[str, set[str]]] = {"drug_targets": {}, "target_drugs": {}, "interactions": {}}
+    for row in result.rows("drug_target"):
+        adjacency["drug_targets"].setdefault(row["drug_id"], set()).add(row["target_id"])
+        adjacency["target_drugs"].setdefault(row["target_id"], set()).add(row["drug_id"])
+    for row in result.rows("drug_interactions"):
+        adjacency["interactions"].setdefault(row["drug_id"], set()).add(row["interacting_drug_id"])
+    return adjacency
+
+
+def _python_k_hop(adjacency: dict[str, dict[str, set[str]]], drug_id: str, hops: int) -> tuple[set[str], set[str]]:
+    drugs, targets = {drug_id}, set()
+    drug_frontier, target_frontier = {drug_id}, set()
+    for _ in range(hops):
+        next_targets = set().union(*(adjacency["drug_targets"].get(drug, ()) for drug in drug_frontier))
+        next_drugs = set().union(*(adjacency["target_drugs"].get(target, ()) for target in target_frontier))
+        next_drugs |= set().union(*(adjacency["interactions"].get(drug, ()) for drug in drug_frontier))
+        drug_frontier, target_frontier = next_drugs - drugs, next_targets - targets
+        drugs |= drug_frontier
+        targets |= target_frontier
+    return drugs, targets
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Compare CSR graph queries with Python adjacency dicts.")
+    parser.add_argument("--input", required=True, help="Path to DrugBank XML.")
+    parser.add_argument("--metrics", required=True, help="Path to write metrics JSON.")
+    parser.add_argument("--queries", type=int, default=200, help="Random start drugs. Default: 200.")
+    parser.add_argument("--hops", type=int, default=2, help="Edges per query. Default: 2.")
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    metrics = run_benchmark(
+        input_path=args.input,
+        metrics_path=args.metrics,
+        queries=args.queries,
+        hops=args.hops,
+    )
+    print(json.dumps(metrics, indent=2, sort_keys=True))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
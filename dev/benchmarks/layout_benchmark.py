@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Sequence
+
+DEV_DIR = Path(__file__).resolve().parents[1]
+PYTHON_PACKAGE_DIR = DEV_DIR / "python"
+if str(PYTHON_PACKAGE_DIR) not in sys.path:
+    sys.path.insert(0, str(PYTHON_PACKAGE_DIR))
+
+from drugbank_parse import parse_drugbank_xml, write_drugbank_tables  # noqa: E402
+from drugbank_parse.models import PARSE_LAYOUTS  # noqa: E402
+
+
+def run_benchmark(
+    input_path: str | Path,
+    metrics_path: str | Path,
+    profile: str = "core",
+    modules: list[str] | None = None,
+) -> dict[str, Any]:
+    xml_path = Path(input_path)
+    metrics_file = Path(metrics_path)
+
+    layouts: dict[str, Any] = {}
+    for layout in PARSE_LAYOUTS:
+        gc.collect()
+        tracemalloc.start()
+        start = time.perf_counter()
+        result = parse_drugbank_xml(xml_path, profile=profile, modules=modules, layout=layout)
+        parse_seconds = time.perf_counter() - start
+        result_bytes, peak_bytes = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        output_dir = Path(tempfile.mkdtemp(prefix=f"drugbank-{layout}-"))
+        try:
+            start = time.perf_counter()
+            write_drugbank_tables(result, output_dir)
+            write_seconds = time.perf_counter() - start
+        finally:
+            shutil.rmtree(output_dir, ignore_errors=True)
+
+        layouts[layout] = {
+            "parse_seconds": round(parse_seconds, 6),
+            "write_seconds": round(write_seconds, 6),
+            "result_memory_mb": round(result_bytes / (1024 * 1024), 3),
+            "peak_memory_mb": round(peak_bytes / (1024 * 1024), 3),
+            "table_rows": {table: len(rows) for table, rows in result.tables.items()},
+        }
+        del result
+
+    columnar = layouts["columnar"]
+    rows = layouts["rows"]
+    metrics: dict[str, Any] = {
+        "implementation": "python",
+        "input_path": str(xml_path),
+        "profile": profile,
+        "layouts": layouts,
+        "memory_ratio": round(columnar["result_memory_mb"] / rows["result_memory_mb"], 3)
+        if rows["result_memory_mb"]
+        else None,
+        "write_speedup": round(rows["write_seconds"] / columnar["write_seconds"], 3)
+        if columnar["write_seconds"]
+        else None,
+    }
+
+    metrics_file.parent.mkdir(parents=True, exist_ok=True)
+    metrics_file.write_text(
+        json.dumps(metrics, indent=2, sort_keys=True) + "\n",
+        encoding="utf-8",
+    )
+    return metrics
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Compare columnar and row-dict ParseResult layouts.")
+    parser.add_argument("--input", required=True, help="Path to DrugBank XML.")
+    parser.add_argument("--metrics", required=True, help="Path to write metrics JSON.")
+    parser.add_argument("--profile", default="core", help="Parse profile. Default: core.")
+    parser.add_argument(
+        "--module",
+        action="append",
+        dest="modules",
+        help="Module to enable. May be passed multiple times.",
+    )
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    metrics = run_benchmark(
+        input_path=args.input,
+        metrics_path=args.metrics,
+        profile=args.profile,
+        modules=args.modules,
+    )
+    print(json.dumps(metrics, indent=2, sort_keys=True))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
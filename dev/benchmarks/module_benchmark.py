@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Sequence
+
+DEV_DIR = Path(__file__).resolve().parents[1]
+PYTHON_PACKAGE_DIR = DEV_DIR / "python"
+if str(PYTHON_PACKAGE_DIR) not in sys.path:
+    sys.path.insert(0, str(PYTHON_PACKAGE_DIR))
+
+from drugbank_parse import ParseStats, parse_drugbank_xml  # noqa: E402
+from drugbank_parse.profiles import load_profiles  # noqa: E402
+
+SHARED_STAGES = ("tokenize", "extract.drug", "cleanup")
+
+
+def run_benchmark(
+    input_path: str | Path,
+    metrics_path: str | Path,
+    modules: list[str] | None = None,
+) -> dict[str, Any]:
+    # Parses once per module and once with all of them. Tokenizing, the drug
+    # record pass and cleanup are shared, so the combined run should cost the
+    # shared stages once plus each module's own stage.
+    xml_path = Path(input_path)
+    metrics_file = Path(metrics_path)
+    selected = modules if modules is not None else list(load_profiles()["modules"])
+
+    runs = {name: _measure(xml_path, [name]) for name in selected}
+    combined = _measure(xml_path, selected)
+    separate_seconds = sum(run["elapsed_seconds"] for run in runs.values())
+    metrics: dict[str, Any] = {
+        "implementation": "python",
+        "input_path": str(xml_path),
+        "modules": selected,
+        "runs": runs,
+        "combined": combined,
+        "separate_seconds": round(separate_seconds, 6),
+        "combined_to_separate": round(combined["elapsed_seconds"] / separate_seconds, 3)
+        if separate_seconds
+        else None,
+    }
+
+    metrics_file.parent.mkdir(parents=True, exist_ok=True)
+    metrics_file.write_text(
+        json.dumps(metrics, indent=2, sort_keys=True) + "\n",
+        encoding="utf-8",
+    )
+    return metrics
+
+
+def _measure(xml_path: Path, modules: list[str]) -> dict[str, Any]:
+    stats = ParseStats()
+    start = time.perf_counter()
+    result = parse_drugbank_xml(xml_path, modules=modules, stats=stats)
+    elapsed = time.perf_counter() - start
+    timers = stats.as_dict()["timers"]
+    return {
+        "elapsed_seconds": round(elapsed, 6),
+        "shared_seconds": round(sum(timers.get(stage, 0.0) for stage in SHARED_STAGES), 6),
+        "module_seconds": {
+            stage.split(".", 1)[1]: seconds for stage, seconds in timers.items() if stage.startswith("module.")
+        },
+        "table_rows": {table: len(rows) for table, rows in result.tables.items()},
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Compare one-module parses with a single multi-module parse.")
+    parser.add_argument("--input", required=True, help="Path to DrugBank XML.")
+    parser.add_argument("--metrics", required=True, help="Path to write metrics JSON.")
+    parser.add_argument(
+        "--module",
+        action="append",
+        dest="modules",
+        help="Module to compare. May be passed multiple times. Default: every module in profiles.yml.",
+    )
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    metrics = run_benchmark(
+        input_path=args.input,
+        metrics_path=args.metrics,
+        modules=args.modules,
+    )
+    print(json.dumps(metrics, indent=2, sort_keys=True))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
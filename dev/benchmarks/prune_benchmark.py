@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Sequence
+
+DEV_DIR = Path(__file__).resolve().parents[1]
+PYTHON_PACKAGE_DIR = DEV_DIR / "python"
+if str(PYTHON_PACKAGE_DIR) not in sys.path:
+    sys.path.insert(0, str(PYTHON_PACKAGE_DIR))
+
+from scaling_benchmark import peak_rss_bytes  # noqa: E402
+
+
+def run_benchmark(
+    input_path: str | Path,
+    metrics_path: str | Path,
+    modules: list[str] | None = None,
+    repeats: int = 3,
+) -> dict[str, Any]:
+    # Parses with every element built and with unused subtrees pruned, each in
+    # fresh processes so peak RSS belongs to that mode alone. Elapsed time is
+    # the median over ``repeats`` runs.
+    xml_path = Path(input_path).resolve()
+    metrics_file = Path(metrics_path)
+    selected_modules = modules if modules is not None else ["core"]
+    input_mb = xml_path.stat().st_size / (1024 * 1024)
+
+    runs: dict[str, Any] = {}
+    for name, prune in (("full", False), ("pruned", True)):
+        samples = [_measure_in_subprocess(xml_path, selected_modules, prune) for _ in range(repeats)]
+        elapsed = statistics.median(sample["elapsed_seconds"] for sample in samples)
+        runs[name] = {
+            "elapsed_seconds": round(elapsed, 6),
+            "mb_per_second": round(input_mb / elapsed, 3) if elapsed else None,
+            "peak_rss_mb": max(sample["peak_rss_mb"] or 0.0 for sample in samples) or None,
+            "table_rows": samples[0]["table_rows"],
+        }
+
+    full, pruned = runs["full"], runs["pruned"]
+    metrics: dict[str, Any] = {
+        "implementation": "python",
+        "input_path": str(xml_path),
+        "input_mb": round(input_mb, 3),
+        "modules": selected_modules,
+        "repeats": repeats,
+        "runs": runs,
+        "speedup": round(full["elapsed_seconds"] / pruned["elapsed_seconds"], 3)
+        if pruned["elapsed_seconds"]
+        else None,
+        "rows_match": full["table_rows"] == pruned["table_rows"],
+    }
+    metrics_file.parent.mkdir(parents=True, exist_ok=True)
+    metrics_file.write_text(
+        json.dumps(metrics, indent=2, sort_keys=True) + "\n",
+        encoding="utf-8",
+    )
+    return metrics
+
+
+def measure_parse(input_path: str | Path, modules: list[str], prune: bool) -> dict[str, Any]:
+    from drugbank_parse import parse_drugbank_xml
+
+    start = time.perf_counter()
+    result = parse_drugbank_xml(input_path, modules=modules, prune=prune)
+    elapsed = time.perf_counter() - start
+    peak = peak_rss_bytes()
+    return {
+        "elapsed_seconds": round(elapsed, 6),
+        "peak_rss_mb": round(peak / (1024 * 1024), 3) if peak is not None else None,
+        "table_rows": {table: len(rows) for table, rows in result.tables.items()},
+    }
+
+
+def _measure_in_subprocess(xml_path: Path, modules: list[str], prune: bool) -> dict[str, Any]:
+    command = [sys.executable, str(Path(__file__).resolve()), "--measure", str(xml_path)]
+    for module in modules:
+        command.extend(["--module", module])
+    if not prune:
+        command.append("--no-prune")
+    completed = subprocess.run(command, check=True, capture_output=True, text=True)
+    return json.loads(completed.stdout)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Compare parsing with and without subtree pruning.")
+    parser.add_argument("--input", help="Path to DrugBank XML.")
+    parser.add_argument("--metrics", help="Path to write metrics JSON.")
+    parser.add_argument(
+        "--module",
+        action="append",
+        dest="modules",
+        help="Module to enable. May be passed multiple times. Default: core.",
+    )
+    parser.add_argument("--repeats", type=int, default=3, help="Fresh processes per mode. Default: 3.")
+    parser.add_argument("--measure", help=argparse.SUPPRESS)
+    parser.add_argument("--no-prune", dest="prune", action="store_false", help=argparse.SUPPRESS)
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.measure:
+        print(json.dumps(measure_parse(args.measure, args.modules or ["core"], args.prune)))
+        return 0
+    if not args.input or not args.metrics:
+        parser.error("--input and --metrics are required")
+
+    metrics = run_benchmark(
+        input_path=args.input,
+        metrics_path=args.metrics,
+        modules=args.modules,
+        repeats=args.repeats,
+    )
+    print(json.dumps(metrics, indent=2, sort_keys=True))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -13,7 +13,7 @@ PYTHON_PACKAGE_DIR = DEV_DIR / "python"
 if str(PYTHON_PACKAGE_DIR) not in sys.path:
     sys.path.insert(0, str(PYTHON_PACKAGE_DIR))
 
-from drugbank_parse import parse_drugbank_xml, write_drugbank_tables  # noqa: E402
+from drugbank_parse import ParseStats, parse_drugbank_xml, write_drugbank_tables  # noqa: E402
 
 
 def run_benchmark(
@@ -26,12 +26,13 @@ def run_benchmark(
     output_dir = Path(outdir)
     metrics_file = Path(metrics_path)
 
+    stats = ParseStats()
     tracemalloc.start()
     start = time.perf_counter()
-    result = parse_drugbank_xml(xml_path, profile=profile)
-    written = write_drugbank_tables(result, output_dir)
+    result = parse_drugbank_xml(xml_path, profile=profile, stats=stats)
+    written = write_drugbank_tables(result, output_dir, stats=stats)
     elapsed = time.perf_counter() - start
-    _, peak_bytes = tracemalloc.get_traced_memory()
+    current_bytes, peak_bytes = tracemalloc.get_traced_memory()
     tracemalloc.stop()
 
     metrics: dict[str, Any] = {
@@ -41,8 +42,11 @@ def run_benchmark(
         "output_dir": str(output_dir),
         "elapsed_seconds": round(elapsed, 6),
         "peak_memory_mb": round(peak_bytes / (1024 * 1024), 3),
+        "result_memory_mb": round(current_bytes / (1024 * 1024), 3),
+        "memory_usage": result.memory_usage(),
         "table_rows": {table: len(rows) for table, rows in result.tables.items()},
         "written_files": [path.name for path in written],
+        "stats": stats.as_dict(),
     }
 
     metrics_file.parent.mkdir(parents=True, exist_ok=True)
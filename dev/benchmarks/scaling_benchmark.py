@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import argparse
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Sequence
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+DEV_DIR = BENCHMARKS_DIR.parent
+PYTHON_PACKAGE_DIR = DEV_DIR / "python"
+for path in (PYTHON_PACKAGE_DIR, BENCHMARKS_DIR):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from synthetic_drugbank import write_synthetic_drugbank  # noqa: E402
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000, 500_000)
+
+
+def run_benchmark(
+    metrics_path: str | Path,
+    sizes: Sequence[int] = DEFAULT_SIZES,
+    modules: list[str] | None = None,
+    workers: int = 1,
+    workdir: str | Path | None = None,
+    generator_options: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    # Each size is generated, then parsed and written to CSV in a fresh Python
+    # process so its peak RSS is not inflated by earlier, smaller runs.
+    metrics_file = Path(metrics_path)
+    selected_modules = modules if modules is not None else ["core", "interactions"]
+    root = Path(workdir) if workdir is not None else Path(tempfile.mkdtemp(prefix="drugbank-scaling-"))
+    root.mkdir(parents=True, exist_ok=True)
+
+    runs = []
+    try:
+        for size in sizes:
+            xml_path = root / f"synthetic_{size}.xml"
+            start = time.perf_counter()
+            generated = write_synthetic_drugbank(xml_path, size, **(generator_options or {}))
+            generate_seconds = time.perf_counter() - start
+
+            measured = _measure_in_subprocess(xml_path, root / f"output_{size}", selected_modules, workers)
+            input_mb = generated["bytes"] / (1024 * 1024)
+            elapsed = measured["elapsed_seconds"]
+            expected = {table: generated["table_rows"][table] for table in measured["table_rows"]}
+            runs.append(
+                {
+                    "drugs": size,
+                    "input_mb": round(input_mb, 3),
+                    "generate_seconds": round(generate_seconds, 6),
+                    "elapsed_seconds": elapsed,
+                    "drugs_per_second": round(size / elapsed, 3) if elapsed else None,
+                    "mb_per_second": round(input_mb / elapsed, 3) if elapsed else None,
+                    "peak_rss_mb": measured["peak_rss_mb"],
+                    "table_rows": measured["table_rows"],
+                    "rows_match_generator": measured["table_rows"] == expected,
+                }
+            )
+            xml_path.unlink()
+            shutil.rmtree(root / f"output_{size}", ignore_errors=True)
+    finally:
+        if workdir is None:
+            shutil.rmtree(root, ignore_errors=True)
+
+    metrics: dict[str, Any] = {
+        "implementation": "python",
+        "modules": selected_modules,
+        "workers": workers,
+        "generator": generator_options or {},
+        "runs": runs,
+    }
+    metrics_file.parent.mkdir(parents=True, exist_ok=True)
+    metrics_file.write_text(
+        json.dumps(metrics, indent=2, sort_keys=True) + "\n",
+        encoding="utf-8",
+    )
+    return metrics
+
+
+def measure_parse(
+    input_path: str | Path,
+    outdir: str | Path,
+    modules: list[str],
+    workers: int = 1,
+) -> dict[str, Any]:
+    from drugbank_parse import parse_drugbank_xml, write_drugbank_tables
+
+    start = time.perf_counter()
+    result = parse_drugbank_xml(input_path, modules=modules, workers=workers)
+    write_drugbank_tables(result, outdir)
+    elapsed = time.perf_counter() - start
+    peak = peak_rss_bytes()
+    return {
+        "elapsed_seconds": round(elapsed, 6),
+        "peak_rss_mb": round(peak / (1024 * 1024), 3) if peak is not None else None,
+        "table_rows": {table: len(rows) for table, rows in result.tables.items()},
+    }
+
+
+def peak_rss_bytes() -> int | None:
+    try:
+        import resource
+    except ImportError:
+        return _windows_peak_working_set()
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _measure_in_subprocess(xml_path: Path, outdir: Path, modules: list[str], workers: int) -> dict[str, Any]:
+    command = [
+        sys.executable,
+        str(Path(__file__).resolve()),
+        "--measure",
+        str(xml_path),
+        "--outdir",
+        str(outdir),
+        "--workers",
+        str(workers),
+    ]
+    for module in modules:
+        command.extend(["--module", module])
+    completed = subprocess.run(command, check=True, capture_output=True, text=True)
+    return json.loads(completed.stdout)
+
+
+def _windows_peak_working_set() -> int | None:
+    import ctypes
+    from ctypes import wintypes
+
+    class ProcessMemoryCounters(ctypes.Structure):
+        _fields_ = [
+            ("cb", wintypes.DWORD),
+            ("PageFaultCount", wintypes.DWORD),
+            ("PeakWorkingSetSize", ctypes.c_size_t),
+            ("WorkingSetSize", ctypes.c_size_t),
+            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+            ("PagefileUsage", ctypes.c_size_t),
+            ("PeakPagefileUsage", ctypes.c_size_t),
+        ]
+
+    counters = ProcessMemoryCounters()
+    counters.cb = ctypes.sizeof(counters)
+    process = ctypes.windll.kernel32.GetCurrentProcess()
+    if not ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+        return None
+    return int(counters.PeakWorkingSetSize)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Sweep synthetic DrugBank release sizes and record parser scaling.")
+    parser.add_argument("--metrics", help="Path to write metrics JSON.")
+    parser.add_argument(
+        "--sizes",
+        default=",".join(str(size) for size in DEFAULT_SIZES),
+        help="Comma-separated drug counts. Default: 1000,10000,100000,500000.",
+    )
+    parser.add_argument(
+        "--module",
+        action="append",
+        dest="modules",
+        help="Module to enable. May be passed multiple times. Default: core and interactions.",
+    )
+    parser.add_argument("--workers", type=int, default=1, help="Parser worker processes. Default: 1.")
+    parser.add_argument("--workdir", help="Directory for generated XML and output. Default: a temporary directory.")
+    parser.add_argument("--targets-per-drug", type=int, default=3, help="Targets per drug. Default: 3.")
+    parser.add_argument("--interactions-per-drug", type=int, default=20, help="Interactions per drug. Default: 20.")
+    parser.add_argument("--text-length", type=int, default=400, help="Characters per free-text field. Default: 400.")
+    parser.add_argument("--measure", help=argparse.SUPPRESS)
+    parser.add_argument("--outdir", help=argparse.SUPPRESS)
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.measure:
+        measured = measure_parse(args.measure, args.outdir, args.modules or ["core"], workers=args.workers)
+        print(json.dumps(measured))
+        return 0
+    if not args.metrics:
+        parser.error("--metrics is required")
+
+    metrics = run_benchmark(
+        metrics_path=args.metrics,
+        sizes=[int(size) for size in args.sizes.split(",") if size],
+        modules=args.modules,
+        workers=args.workers,
+        workdir=args.workdir,
+        generator_options={
+            "targets_per_drug": args.targets_per_drug,
+            "interactions_per_drug": args.interactions_per_drug,
+            "text_length": args.text_length,
+        },
+    )
+    print(json.dumps(metrics, indent=2, sort_keys=True))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
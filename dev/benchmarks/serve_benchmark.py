@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import argparse
+import http.client
+import json
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Sequence
+
+DEV_DIR = Path(__file__).resolve().parents[1]
+PYTHON_PACKAGE_DIR = DEV_DIR / "python"
+if str(PYTHON_PACKAGE_DIR) not in sys.path:
+    sys.path.insert(0, str(PYTHON_PACKAGE_DIR))
+
+from drugbank_parse import LookupIndex, parse_drugbank_xml  # noqa: E402
+
+
+def run_benchmark(
+    input_path: str | Path,
+    metrics_path: str | Path,
+    requests: int = 5000,
+    clients: int = 4,
+    batch_size: int = 100,
+) -> dict[str, Any]:
+    # Times lookups three ways: in-process calls on a LookupIndex, single
+    # GETs from ``clients`` keep-alive connections, and POST /query batches of
+    # up to ``batch_size`` distinct drug ids. The server runs through the CLI
+    # in its own process, so the clients do not share its interpreter.
+    xml_path = Path(input_path).resolve()
+    metrics_file = Path(metrics_path)
+    index = LookupIndex.from_result(parse_drugbank_xml(xml_path, profile="core"))
+    drug_ids = list(index.drugs)
+    target_ids = list(index.targets)
+
+    start = time.perf_counter()
+    rounds = max(1, requests // len(drug_ids))
+    for _ in range(rounds):
+        for drug_id in drug_ids:
+            index.drug(drug_id)
+    in_process_us = (time.perf_counter() - start) / (rounds * len(drug_ids)) * 1e6
+
+    paths = [f"/drugs/{drug_id}" for drug_id in drug_ids] + [f"/targets/{target_id}" for target_id in target_ids]
+    batch_ids = drug_ids[:batch_size]
+    batch = json.dumps({"drugs": batch_ids})
+    server = subprocess.Popen(
+        [sys.executable, "-m", "drugbank_parse.cli", "serve", "--input", str(xml_path), "--port", "0"],
+        stderr=subprocess.PIPE,
+        text=True,
+        cwd=PYTHON_PACKAGE_DIR,
+    )
+    try:
+        port = int(server.stderr.readline().rsplit(":", 1)[1])
+        single = _load(port, clients, requests, lambda number: ("GET", paths[number % len(paths)], None))
+        batched = _load(port, clients, max(1, requests // batch_size), lambda number: ("POST", "/query", batch))
+        connection = http.client.HTTPConnection("127.0.0.1", port)
+        connection.request("GET", "/metrics")
+        server_metrics = json.loads(connection.getresponse().read())
+        connection.close()
+    finally:
+        server.terminate()
+        server.wait()
+
+    metrics: dict[str, Any] = {
+        "implementation": "python",
+        "input_path": str(xml_path),
+        "index": index.summary(),
+        "clients": clients,
+        "in_process_lookup_us": round(in_process_us, 3),
+        "single": single,
+        "batched": {
+            **batched,
+            "batch_size": len(batch_ids),
+            "keys_per_second": round(batched["qps"] * len(batch_ids), 1),
+        },
+        "server_endpoints": server_metrics["endpoints"],
+    }
+    metrics_file.parent.mkdir(parents=True, exist_ok=True)
+    metrics_file.write_text(
+        json.dumps(metrics, indent=2, sort_keys=True) + "\n",
+        encoding="utf-8",
+    )
+    return metrics
+
+
+def _load(port: int, clients: int, requests: int, make_request) -> dict[str, Any]:
+    # Splits ``requests`` over ``clients`` threads, each on one keep-alive
+    # connection, and reports client-side latency and overall throughput.
+    latencies: list[float] = []
+    lock = threading.Lock()
+
+    def client(numbers: range) -> None:
+        connection = http.client.HTTPConnection("127.0.0.1", port)
+        timings = []
+        for number in numbers:
+            method, path, body = make_request(number)
+            start = time.perf_counter()
+            connection.request(method, path, body=body)
+            response = connection.getresponse()
+            response.read()
+            timings.append(time.perf_counter() - start)
+            if response.status != 200:
+                raise RuntimeError(f"{method} {path} returned {response.status}")
+        connection.close()
+        with lock:
+            latencies.extend(timings)
+
+    threads = [threading.Thread(target=client, args=(range(number, requests, clients),)) for number in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "elapsed_seconds": round(elapsed, 6),
+        "qps": round(len(latencies) / elapsed, 1) if elapsed else None,
+        "p50_ms": round(statistics.median(latencies) * 1000, 3) if latencies else None,
+        "p99_ms": round(latencies[min(len(latencies) - 1, int(0.99 * len(latencies)))] * 1000, 3)
+        if latencies
+        else None,
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Measure lookup latency and throughput of drugbank-parse serve.")
+    parser.add_argument("--input", required=True, help="Path to DrugBank XML.")
+    parser.add_argument("--metrics", required=True, help="Path to write metrics JSON.")
+    parser.add_argument("--requests", type=int, default=5000, help="Single lookups to send. Default: 5000.")
+    parser.add_argument("--clients", type=int, default=4, help="Concurrent keep-alive connections. Default: 4.")
+    parser.add_argument("--batch-size", type=int, default=100, help="Drug ids per POST /query. Default: 100.")
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    metrics = run_benchmark(
+        input_path=args.input,
+        metrics_path=args.metrics,
+        requests=args.requests,
+        clients=args.clients,
+        batch_size=args.batch_size,
+    )
+    print(json.dumps(metrics, indent=2, sort_keys=True))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
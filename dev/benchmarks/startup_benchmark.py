@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import argparse
+import json
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Sequence
+
+DEV_DIR = Path(__file__).resolve().parents[1]
+PYTHON_PACKAGE_DIR = DEV_DIR / "python"
+if str(PYTHON_PACKAGE_DIR) not in sys.path:
+    sys.path.insert(0, str(PYTHON_PACKAGE_DIR))
+
+SCHEMA_FILES = ("tables.yml", "fields.yml", "profiles.yml")
+
+
+def run_benchmark(
+    input_path: str | Path,
+    metrics_path: str | Path,
+    repeats: int = 5,
+) -> dict[str, Any]:
+    # Every timing is the median over fresh interpreters, so nothing is
+    # served from a cache warmed by an earlier measurement.
+    xml_path = Path(input_path).resolve()
+    metrics_file = Path(metrics_path)
+
+    commands = {
+        "python_seconds": ["-c", "pass"],
+        "import_seconds": ["-c", "import drugbank_parse"],
+        "help_seconds": ["-m", "drugbank_parse.cli", "--help"],
+        "first_parse_seconds": [
+            "-c",
+            "import sys, drugbank_parse; drugbank_parse.parse_drugbank_xml(sys.argv[1])",
+            str(xml_path),
+        ],
+    }
+    metrics: dict[str, Any] = {
+        "implementation": "python",
+        "input_path": str(xml_path),
+        "repeats": repeats,
+    }
+    for name, arguments in commands.items():
+        metrics[name] = round(_median_seconds(arguments, repeats), 6)
+
+    # Schema loading in a fresh process: YAML from a copy of the schema
+    # files without the snapshot, the packaged snapshot, and a cached reload.
+    yaml_dir = Path(tempfile.mkdtemp(prefix="drugbank-schema-"))
+    try:
+        for name in SCHEMA_FILES:
+            shutil.copy(PYTHON_PACKAGE_DIR / "drugbank_parse" / "schema_data" / name, yaml_dir / name)
+        metrics["schema_load_ms"] = _measure_in_subprocess(yaml_dir)
+    finally:
+        shutil.rmtree(yaml_dir, ignore_errors=True)
+
+    metrics_file.parent.mkdir(parents=True, exist_ok=True)
+    metrics_file.write_text(
+        json.dumps(metrics, indent=2, sort_keys=True) + "\n",
+        encoding="utf-8",
+    )
+    return metrics
+
+
+def measure_schema_loading(yaml_dir: str | Path) -> dict[str, float]:
+    # Schema validation needs lxml; import it first so no timing includes it.
+    import drugbank_parse.extractors  # noqa: F401
+    from drugbank_parse.profiles import load_profiles
+    from drugbank_parse.schema import load_schema
+
+    timings = {}
+    for name, schema_dir in (("yaml", yaml_dir), ("snapshot", None), ("cached", None)):
+        start = time.perf_counter()
+        load_schema(schema_dir)
+        load_profiles(schema_dir)
+        timings[name] = round((time.perf_counter() - start) * 1000, 3)
+    return timings
+
+
+def _median_seconds(arguments: list[str], repeats: int) -> float:
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        _run(arguments)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def _measure_in_subprocess(yaml_dir: Path) -> dict[str, float]:
+    completed = _run([str(Path(__file__).resolve()), "--measure-schema", str(yaml_dir)])
+    return json.loads(completed.stdout)
+
+
+def _run(arguments: list[str]) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *arguments],
+        check=True,
+        capture_output=True,
+        text=True,
+        cwd=PYTHON_PACKAGE_DIR,
+    )
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Measure Python DrugBank parser cold-start times.")
+    parser.add_argument("--input", help="Path to DrugBank XML for the first-parse timing.")
+    parser.add_argument("--metrics", help="Path to write metrics JSON.")
+    parser.add_argument("--repeats", type=int, default=5, help="Fresh processes per timing. Default: 5.")
+    parser.add_argument("--measure-schema", help=argparse.SUPPRESS)
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.measure_schema:
+        print(json.dumps(measure_schema_loading(args.measure_schema)))
+        return 0
+    if not args.input or not args.metrics:
+        parser.error("--input and --metrics are required")
+
+    metrics = run_benchmark(
+        input_path=args.input,
+        metrics_path=args.metrics,
+        repeats=args.repeats,
+    )
+    print(json.dumps(metrics, indent=2, sort_keys=True))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import argparse
+import json
+import random
+from pathlib import Path
+from typing import IO, Any, Sequence
+
+HEADER = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<drugbank xmlns="http://www.drugbank.ca" xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" '
+    'xsi:schemaLocation="http://www.drugbank.ca http://www.drugbank.ca/docs/drugbank.xsd" '
+    'version="5.1" exported-on="2022-01-03">\n'
+)
+FOOTER = "</drugbank>\n"
+
+PROPERTY_KINDS = (
+    "logP",
+    "logS",
+    "Water Solubility",
+    "IUPAC Name",
+    "Traditional IUPAC Name",
+    "Molecular Weight",
+    "Monoisotopic Weight",
+    "SMILES",
+    "Molecular Formula",
+    "InChI",
+    "InChIKey",
+    "Polar Surface Area (PSA)",
+)
+ORGANISMS = ("Humans", "Escherichia coli (strain K12)", "Mycobacterium tuberculosis", "Influenza A virus")
+WORDS = (
+    "treatment acute chronic patients receptor inhibitor binding plasma clearance dose renal hepatic "
+    "infection therapy adults pediatric activity enzyme pathway agonist antagonist response clinical "
+    "management symptoms associated severe moderate reduce risk thrombosis pain inflammation"
+).split()
+
+
+def write_synthetic_drugbank(
+    path: str | Path,
+    drugs: int,
+    targets_per_drug: int = 3,
+    interactions_per_drug: int = 20,
+    properties_per_drug: int = 8,
+    text_length: int = 400,
+    target_pool: int | None = None,
+    seed: int = 0,
+) -> dict[str, Any]:
+    # Writes a deterministic DrugBank-shaped release: the same arguments always
+    # produce the same bytes. Returns the row counts the core and interactions
+    # modules should extract from it.
+    output_path = Path(path)
+    rng = random.Random(seed)
+    pool_size = target_pool if target_pool is not None else max(targets_per_drug, drugs // 3, 1)
+    if targets_per_drug > pool_size:
+        raise ValueError(f"targets_per_drug ({targets_per_drug}) exceeds target_pool ({pool_size})")
+
+    used_targets: set[int] = set()
+    interactions = 0
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with output_path.open("w", encoding="utf-8", newline="\n") as handle:
+        handle.write(HEADER)
+        for number in range(1, drugs + 1):
+            targets = rng.sample(range(pool_size), targets_per_drug)
+            used_targets.update(targets)
+            partners = _interaction_partners(rng, number, drugs, interactions_per_drug)
+            interactions += len(partners)
+            _write_drug(handle, rng, number, targets, partners, properties_per_drug, text_length)
+        handle.write(FOOTER)
+
+    return {
+        "path": str(output_path),
+        "bytes": output_path.stat().st_size,
+        "seed": seed,
+        "table_rows": {
+            "drugs": drugs,
+            "targets": len(used_targets),
+            "drug_target": drugs * targets_per_drug,
+            "drug_indication": drugs,
+            "target_drug_indication": drugs * targets_per_drug,
+            "drug_interactions": interactions,
+        },
+    }
+
+
+def drug_id(number: int) -> str:
+    return f"DB{number:05d}"
+
+
+def _interaction_partners(rng: random.Random, number: int, drugs: int, count: int) -> list[int]:
+    others = drugs - 1
+    if others <= 0 or count <= 0:
+        return []
+    picks = rng.sample(range(1, others + 1), min(count, others))
+    return [pick if pick < number else pick + 1 for pick in picks]
+
+
+def _write_drug(
+    handle: IO[str],
+    rng: random.Random,
+    number: int,
+    targets: list[int],
+    partners: list[int],
+    properties: int,
+    text_length: int,
+) -> None:
+    name = f"Synthetamab {number}"
+    parts = [
+        f'<drug type="{"biotech" if number % 4 == 0 else "small molecule"}" created="2005-06-13" updated="2021-10-03">\n',
+        f'  <drugbank-id primary="true">{drug_id(number)}</drugbank-id>\n',
+        f"  <drugbank-id>BTD{number:05d}</drugbank-id>\n",
+        f"  <name>{name}</name>\n",
+        f"  <description>{_text(rng, text_length)}</description>\n",
+        "  <groups>\n    <group>approved</group>\n  </groups>\n",
+        f"  <indication>{_text(rng, text_length)}</indication>\n",
+        f"  <pharmacodynamics>{_text(rng, text_length)}</pharmacodynamics>\n",
+        "  <drug-interactions>\n",
+    ]
+    for partner in partners:
+        parts.append(
+            "    <drug-interaction>\n"
+            f"      <drugbank-id>{drug_id(partner)}</drugbank-id>\n"
+            f"      <name>Synthetamab {partner}</name>\n"
+            f"      <description>Synthetamab {partner} may increase the activities of {name}.</description>\n"
+            "    </drug-interaction>\n"
+        )
+    parts.append("  </drug-interactions>\n")
+    # Pathway participants are nested <drug> elements that must not be read
+    # as top-level drugs.
+    parts.append(
+        "  <pathways>\n    <pathway>\n"
+        f"      <smpdb-id>SMP{number:07d}</smpdb-id>\n"
+        f"      <name>{name} Action Pathway</name>\n"
+        "      <drugs>\n"
+        f"        <drug>\n          <drugbank-id>{drug_id(number)}</drugbank-id>\n          <name>{name}</name>\n        </drug>\n"
+        "      </drugs>\n    </pathway>\n  </pathways>\n"
+    )
+    parts.append("  <targets>\n")
+    for position, target in enumerate(targets, start=1):
+        parts.append(
+            "    <target>\n"
+            f"      <id>BE{target:07d}</id>\n"
+            f"      <name>Synthetic target {target}</name>\n"
+            f"      <organism>{ORGANISMS[target % len(ORGANISMS)]}</organism>\n"
+            f"      <actions>\n        <action>{'inhibitor' if position % 2 else 'agonist'}</action>\n      </actions>\n"
+            f'      <polypeptide id="Q{target:06d}" source="Swiss-Prot">\n'
+            f"        <name>Synthetic target {target}</name>\n"
+            f"        <general-function>{_text(rng, 80)}</general-function>\n"
+            f"        <gene-name>GENE{target}</gene-name>\n"
+            f'        <organism ncbi-taxonomy-id="9606">{ORGANISMS[target % len(ORGANISMS)]}</organism>\n'
+            "      </polypeptide>\n"
+            "    </target>\n"
+        )
+    parts.append("  </targets>\n")
+    parts.append("  <calculated-properties>\n")
+    kinds = list(PROPERTY_KINDS[:properties])
+    if properties and "InChI" not in kinds:
+        kinds[-1] = "InChI"
+    for kind in kinds:
+        value = f"InChI=1S/SYN{number}/c{number % 97}" if kind == "InChI" else f"{rng.random() * 100:.3f}"
+        parts.append(
+            "    <property>\n"
+            f"      <kind>{kind}</kind>\n"
+            f"      <value>{value}</value>\n"
+            "      <source>ChemAxon</source>\n"
+            "    </property>\n"
+        )
+    parts.append("  </calculated-properties>\n</drug>\n")
+    handle.write("".join(parts))
+
+
+def _text(rng: random.Random, length: int) -> str:
+    words: list[str] = []
+    size = 0
+    while size < length:
+        word = rng.choice(WORDS)
+        words.append(word)
+        size += len(word) + 1
+    return " ".join(words).capitalize() + "."
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Write a deterministic synthetic DrugBank XML release.")
+    parser.add_argument("--output", required=True, help="Path of the XML file to write.")
+    parser.add_argument("--drugs", type=int, required=True, help="Number of top-level drugs.")
+    parser.add_argument("--targets-per-drug", type=int, default=3, help="Targets per drug. Default: 3.")
+    parser.add_argument("--interactions-per-drug", type=int, default=20, help="Interactions per drug. Default: 20.")
+    parser.add_argument("--properties-per-drug", type=int, default=8, help="Calculated properties per drug. Default: 8.")
+    parser.add_argument("--text-length", type=int, default=400, help="Characters per free-text field. Default: 400.")
+    parser.add_argument("--target-pool", type=int, help="Distinct targets to draw from. Default: drugs / 3.")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed. Default: 0.")
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    summary = write_synthetic_drugbank(
+        args.output,
+        drugs=args.drugs,
+        targets_per_drug=args.targets_per_drug,
+        interactions_per_drug=args.interactions_per_drug,
+        properties_per_drug=args.properties_per_drug,
+        text_length=args.text_length,
+        target_pool=args.target_pool,
+        seed=args.seed,
+    )
+    print(json.dumps(summary, indent=2, sort_keys=True))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,14 +1,76 @@
-from .exporters import write_drugbank_tables
-from .models import ParseResult
-from .parser import parse_drugbank_xml
-from .profiles import resolve_modules, resolve_tables
-from .schema import load_schema
-
-__all__ = [
-    "ParseResult",
-    "load_schema",
-    "parse_drugbank_xml",
-    "resolve_modules",
-    "resolve_tables",
-    "write_drugbank_tables",
-]
+from __future__ import annotations
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+from ._version import __version__
+
+if TYPE_CHECKING:
+    from .aio import aparse_drugbank_xml
+    from .cache import ParseCache
+    from .delta import diff_drugbank_release
+    from .exporters import (
+        ArrowTableSink,
+        CsvTableSink,
+        SqliteTableSink,
+        write_drugbank_sqlite,
+        write_drugbank_tables,
+    )
+    from .graph import DrugTargetGraph, build_drug_target_graph
+    from .index import DrugIndex, build_drug_index, load_drug_index, lookup_drugs
+    from .models import DrugFilter, ParseProgress, ParseResult
+    from .parser import parse_drugbank_xml, stream_drugbank_xml
+    from .profiles import resolve_modules, resolve_tables
+    from .progress import print_progress
+    from .schema import load_schema
+    from .server import LookupIndex, LookupServer
+    from .sinks import DeduplicatingSink, RowSink
+    from .stats import ParseStats
+
+# Public names are imported from their modules on first access, so importing
+# the package (and running ``--help``) does not load lxml or PyYAML.
+_EXPORTS = {
+    "ArrowTableSink": "exporters",
+    "CsvTableSink": "exporters",
+    "DeduplicatingSink": "sinks",
+    "DrugFilter": "models",
+    "DrugIndex": "index",
+    "DrugTargetGraph": "graph",
+    "LookupIndex": "server",
+    "LookupServer": "server",
+    "ParseCache": "cache",
+    "ParseProgress": "models",
+    "ParseResult": "models",
+    "ParseStats": "stats",
+    "RowSink": "sinks",
+    "SqliteTableSink": "exporters",
+    "aparse_drugbank_xml": "aio",
+    "build_drug_index": "index",
+    "build_drug_target_graph": "graph",
+    "diff_drugbank_release": "delta",
+    "load_drug_index": "index",
+    "load_schema": "schema",
+    "lookup_drugs": "index",
+    "parse_drugbank_xml": "parser",
+    "print_progress": "progress",
+    "resolve_modules": "profiles",
+    "resolve_tables": "profiles",
+    "stream_drugbank_xml": "parser",
+    "write_drugbank_sqlite": "exporters",
+    "write_drugbank_tables": "exporters",
+}
+
+__all__ = ["__version__", *_EXPORTS]
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(__all__)
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import AsyncIterator, Callable, Dict, List
+
+from .filters import Where
+from .inputs import XmlSource
+from .stats import ParseStats
+
+# Rows of one or more consecutive drugs, by table. Tables without rows for
+# those drugs are left out.
+RowBatch = Dict[str, List[Dict[str, str]]]
+
+_DONE = object()
+
+
+async def aparse_drugbank_xml(
+    path: XmlSource,
+    profile: str = "core",
+    modules: list[str] | None = None,
+    where: Where | None = None,
+    prune: bool = True,
+    engine: str = "lxml",
+    stats: ParseStats | None = None,
+    batch_drugs: int = 1,
+    max_pending: int = 16,
+) -> AsyncIterator[RowBatch]:
+    # Parses in a background thread and yields row batches as drugs finish.
+    # At most ``max_pending`` batches wait for the consumer; past that the
+    # parser blocks, so a slow consumer holds memory at a few drugs. Leaving
+    # the loop early or cancelling the consuming task stops the parser at the
+    # next drug. Targets shared with an earlier drug are not repeated.
+    if batch_drugs < 1:
+        raise ValueError(f"batch_drugs must be at least 1, got {batch_drugs}")
+    if max_pending < 1:
+        raise ValueError(f"max_pending must be at least 1, got {max_pending}")
+
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue[object] = asyncio.Queue()
+    slots = threading.Semaphore(max_pending)
+    stopped = threading.Event()
+    sink = _BatchingSink(batch_drugs, lambda batch: _hand_over(batch, loop, queue, slots, stopped))
+    producer = loop.run_in_executor(
+        None, _produce, path, sink, profile, modules, where, prune, engine, stats, loop, queue, stopped
+    )
+    try:
+        while True:
+            item = await queue.get()
+            slots.release()
+            if item is _DONE:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stopped.set()
+        # Wakes a parser blocked on a full queue so it sees the stop.
+        slots.release()
+        await asyncio.shield(producer)
+
+
+class _Stopped(Exception):
+    # Raised in the parser thread once the consumer has gone away.
+    pass
+
+
+class _BatchingSink:
+    # Collects the rows of ``batch_drugs`` drugs at a time and hands each
+    # non-empty batch to ``emit`` from the parser thread.
+
+    def __init__(self, batch_drugs: int, emit: Callable[[RowBatch], None]) -> None:
+        self.batch_drugs = batch_drugs
+        self.emit = emit
+        self._batch: RowBatch = {}
+        self._drugs = 0
+
+    def open(self, tables: list[str]) -> None:
+        pass
+
+    def add_row(self, table: str, row: dict[str, str]) -> None:
+        rows = self._batch.get(table)
+        if rows is None:
+            rows = self._batch[table] = []
+        rows.append(row)
+
+    def end_drug(self) -> None:
+        self._drugs += 1
+        if self._drugs >= self.batch_drugs:
+            self.flush()
+
+    def flush(self) -> None:
+        batch, self._batch, self._drugs = self._batch, {}, 0
+        if batch:
+            self.emit(batch)
+
+    def close(self) -> None:
+        pass
+
+
+def _hand_over(
+    batch: RowBatch,
+    loop: asyncio.AbstractEventLoop,
+    queue: asyncio.Queue[object],
+    slots: threading.Semaphore,
+    stopped: threading.Event,
+) -> None:
+    slots.acquire()
+    if stopped.is_set():
+        raise _Stopped
+    loop.call_soon_threadsafe(queue.put_nowait, batch)
+
+
+def _produce(
+    path: XmlSource,
+    sink: _BatchingSink,
+    profile: str,
+    modules: list[str] | None,
+    where: Where | None,
+    prune: bool,
+    engine: str,
+    stats: ParseStats | None,
+    loop: asyncio.AbstractEventLoop,
+    queue: asyncio.Queue[object],
+    stopped: threading.Event,
+) -> None:
+    from .parser import stream_drugbank_xml
+
+    def end_drug() -> None:
+        if stopped.is_set():
+            raise _Stopped
+        sink.end_drug()
+
+    try:
+        stream_drugbank_xml(
+            path,
+            sink,
+            profile=profile,
+            modules=modules,
+            stats=stats,
+            where=where,
+            prune=prune,
+            engine=engine,
+            on_drug=end_drug,
+        )
+        sink.flush()
+        item: object = _DONE
+    except _Stopped:
+        return
+    except BaseException as error:
+        item = error
+    # The end marker and errors skip the slot count, so they never block.
+    if not stopped.is_set():
+        loop.call_soon_threadsafe(queue.put_nowait, item)
@@ -0,0 +1,290 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from pathlib import Path
+
+from ._version import __version__
+from .models import ColumnarTable, DrugBankSchema, DrugFilter, JoinedTable, ParseResult, StringPool
+from .schema import load_schema
+
+CACHE_SUFFIX = ".dbcache"
+CACHE_FORMAT = 3
+FINGERPRINTS_FILE = "fingerprints.json"
+
+_MAGIC = b"DBPCACHE"
+_HEADER_LENGTH = struct.Struct("<Q")
+_CODE_TYPE = "I"
+# XML 1.0 text cannot contain this control character, so it can delimit the
+# values of a string pool without escaping.
+_VALUE_SEP = "\x1f"
+
+
+class ParseCache:
+    def __init__(
+        self,
+        cache_dir: str | Path,
+        max_bytes: int | None = None,
+        max_age_seconds: float | None = None,
+    ) -> None:
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.schema_version = load_schema().version
+
+    def key(
+        self,
+        xml_path: str | Path,
+        modules: list[str],
+        tables: list[str],
+        where: DrugFilter | None = None,
+    ) -> str:
+        identity = {
+            "format": CACHE_FORMAT,
+            "input_sha256": self.fingerprint(xml_path),
+            "modules": list(modules),
+            "tables": list(tables),
+            "schema_version": self.schema_version,
+            "package_version": __version__,
+        }
+        if where is not None:
+            identity["where"] = where.as_dict()
+        return hashlib.sha256(json.dumps(identity, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def fingerprint(self, xml_path: str | Path) -> str:
+        # Hashing a full release takes seconds, so the digest is remembered per
+        # (path, size, mtime) and reused from a fresh drug index when present.
+        path = Path(xml_path).resolve()
+        stat = path.stat()
+        memo_key = f"{path}|{stat.st_size}|{stat.st_mtime_ns}"
+        memo_path = self.cache_dir / FINGERPRINTS_FILE
+        memo = _read_json(memo_path)
+        if memo_key in memo:
+            return memo[memo_key]
+
+        from .index import load_drug_index  # index imports the parser, which imports this module
+
+        index = load_drug_index(path)
+        if index is not None:
+            digest = index.sha256
+        else:
+            digest_builder = hashlib.sha256()
+            with path.open("rb") as handle:
+                for chunk in iter(lambda: handle.read(4 * 1024 * 1024), b""):
+                    digest_builder.update(chunk)
+            digest = digest_builder.hexdigest()
+
+        memo = {name: value for name, value in memo.items() if not name.startswith(f"{path}|")}
+        memo[memo_key] = digest
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        _write_atomic(memo_path, json.dumps(memo, indent=2, sort_keys=True).encode("utf-8"))
+        return digest
+
+    def entry_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}{CACHE_SUFFIX}"
+
+    def get(self, key: str, layout: str = "columnar") -> ParseResult | None:
+        path = self.entry_path(key)
+        if not path.exists():
+            return None
+        try:
+            header, body_start = _read_header(path)
+            if self._expired(header):
+                path.unlink(missing_ok=True)
+                return None
+            result = _read_entry(path, header, body_start, layout)
+        except (OSError, ValueError, KeyError):
+            path.unlink(missing_ok=True)
+            return None
+        os.utime(path)
+        return result
+
+    def put(self, key: str, result: ParseResult) -> Path:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self.entry_path(key)
+        _write_atomic(path, _encode_entry(key, result, self.schema_version))
+        self.prune(keep=path)
+        return path
+
+    def prune(self, keep: Path | None = None) -> list[Path]:
+        removed = []
+        entries = []
+        for path in self.cache_dir.glob(f"*{CACHE_SUFFIX}"):
+            if path != keep and not self._live(path):
+                path.unlink(missing_ok=True)
+                removed.append(path)
+                continue
+            entries.append(path)
+
+        if self.max_bytes is not None:
+            # Least recently used first; hits refresh the entry's mtime.
+            entries.sort(key=lambda entry: entry.stat().st_mtime)
+            total = sum(entry.stat().st_size for entry in entries)
+            for path in entries:
+                if total <= self.max_bytes:
+                    break
+                if path == keep:
+                    continue
+                total -= path.stat().st_size
+                path.unlink(missing_ok=True)
+                removed.append(path)
+        return removed
+
+    def _expired(self, header: dict) -> bool:
+        # Age counts from when the entry was written; hits refresh the mtime
+        # for size eviction only.
+        if self.max_age_seconds is None:
+            return False
+        return time.time() - header.get("created", 0) > self.max_age_seconds
+
+    def _live(self, path: Path) -> bool:
+        try:
+            header, _ = _read_header(path)
+        except (OSError, ValueError):
+            return False
+        return (
+            header.get("format") == CACHE_FORMAT
+            and header.get("package_version") == __version__
+            and header.get("schema_version") == self.schema_version
+            and not self._expired(header)
+        )
+
+
+def _encode_entry(key: str, result: ParseResult, schema_version: int) -> bytes:
+    # The body holds every string pool once, as its values joined by
+    # _VALUE_SEP, and one array of pool codes per table column. Row tables are
+    # converted to columns first, with the pools of a columnar parse.
+    schema = load_schema()
+    pools: dict[int, int] = {}
+    pool_entries = []
+    tables = []
+    body = []
+    offset = 0
+    shared: dict[str, StringPool] = {}
+    for table_name, rows in result.tables.items():
+        if isinstance(rows, JoinedTable):
+            continue
+        if not isinstance(rows, ColumnarTable):
+            table_schema = schema.tables[table_name]
+            columnar = ColumnarTable(table_schema.columns, table_schema.pools, shared_pools=shared)
+            columnar.extend(rows)
+            rows = columnar
+        column_pools = []
+        for pool in rows.pools:
+            if id(pool) not in pools:
+                data = _VALUE_SEP.join(pool.values).encode("utf-8")
+                pools[id(pool)] = len(pool_entries)
+                pool_entries.append({"offset": offset, "length": len(data), "values": len(pool)})
+                body.append(data)
+                offset += len(data)
+            column_pools.append(pools[id(pool)])
+        code_offsets = []
+        for codes in rows.codes:
+            data = codes.tobytes()
+            code_offsets.append(offset)
+            body.append(data)
+            offset += len(data)
+        tables.append(
+            {
+                "name": table_name,
+                "columns": rows.columns,
+                "rows": len(rows),
+                "pools": column_pools,
+                "codes": code_offsets,
+            }
+        )
+
+    header = json.dumps(
+        {
+            "key": key,
+            "format": CACHE_FORMAT,
+            "package_version": __version__,
+            "schema_version": schema_version,
+            "created": time.time(),
+            "byteorder": sys.byteorder,
+            "code_size": array(_CODE_TYPE).itemsize,
+            "pools": pool_entries,
+            "tables": tables,
+            "table_order": list(result.tables),
+        },
+        sort_keys=True,
+    ).encode("utf-8")
+    return b"".join([_MAGIC, _HEADER_LENGTH.pack(len(header)), header, *body])
+
+
+def _read_header(path: Path) -> tuple[dict, int]:
+    prefix_length = len(_MAGIC) + _HEADER_LENGTH.size
+    with path.open("rb") as handle:
+        prefix = handle.read(prefix_length)
+        if len(prefix) != prefix_length or not prefix.startswith(_MAGIC):
+            raise ValueError(f"Not a parse cache entry: {path}")
+        (length,) = _HEADER_LENGTH.unpack(prefix[len(_MAGIC) :])
+        return json.loads(handle.read(length).decode("utf-8")), prefix_length + length
+
+
+def _read_entry(path: Path, header: dict, body_start: int, layout: str = "columnar") -> ParseResult:
+    # Code arrays are copied straight from the mapped file; only the string
+    # pools are decoded. Pools shared between columns or tables stay shared.
+    code_size = array(_CODE_TYPE).itemsize
+    if header["code_size"] != code_size:
+        raise ValueError(f"Parse cache entry has {header['code_size']}-byte codes: {path}")
+    swap = header["byteorder"] != sys.byteorder
+    schema = load_schema()
+    result = ParseResult.for_tables(header["table_order"], schema, layout=layout)
+    with path.open("rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        view = memoryview(mapped)[body_start:]
+        try:
+            pools = []
+            for entry in header["pools"]:
+                values = str(view[entry["offset"] : entry["offset"] + entry["length"]], "utf-8").split(_VALUE_SEP)
+                if len(values) != max(entry["values"], 1):
+                    raise ValueError(f"Corrupt parse cache entry: {path}")
+                pools.append(StringPool.from_values(values[: entry["values"]]))
+            for table in header["tables"]:
+                columnar = ColumnarTable(table["columns"])
+                columnar.pools = [pools[index] for index in table["pools"]]
+                length = table["rows"] * code_size
+                for codes, offset in zip(columnar.codes, table["codes"]):
+                    codes.frombytes(view[offset : offset + length])
+                    if len(codes) != table["rows"]:
+                        raise ValueError(f"Corrupt parse cache entry: {path}")
+                    if swap:
+                        codes.byteswap()
+                _load_table(result, schema, table["name"], columnar)
+        finally:
+            view.release()
+    return result
+
+
+def _load_table(result: ParseResult, schema: DrugBankSchema, name: str, columnar: ColumnarTable) -> None:
+    if isinstance(result.tables[name], list):
+        result.tables[name].extend(columnar)
+        return
+    # Named pools are shared through the result, as in a fresh parse.
+    pool_names = schema.tables[name].pools
+    for column, pool in zip(columnar.columns, columnar.pools):
+        if column in pool_names:
+            result.pools[pool_names[column]] = pool
+    result.tables[name] = columnar
+
+
+def _read_json(path: Path) -> dict:
+    if not path.exists():
+        return {}
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except ValueError:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
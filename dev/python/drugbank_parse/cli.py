@@ -1,17 +1,28 @@
 from __future__ import annotations
 
 import argparse
+import json
+import sys
 from pathlib import Path
 from typing import Sequence
 
-from .exporters import write_drugbank_tables
-from .parser import parse_drugbank_xml
+from .exporters import CSV_COMPRESSIONS, OUTPUT_FORMATS
+from .models import DRUG_GROUPS, DRUG_TYPES, PARSE_ENGINES
 
 
 def build_parser() -> argparse.ArgumentParser:
-    parser = argparse.ArgumentParser(description="Parse DrugBank XML into CSV tables.")
-    parser.add_argument("--input", required=True, help="Path to DrugBank XML file.")
-    parser.add_argument("--outdir", required=True, help="Directory for output CSV files.")
+    parser = argparse.ArgumentParser(
+        description=(
+            "Parse DrugBank XML into CSV tables. Use 'diff' as the first argument for release deltas "
+            "and 'serve' for a local lookup server."
+        ),
+    )
+    parser.add_argument(
+        "--input",
+        required=True,
+        help="DrugBank XML file, optionally .zip, .gz, .bz2, .xz or .zst compressed. Use - to read standard input.",
+    )
+    parser.add_argument("--outdir", required=True, help="Directory for output table files.")
     parser.add_argument("--profile", default="core", help="Parse profile. Default: core.")
     parser.add_argument(
         "--module",
@@ -19,19 +30,254 @@ def build_parser() -> argparse.ArgumentParser:
         dest="modules",
         help="Module to enable. May be passed multiple times.",
     )
+    parser.add_argument(
+        "--drug-id",
+        action="append",
+        dest="drug_ids",
+        help="Only parse these DrugBank ids. May be repeated or comma-separated.",
+    )
+    parser.add_argument(
+        "--group",
+        action="append",
+        dest="groups",
+        choices=DRUG_GROUPS,
+        help="Only parse drugs in any of these groups. May be passed multiple times.",
+    )
+    parser.add_argument(
+        "--drug-type",
+        action="append",
+        dest="drug_types",
+        choices=DRUG_TYPES,
+        help="Only parse drugs of this type. May be passed multiple times.",
+    )
+    parser.add_argument(
+        "--target-organism",
+        action="append",
+        dest="target_organisms",
+        help="Only parse drugs with a target from this organism, e.g. Humans. May be passed multiple times.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes for sharded parsing. Default: 1.",
+    )
+    parser.add_argument(
+        "--no-prune",
+        dest="prune",
+        action="store_false",
+        help="Let lxml build every element instead of cutting unused subtrees out of each drug first.",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=PARSE_ENGINES,
+        default="lxml",
+        help="XML parser that reads each drug: lxml, or the standard library's expat or sax. Default: lxml.",
+    )
+    parser.add_argument(
+        "--format",
+        choices=OUTPUT_FORMATS,
+        default="csv",
+        help="Output table format. Default: csv.",
+    )
+    parser.add_argument(
+        "--compression",
+        choices=tuple(CSV_COMPRESSIONS),
+        help="Compress CSV output files (.csv.gz or .csv.zst), one background thread per table.",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help="Directory for the persistent parse cache. Reuses a previous parse of the same input.",
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=float,
+        help="Evict least recently used cache entries above this total size.",
+    )
+    parser.add_argument(
+        "--cache-max-age-days",
+        type=float,
+        help="Evict cache entries older than this many days.",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Write rows to the output files while parsing instead of collecting them in memory.",
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="Print per-stage timings and counters as JSON to stderr when done.",
+    )
+    parser.add_argument(
+        "--progress",
+        action="store_true",
+        help="Report percent done, MB/s, drugs/s and ETA on stderr while parsing.",
+    )
+    return parser
+
+
+def build_diff_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="drugbank-parse diff",
+        description="Write insert/delete/update CSVs between a previous release and a new DrugBank XML.",
+    )
+    parser.add_argument("--previous-index", required=True, help="Drug index (.dbidx) of the previous release.")
+    parser.add_argument("--previous-outdir", required=True, help="Directory with the previous release CSV files.")
+    parser.add_argument("--input", required=True, help="Path to the new DrugBank XML file.")
+    parser.add_argument("--outdir", required=True, help="Directory for delta CSV files.")
+    parser.add_argument("--profile", default="core", help="Parse profile. Default: core.")
+    parser.add_argument(
+        "--module",
+        action="append",
+        dest="modules",
+        help="Module to enable. May be passed multiple times.",
+    )
+    return parser
+
+
+def build_serve_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="drugbank-parse serve",
+        description="Serve drug, target and gene lookups over the core tables as local HTTP/JSON.",
+    )
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--input", help="DrugBank XML to parse with the core profile before serving.")
+    source.add_argument("--tables", help="Directory with drugs.csv, targets.csv and drug_target.csv from a core run.")
+    parser.add_argument("--cache-dir", help="Parse cache for --input; a hit loads the cached tables without parsing.")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on. Default: 127.0.0.1.")
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on. Default: 8765.")
     return parser
 
 
 def main(argv: Sequence[str] | None = None) -> int:
-    args = build_parser().parse_args(argv)
-    result = parse_drugbank_xml(
+    arguments = list(sys.argv[1:] if argv is None else argv)
+    if arguments[:1] == ["diff"]:
+        return diff_main(arguments[1:])
+    if arguments[:1] == ["serve"]:
+        return serve_main(arguments[1:])
+
+    parser = build_parser()
+    args = parser.parse_args(arguments)
+    if args.workers < 1:
+        parser.error(f"--workers must be at least 1, got {args.workers}")
+    # Imported after argument parsing so --help and usage errors stay fast.
+    from .cache import ParseCache
+    from .exporters import table_sink, write_drugbank_tables
+    from .parser import parse_drugbank_xml, stream_drugbank_xml
+    from .progress import print_progress
+    from .stats import ParseStats
+
+    if args.stream and args.cache_dir:
+        parser.error("--cache-dir caches in-memory parse results and cannot be combined with --stream")
+    if args.compression and args.format != "csv":
+        parser.error("--compression applies to --format csv only")
+    if args.input == "-" and args.cache_dir:
+        parser.error("--cache-dir needs an input file and cannot be combined with --input -")
+    source = sys.stdin.buffer if args.input == "-" else Path(args.input)
+    stats = ParseStats() if args.stats else None
+    progress = print_progress if args.progress else None
+    drug_ids = [drug_id for value in args.drug_ids or [] for drug_id in value.split(",") if drug_id]
+    where = {
+        "ids": drug_ids or None,
+        "groups": args.groups,
+        "types": args.drug_types,
+        "target_organisms": args.target_organisms,
+    }
+    if args.stream:
+        sink = table_sink(Path(args.outdir), format=args.format, compression=args.compression)
+        stream_drugbank_xml(
+            source,
+            sink,
+            profile=args.profile,
+            modules=args.modules,
+            workers=args.workers,
+            stats=stats,
+            progress=progress,
+            where=where,
+            prune=args.prune,
+            engine=args.engine,
+        )
+        written = sink.paths
+    else:
+        cache = None
+        if args.cache_dir:
+            cache = ParseCache(
+                Path(args.cache_dir),
+                max_bytes=int(args.cache_max_mb * 1024 * 1024) if args.cache_max_mb is not None else None,
+                max_age_seconds=args.cache_max_age_days * 86400 if args.cache_max_age_days is not None else None,
+            )
+        result = parse_drugbank_xml(
+            source,
+            profile=args.profile,
+            modules=args.modules,
+            workers=args.workers,
+            cache=cache,
+            stats=stats,
+            progress=progress,
+            where=where,
+            prune=args.prune,
+            engine=args.engine,
+        )
+        written = write_drugbank_tables(
+            result,
+            Path(args.outdir),
+            format=args.format,
+            compression=args.compression,
+            stats=stats,
+        )
+    for path in written:
+        print(path)
+    if stats is not None:
+        print(json.dumps(stats.as_dict(), indent=2, sort_keys=True), file=sys.stderr)
+    return 0
+
+
+def diff_main(argv: Sequence[str]) -> int:
+    args = build_diff_parser().parse_args(argv)
+    from .delta import diff_drugbank_release
+
+    summary = diff_drugbank_release(
+        Path(args.previous_index),
+        Path(args.previous_outdir),
         Path(args.input),
+        Path(args.outdir),
         profile=args.profile,
         modules=args.modules,
     )
-    written = write_drugbank_tables(result, Path(args.outdir))
-    for path in written:
-        print(path)
+    for table, counts in summary.items():
+        print(f"{table}: " + ", ".join(f"{kind}={count}" for kind, count in counts.items()))
+    return 0
+
+
+def serve_main(argv: Sequence[str]) -> int:
+    parser = build_serve_parser()
+    args = parser.parse_args(argv)
+    if args.cache_dir and not args.input:
+        parser.error("--cache-dir applies to --input only")
+    from .server import LookupIndex, LookupServer
+
+    if args.tables:
+        index = LookupIndex.from_csv_dir(Path(args.tables))
+    else:
+        from .cache import ParseCache
+        from .parser import parse_drugbank_xml
+
+        cache = ParseCache(Path(args.cache_dir)) if args.cache_dir else None
+        index = LookupIndex.from_result(parse_drugbank_xml(Path(args.input), profile="core", cache=cache))
+    with LookupServer(index, args.host, args.port) as server:
+        host, port = server.server_address[:2]
+        sizes = index.summary()
+        print(
+            f"Serving {sizes['drugs']} drugs, {sizes['targets']} targets and {sizes['genes']} genes "
+            f"on http://{host}:{port}",
+            file=sys.stderr,
+            flush=True,
+        )
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
     return 0
 
 
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import csv
+from pathlib import Path
+from typing import Callable, Iterable
+
+from .index import DrugIndex, ensure_drug_index
+from .models import TableSchema
+from .parser import parse_drug_records
+from .schema import load_schema
+
+DELTA_KINDS = ("insert", "delete", "update")
+DRUG_KEY = "drug_id"
+
+
+def diff_drugbank_release(
+    previous_index: str | Path | DrugIndex,
+    previous_outdir: str | Path,
+    xml_path: str | Path,
+    outdir: str | Path,
+    profile: str = "core",
+    modules: list[str] | None = None,
+) -> dict[str, dict[str, int]]:
+    old_index = previous_index if isinstance(previous_index, DrugIndex) else DrugIndex.load(previous_index)
+    previous_dir = Path(previous_outdir)
+    new_index = ensure_drug_index(xml_path)
+    schema = load_schema()
+
+    added = [drug_id for drug_id in new_index.entries if drug_id not in old_index.entries]
+    removed = {drug_id for drug_id in old_index.entries if drug_id not in new_index.entries}
+    changed = [
+        drug_id
+        for drug_id, entry in new_index.entries.items()
+        if drug_id in old_index.entries and old_index.entries[drug_id].digest != entry.digest
+    ]
+    affected = removed | set(changed) | set(added)
+
+    # Only drugs whose record bytes changed are re-extracted from the new XML.
+    new_result = parse_drug_records(
+        xml_path,
+        new_index.ranges(added + changed),
+        profile=profile,
+        modules=modules,
+        header=new_index.header,
+    )
+    tables = list(new_result.tables)
+
+    output_dir = Path(outdir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    summary: dict[str, dict[str, int]] = {}
+    for table_name in tables:
+        table = schema.tables[table_name]
+        if not table.keys:
+            raise ValueError(f"Table {table_name} has no natural keys in tables.yml")
+        new_rows = new_result.rows(table_name)
+        if DRUG_KEY in table.columns:
+            old_rows = _read_rows(previous_dir, table_name, lambda row: row[DRUG_KEY] in affected)
+            delta = _diff_rows(table, old_rows, new_rows)
+        else:
+            delta = _diff_shared_rows(table, schema.tables, tables, previous_dir, affected, new_rows)
+        summary[table_name] = _write_delta(output_dir, table, delta)
+
+    new_index.save(output_dir / "release.dbidx")
+    return summary
+
+
+def _diff_rows(
+    table: TableSchema,
+    old_rows: list[dict[str, str]],
+    new_rows: Iterable[dict[str, str]],
+) -> dict[str, list[dict[str, str]]]:
+    old_by_key = _rows_by_key(table, old_rows)
+    new_by_key = _rows_by_key(table, new_rows)
+    delta: dict[str, list[dict[str, str]]] = {kind: [] for kind in DELTA_KINDS}
+    for key, row in new_by_key.items():
+        old_row = old_by_key.get(key)
+        if old_row is None:
+            delta["insert"].append(row)
+        elif _project(table, old_row) != _project(table, row):
+            delta["update"].append(row)
+    for key, row in old_by_key.items():
+        if key not in new_by_key:
+            delta["delete"].append(row)
+    return delta
+
+
+def _diff_shared_rows(
+    table: TableSchema,
+    all_tables: dict[str, TableSchema],
+    enabled_tables: list[str],
+    previous_dir: Path,
+    affected: set[str],
+    new_rows: Iterable[dict[str, str]],
+) -> dict[str, list[dict[str, str]]]:
+    # Rows shared between drugs (e.g. deduplicated targets) are found through a
+    # link table holding drug_id plus the shared table's keys. A shared row that
+    # an unchanged drug still links to keeps its previous value.
+    link = next(
+        (
+            all_tables[name]
+            for name in enabled_tables
+            if DRUG_KEY in all_tables[name].columns
+            and all(key in all_tables[name].columns for key in table.keys)
+        ),
+        None,
+    )
+    if link is None:
+        raise ValueError(f"Table {table.name} has no drug link table to diff against")
+
+    retained: set[tuple[str, ...]] = set()
+    candidates: set[tuple[str, ...]] = set()
+    for row in _read_rows(previous_dir, link.name, lambda row: True):
+        key = tuple(row[column] for column in table.keys)
+        if row[DRUG_KEY] in affected:
+            candidates.add(key)
+        else:
+            retained.add(key)
+
+    new_by_key = _rows_by_key(table, new_rows)
+    candidates = (candidates | set(new_by_key)) - retained
+    old_rows = _read_rows(
+        previous_dir,
+        table.name,
+        lambda row: tuple(row[column] for column in table.keys) in candidates,
+    )
+    return _diff_rows(table, old_rows, [row for key, row in new_by_key.items() if key in candidates])
+
+
+def _rows_by_key(table: TableSchema, rows: Iterable[dict[str, str]]) -> dict[tuple[str, ...], dict[str, str]]:
+    by_key: dict[tuple[str, ...], dict[str, str]] = {}
+    for row in rows:
+        by_key.setdefault(tuple(row.get(column, "") for column in table.keys), row)
+    return by_key
+
+
+def _project(table: TableSchema, row: dict[str, str]) -> list[str]:
+    return [row.get(column, "") for column in table.columns]
+
+
+def _read_rows(
+    previous_dir: Path,
+    table_name: str,
+    keep: Callable[[dict[str, str]], bool],
+) -> list[dict[str, str]]:
+    path = previous_dir / f"{table_name}.csv"
+    if not path.exists():
+        raise FileNotFoundError(f"Previous release table does not exist: {path}")
+    with path.open("r", encoding="utf-8", newline="") as handle:
+        return [row for row in csv.DictReader(handle) if keep(row)]
+
+
+def _write_delta(
+    output_dir: Path,
+    table: TableSchema,
+    delta: dict[str, list[dict[str, str]]],
+) -> dict[str, int]:
+    counts = {}
+    for kind in DELTA_KINDS:
+        columns = table.keys if kind == "delete" else table.columns
+        path = output_dir / f"{table.name}.{kind}.csv"
+        with path.open("w", encoding="utf-8", newline="") as handle:
+            writer = csv.writer(handle)
+            writer.writerow(columns)
+            for row in delta[kind]:
+                writer.writerow([row.get(column, "") for column in columns])
+        counts[kind] = len(delta[kind])
+    return counts
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+from typing import IO, Any, Callable, Iterator
+
+from lxml import etree
+
+from .extractors import qualified
+from .models import PARSE_ENGINES
+
+READ_SIZE = 64 * 1024
+
+_DRUG = qualified("drug")
+
+
+def check_engine(engine: str) -> None:
+    if engine not in PARSE_ENGINES:
+        raise ValueError(f"Unknown engine: {engine}")
+
+
+def iter_drug_elements(source: str | IO[bytes], engine: str = "lxml") -> Iterator[Any]:
+    # Yields each <drug> as an element the record extractors can read. lxml
+    # yields every <drug> in document order, nested pathway participants
+    # included, and leaves cleanup to the caller; expat and sax build a
+    # StreamElement tree per top-level <drug> only. Those two engines need a
+    # file object.
+    if engine == "lxml":
+        for _, node in etree.iterparse(source, events=("end",), tag=_DRUG, recover=False):
+            yield node
+    elif engine == "expat":
+        yield from _iter_expat(source)
+    elif engine == "sax":
+        yield from _iter_sax(source)
+    else:
+        check_engine(engine)
+
+
+class StreamElement:
+    # The part of the lxml element API the extractors and drug filters use:
+    # tag, attributes, text and tail, and child iteration by tag.
+
+    __slots__ = ("tag", "attrib", "text", "tail", "children")
+
+    def __init__(self, tag: str, attrib: dict[str, str]) -> None:
+        self.tag = tag
+        self.attrib = attrib
+        self.text: str | None = None
+        self.tail: str | None = None
+        self.children: list[StreamElement] = []
+
+    def get(self, key: str, default: str | None = None) -> str | None:
+        return self.attrib.get(key, default)
+
+    def __len__(self) -> int:
+        return len(self.children)
+
+    def iterchildren(self, *tags: str) -> Iterator[StreamElement]:
+        if not tags:
+            return iter(self.children)
+        return (child for child in self.children if child.tag in tags)
+
+    def itertext(self) -> Iterator[str]:
+        if self.text:
+            yield self.text
+        for child in self.children:
+            yield from child.itertext()
+            if child.tail:
+                yield child.tail
+
+
+class _DrugBuilder:
+    # Builds one StreamElement tree per top-level <drug> from start, end and
+    # character events; everything outside drugs is ignored. ``qualify`` maps
+    # the event's element and attribute names to lxml's Clark notation, and is
+    # called once per distinct name.
+
+    def __init__(self, qualify: Callable[[Any], str]) -> None:
+        self.drugs: list[StreamElement] = []
+        self._stack: list[StreamElement] = []
+        self._qualify = qualify
+        self._names: dict[Any, str] = {}
+
+    def start(self, name: Any, attributes: dict[Any, str]) -> None:
+        stack = self._stack
+        names = self._names
+        tag = names.get(name) or self._name(name)
+        if not stack and tag != _DRUG:
+            return
+        if attributes:
+            attributes = {names.get(key) or self._name(key): value for key, value in attributes.items()}
+        element = StreamElement(tag, attributes)
+        if stack:
+            stack[-1].children.append(element)
+        stack.append(element)
+
+    def end(self, name: Any = None) -> None:
+        stack = self._stack
+        if stack:
+            element = stack.pop()
+            if not stack:
+                self.drugs.append(element)
+
+    def data(self, text: str) -> None:
+        # Character data can arrive in several pieces, so it is appended.
+        stack = self._stack
+        if not stack:
+            return
+        element = stack[-1]
+        if element.children:
+            last = element.children[-1]
+            last.tail = text if last.tail is None else last.tail + text
+        else:
+            element.text = text if element.text is None else element.text + text
+
+    def _name(self, name: Any) -> str:
+        tag = self._names[name] = self._qualify(name)
+        return tag
+
+
+def _iter_expat(source: IO[bytes]) -> Iterator[StreamElement]:
+    from xml.parsers import expat
+
+    builder = _DrugBuilder(_expat_name)
+    parser = expat.ParserCreate(namespace_separator="}")
+    parser.buffer_text = True
+    parser.buffer_size = READ_SIZE
+    parser.StartElementHandler = builder.start
+    parser.EndElementHandler = builder.end
+    parser.CharacterDataHandler = builder.data
+    while True:
+        data = source.read(READ_SIZE)
+        parser.Parse(data, not data)
+        yield from builder.drugs
+        builder.drugs.clear()
+        if not data:
+            return
+
+
+def _iter_sax(source: IO[bytes]) -> Iterator[StreamElement]:
+    from xml import sax
+    from xml.sax.handler import ContentHandler, feature_namespaces
+
+    builder = _DrugBuilder(_sax_name)
+
+    class Handler(ContentHandler):
+        def startElementNS(self, name: tuple[str | None, str], qname: str | None, attrs: Any) -> None:
+            builder.start(name, dict(attrs.items()))
+
+        def endElementNS(self, name: tuple[str | None, str], qname: str | None) -> None:
+            builder.end()
+
+        def characters(self, content: str) -> None:
+            builder.data(content)
+
+    parser = sax.make_parser()
+    parser.setFeature(feature_namespaces, True)
+    parser.setContentHandler(Handler())
+    while True:
+        data = source.read(READ_SIZE)
+        if not data:
+            break
+        parser.feed(data)
+        yield from builder.drugs
+        builder.drugs.clear()
+    parser.close()
+    yield from builder.drugs
+
+
+def _expat_name(name: str) -> str:
+    # Expat reports namespaced names as "uri}local".
+    return "{" + name if "}" in name else name
+
+
+def _sax_name(name: tuple[str | None, str]) -> str:
+    uri, local = name
+    return f"{{{uri}}}{local}" if uri else local
@@ -1,32 +1,448 @@
 from __future__ import annotations
 
 import csv
+import queue
+import sqlite3
+import threading
+import time
+import zlib
+from itertools import islice
 from pathlib import Path
+from typing import IO, Any
 
-from .models import ParseResult
+from .inputs import import_zstandard
+from .models import DrugBankSchema, ParseResult, Table, iter_table_rows
 from .schema import load_schema
+from .sinks import RowSink, abort_sink
+from .stats import ParseStats
+
+OUTPUT_FORMATS = ("csv", "parquet", "arrow", "sqlite")
+ROW_GROUP_SIZE = 64 * 1024
+SQLITE_BATCH_SIZE = 50_000
+SQLITE_FILENAME = "drugbank.sqlite"
+SQLITE_INDEXED_COLUMNS = ("drug_id", "target_id")
+CSV_COMPRESSIONS = {"gzip": ".gz", "zstd": ".zst"}
+COMPRESSION_BLOCK_SIZE = 1024 * 1024
+COMPRESSION_QUEUE_DEPTH = 4
+
+
+class CsvTableSink:
+    def __init__(
+        self,
+        outdir: str | Path,
+        schema: DrugBankSchema | None = None,
+        compression: str | None = None,
+    ) -> None:
+        if compression is not None and compression not in CSV_COMPRESSIONS:
+            raise ValueError(f"Unknown CSV compression: {compression}")
+        self.output_dir = Path(outdir)
+        self.schema = schema if schema is not None else load_schema()
+        self.compression = compression
+        self.paths: list[Path] = []
+        self._handles: list[IO[str] | _BackgroundCompressor] = []
+        self._writers: dict[str, tuple[Any, list[str]]] = {}
+
+    def open(self, tables: list[str]) -> None:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        for table_name in tables:
+            if table_name not in self.schema.tables:
+                raise ValueError(f"Result contains table not defined in schema: {table_name}")
+
+        for table_name in tables:
+            columns = self.schema.tables[table_name].columns
+            path = self.output_dir / f"{table_name}.csv"
+            handle: IO[str] | _BackgroundCompressor
+            if self.compression is None:
+                handle = path.open("w", encoding="utf-8", newline="")
+            else:
+                path = path.with_name(path.name + CSV_COMPRESSIONS[self.compression])
+                handle = _BackgroundCompressor(path, self.compression)
+            writer = csv.writer(handle)
+            writer.writerow(columns)
+            self._handles.append(handle)
+            self._writers[table_name] = (writer, columns)
+            self.paths.append(path)
+
+    def add_row(self, table: str, row: dict[str, str]) -> None:
+        writer, columns = self._writers[table]
+        writer.writerow([row.get(column, "") for column in columns])
+
+    def write_table(self, table: str, rows: Table) -> None:
+        writer, columns = self._writers[table]
+        writer.writerows(iter_table_rows(rows, columns))
+
+    def close(self) -> None:
+        handles, self._handles = self._handles, []
+        errors = []
+        for handle in handles:
+            try:
+                handle.close()
+            except Exception as error:
+                errors.append(error)
+        if errors:
+            raise errors[0]
+
+
+class _BackgroundCompressor:
+    # Text file stand-in for one compressed CSV. The csv writer's output is
+    # gathered into blocks that a dedicated thread encodes, compresses and
+    # writes, so every table compresses in parallel with row formatting (zlib
+    # and zstd release the GIL while compressing).
+
+    def __init__(self, path: Path, compression: str) -> None:
+        if compression == "zstd":
+            self._compressor = import_zstandard().ZstdCompressor().compressobj()
+        else:
+            self._compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+        self._handle = path.open("wb")
+        self._queue: queue.Queue[str | None] = queue.Queue(maxsize=COMPRESSION_QUEUE_DEPTH)
+        self._pending: list[str] = []
+        self._pending_size = 0
+        self._error: BaseException | None = None
+        self._thread = threading.Thread(target=self._run, name=f"drugbank-compress-{path.name}", daemon=True)
+        self._thread.start()
+
+    def write(self, text: str) -> int:
+        self._pending.append(text)
+        self._pending_size += len(text)
+        if self._pending_size >= COMPRESSION_BLOCK_SIZE:
+            self._submit()
+        return len(text)
+
+    def close(self) -> None:
+        if self._pending:
+            self._submit()
+        self._queue.put(None)
+        self._thread.join()
+        self._handle.close()
+        if self._error is not None:
+            raise self._error
+
+    def _submit(self) -> None:
+        if self._error is not None:
+            raise self._error
+        self._queue.put("".join(self._pending))
+        self._pending = []
+        self._pending_size = 0
+
+    def _run(self) -> None:
+        # After a failure the queue is still drained so the writer never blocks.
+        while True:
+            block = self._queue.get()
+            if self._error is None:
+                try:
+                    if block is None:
+                        self._handle.write(self._compressor.flush())
+                    else:
+                        self._handle.write(self._compressor.compress(block.encode("utf-8")))
+                except BaseException as error:
+                    self._error = error
+            if block is None:
+                return
+
+
+class ArrowTableSink:
+    # Buffers up to row_group_size rows per table and writes them as one
+    # Parquet row group or Arrow IPC record batch of dictionary-encoded strings.
+
+    def __init__(
+        self,
+        outdir: str | Path,
+        format: str = "parquet",
+        schema: DrugBankSchema | None = None,
+        row_group_size: int = ROW_GROUP_SIZE,
+        compression: str = "zstd",
+    ) -> None:
+        if format not in ("parquet", "arrow"):
+            raise ValueError(f"Unsupported columnar format: {format}")
+        try:
+            import pyarrow
+        except ImportError as error:
+            raise ImportError(
+                "Parquet and Arrow output require pyarrow: pip install 'drugbank-parse[arrow]'"
+            ) from error
+
+        self._pa = pyarrow
+        self.output_dir = Path(outdir)
+        self.format = format
+        self.schema = schema if schema is not None else load_schema()
+        self.row_group_size = row_group_size
+        self.compression = compression
+        self.paths: list[Path] = []
+        self._tables: dict[str, _ArrowTableWriter] = {}
+
+    def open(self, tables: list[str]) -> None:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        for table_name in tables:
+            if table_name not in self.schema.tables:
+                raise ValueError(f"Result contains table not defined in schema: {table_name}")
+
+        for table_name in tables:
+            columns = self.schema.tables[table_name].columns
+            path = self.output_dir / f"{table_name}.{self.format}"
+            self._tables[table_name] = _ArrowTableWriter(self._pa, path, columns, self.format, self.compression)
+            self.paths.append(path)
+
+    def add_row(self, table: str, row: dict[str, str]) -> None:
+        writer = self._tables[table]
+        writer.append(row)
+        if writer.buffered >= self.row_group_size:
+            writer.flush()
+
+    def close(self) -> None:
+        for writer in self._tables.values():
+            writer.close()
+        self._tables = {}
+
+
+class _ArrowTableWriter:
+    def __init__(self, pa: Any, path: Path, columns: list[str], format: str, compression: str) -> None:
+        self._pa = pa
+        self.columns = columns
+        self.format = format
+        self.buffered = 0
+        self._values: list[list[str]] = [[] for _ in columns]
+        self._dictionaries: list[dict[str, int]] = [{} for _ in columns]
+        self._dictionary_arrays = [pa.array([], type=pa.string()) for _ in columns]
+        self._arrow_schema = pa.schema(
+            [(column, pa.dictionary(pa.int32(), pa.string())) for column in columns]
+        )
+        if format == "parquet":
+            import pyarrow.parquet as pq
+
+            self._writer = pq.ParquetWriter(
+                str(path),
+                self._arrow_schema,
+                compression=compression,
+                use_dictionary=True,
+            )
+        else:
+            import pyarrow.ipc as ipc
+
+            # IPC files accept only delta dictionaries across batches, so each
+            # column keeps one growing dictionary for the whole file; a batch
+            # converts only its new values and the writer emits them as a delta.
+            options = ipc.IpcWriteOptions(compression=compression, emit_dictionary_deltas=True)
+            self._writer = ipc.new_file(str(path), self._arrow_schema, options=options)
+
+    def append(self, row: dict[str, str]) -> None:
+        for values, column in zip(self._values, self.columns):
+            values.append(row.get(column, ""))
+        self.buffered += 1
+
+    def flush(self) -> None:
+        if not self.buffered:
+            return
+        pa = self._pa
+        arrays = []
+        for index, values in enumerate(self._values):
+            if self.format == "parquet":
+                arrays.append(pa.array(values, type=pa.string()).dictionary_encode())
+                continue
+            dictionary = self._dictionaries[index]
+            known = len(dictionary)
+            codes = [dictionary.setdefault(value, len(dictionary)) for value in values]
+            if len(dictionary) > known:
+                # Dicts iterate newest last, so the new values are read back
+                # without walking the whole dictionary.
+                added = list(islice(reversed(dictionary), len(dictionary) - known))[::-1]
+                self._dictionary_arrays[index] = pa.concat_arrays(
+                    [self._dictionary_arrays[index], pa.array(added, type=pa.string())]
+                )
+            arrays.append(
+                pa.DictionaryArray.from_arrays(pa.array(codes, type=pa.int32()), self._dictionary_arrays[index])
+            )
+        batch = pa.record_batch(arrays, schema=self._arrow_schema)
+        if self.format == "parquet":
+            self._writer.write_batch(batch, row_group_size=self.buffered)
+        else:
+            self._writer.write_batch(batch)
+        self._values = [[] for _ in self.columns]
+        self.buffered = 0
+
+    def close(self) -> None:
+        self.flush()
+        self._writer.close()
+
+
+class SqliteTableSink:
+    # Loads every table inside one transaction with syncing off, then builds
+    # the drug_id/target_id lookup indexes once at the end. The rollback
+    # journal stays on so abort() can undo a failed load.
+
+    def __init__(
+        self,
+        db_path: str | Path,
+        schema: DrugBankSchema | None = None,
+        batch_size: int = SQLITE_BATCH_SIZE,
+    ) -> None:
+        self.db_path = Path(db_path)
+        self.schema = schema if schema is not None else load_schema()
+        self.batch_size = batch_size
+        self.paths: list[Path] = []
+        self._connection: sqlite3.Connection | None = None
+        self._pending: dict[str, list[tuple[str, ...]]] = {}
+        self._statements: dict[str, tuple[str, list[str]]] = {}
+        self._created = False
+
+    def open(self, tables: list[str]) -> None:
+        for table_name in tables:
+            if table_name not in self.schema.tables:
+                raise ValueError(f"Result contains table not defined in schema: {table_name}")
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._created = not self.db_path.exists()
+        connection = sqlite3.connect(str(self.db_path), isolation_level=None)
+        for pragma in (
+            "synchronous = OFF",
+            "temp_store = MEMORY",
+            "cache_size = -262144",
+            "locking_mode = EXCLUSIVE",
+        ):
+            connection.execute(f"PRAGMA {pragma}")
+        connection.execute("BEGIN")
+        for table_name in tables:
+            table = self.schema.tables[table_name]
+            keys = table.keys or table.required
+            column_sql = ", ".join(f"{_quote(column)} TEXT NOT NULL" for column in table.columns)
+            key_sql = ", ".join(_quote(column) for column in keys)
+            connection.execute(f"DROP TABLE IF EXISTS {_quote(table_name)}")
+            connection.execute(f"CREATE TABLE {_quote(table_name)} ({column_sql}, PRIMARY KEY ({key_sql}))")
+            placeholders = ", ".join("?" for _ in table.columns)
+            # Repeated natural keys (the same target listed twice on a drug)
+            # carry identical rows, so the first one is kept.
+            self._statements[table_name] = (
+                f"INSERT OR IGNORE INTO {_quote(table_name)} VALUES ({placeholders})",
+                table.columns,
+            )
+            self._pending[table_name] = []
+        self._connection = connection
+        self.paths = [self.db_path]
+
+    def add_row(self, table: str, row: dict[str, str]) -> None:
+        pending = self._pending[table]
+        pending.append(tuple(row.get(column, "") for column in self._statements[table][1]))
+        if len(pending) >= self.batch_size:
+            self._flush(table)
+
+    def write_table(self, table: str, rows: Table) -> None:
+        self._flush(table)
+        statement, columns = self._statements[table]
+        self._connection.executemany(statement, iter_table_rows(rows, columns))
+
+    def close(self) -> None:
+        connection = self._connection
+        if connection is None:
+            return
+        self._connection = None
+        try:
+            for table_name in self._pending:
+                self._flush(table_name, connection)
+            for table_name in self._pending:
+                table = self.schema.tables[table_name]
+                leading_key = (table.keys or table.required)[0]
+                for column in SQLITE_INDEXED_COLUMNS:
+                    if column in table.columns and column != leading_key:
+                        connection.execute(
+                            f"CREATE INDEX {_quote(f'idx_{table_name}_{column}')} "
+                            f"ON {_quote(table_name)} ({_quote(column)})"
+                        )
+            connection.execute("COMMIT")
+            connection.execute("ANALYZE")
+        finally:
+            connection.close()
+
+    def abort(self) -> None:
+        # Called instead of close() when the parse fails: the load is rolled
+        # back and a database file this sink created is removed, so no partial
+        # database is left looking complete.
+        connection = self._connection
+        if connection is None:
+            return
+        self._connection = None
+        try:
+            connection.execute("ROLLBACK")
+        finally:
+            connection.close()
+            if self._created:
+                self.db_path.unlink(missing_ok=True)
+
+    def _flush(self, table: str, connection: sqlite3.Connection | None = None) -> None:
+        pending = self._pending[table]
+        if pending:
+            (connection or self._connection).executemany(self._statements[table][0], pending)
+            self._pending[table] = []
+
+
+def write_drugbank_sqlite(
+    source: ParseResult | str | Path,
+    db_path: str | Path,
+    profile: str = "core",
+    modules: list[str] | None = None,
+) -> Path:
+    sink = SqliteTableSink(db_path)
+    if isinstance(source, ParseResult):
+        _write_result(source, sink)
+    else:
+        from .parser import stream_drugbank_xml
+
+        stream_drugbank_xml(source, sink, profile=profile, modules=modules)
+    return sink.db_path
+
+
+def table_sink(
+    outdir: str | Path,
+    format: str = "csv",
+    schema: DrugBankSchema | None = None,
+    compression: str | None = None,
+) -> CsvTableSink | ArrowTableSink | SqliteTableSink:
+    if compression is not None and format != "csv":
+        raise ValueError(f"Compression applies to CSV output only, not {format}")
+    if format == "csv":
+        return CsvTableSink(outdir, schema=schema, compression=compression)
+    if format in ("parquet", "arrow"):
+        return ArrowTableSink(outdir, format=format, schema=schema)
+    if format == "sqlite":
+        return SqliteTableSink(Path(outdir) / SQLITE_FILENAME, schema=schema)
+    raise ValueError(f"Unknown output format: {format}")
 
 
 def write_drugbank_tables(
     result: ParseResult,
     outdir: str | Path,
+    format: str = "csv",
+    compression: str | None = None,
+    stats: ParseStats | None = None,
 ) -> list[Path]:
-    output_dir = Path(outdir)
-    output_dir.mkdir(parents=True, exist_ok=True)
-    schema = load_schema()
-
-    written: list[Path] = []
-    for table_name, rows in result.tables.items():
-        if table_name not in schema.tables:
-            raise ValueError(f"Result contains table not defined in schema: {table_name}")
-
-        table_schema = schema.tables[table_name]
-        path = output_dir / f"{table_name}.csv"
-        with path.open("w", encoding="utf-8", newline="") as handle:
-            writer = csv.DictWriter(handle, fieldnames=table_schema.columns, extrasaction="ignore")
-            writer.writeheader()
-            for row in rows:
-                writer.writerow({column: row.get(column, "") for column in table_schema.columns})
-        written.append(path)
-
-    return written
+    sink = table_sink(outdir, format=format, compression=compression)
+    _write_result(result, sink, stats)
+    return sink.paths
+
+
+def _write_result(result: ParseResult, sink: RowSink, stats: ParseStats | None = None) -> None:
+    # Sinks with write_table take whole tables as value tuples in column order,
+    # which skips building a dict per row of a columnar table.
+    write_table = getattr(sink, "write_table", None)
+    sink.open(list(result.tables))
+    try:
+        for table_name, rows in result.tables.items():
+            start = time.perf_counter()
+            if write_table is not None:
+                write_table(table_name, rows)
+            else:
+                for row in rows:
+                    sink.add_row(table_name, row)
+            if stats is not None:
+                stats.add_time(f"write.{table_name}", time.perf_counter() - start)
+    except BaseException:
+        abort_sink(sink)
+        raise
+    if stats is None:
+        sink.close()
+    else:
+        with stats.time("write.close"):
+            sink.close()
+
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
@@ -0,0 +1,303 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Any, Iterator, Union
+
+from lxml import etree
+
+from .models import DrugBankSchema, RecordSchema
+
+DRUGBANK_NS = "http://www.drugbank.ca"
+NS = {"db": DRUGBANK_NS}
+
+_STEP = re.compile(
+    r"^(?P<tag>[A-Za-z_][\w.-]*)"
+    r"(?:\[(?:@(?P<attr>[\w.-]+)|(?P<child>[\w.-]+))='(?P<value>[^']*)'\])?$"
+)
+
+
+def qualified(tag: str) -> str:
+    return f"{{{DRUGBANK_NS}}}{tag}"
+
+
+def element_text(node: Any) -> str:
+    if len(node) == 0:
+        text = node.text
+        return text.strip() if text else ""
+    return " ".join(node.itertext()).strip()
+
+
+@dataclass(frozen=True)
+class PathStep:
+    tag: str
+    attribute: tuple[str, str] | None = None
+    child_text: tuple[str, str] | None = None
+
+    def accepts(self, node: Any) -> bool:
+        if node.tag != self.tag:
+            return False
+        if self.attribute is not None:
+            name, value = self.attribute
+            return node.get(name) == value
+        if self.child_text is not None:
+            child_tag, value = self.child_text
+            for child in node.iterchildren(child_tag):
+                return element_text(child) == value
+            return False
+        return True
+
+
+class FieldPath:
+    # A compiled location path such as "polypeptide/gene-name",
+    # "drugbank-id[@primary='true']" or "polypeptide/@id", evaluated by plain
+    # child iteration instead of XPath.
+
+    def __init__(self, expression: str) -> None:
+        self.expression = expression
+        parts = [] if expression in ("", ".") else expression.split("/")
+        self.attribute: str | None = None
+        if parts and parts[-1].startswith("@"):
+            self.attribute = parts.pop()[1:]
+        if not parts:
+            raise ValueError(f"Field path must select at least one element: {expression!r}")
+        self.steps = tuple(_compile_step(part, expression) for part in parts)
+        self.plain = all(step.attribute is None and step.child_text is None for step in self.steps)
+
+    @property
+    def head(self) -> str:
+        return self.steps[0].tag
+
+    def matches(self, node: Any) -> Iterator[Any]:
+        # ``node`` is a child of the record element that already matched the
+        # first step's tag.
+        if self.plain and len(self.steps) == 2:
+            yield from node.iterchildren(self.steps[1].tag)
+            return
+        if not self.steps[0].accepts(node):
+            return
+        yield from _descend(node, self.steps, 1)
+
+    def first_value(self, node: Any) -> str | None:
+        if not self.steps[0].accepts(node):
+            return None
+        match = _first_match(node, self.steps, 1)
+        if match is None:
+            return None
+        if self.attribute is None:
+            return element_text(match)
+        return match.get(self.attribute, "")
+
+
+class RecordExtractor:
+    # Fills every field of one record in a single pass over the record
+    # element's children. Collections (e.g. the drug's targets) are gathered in
+    # the same pass.
+
+    def __init__(
+        self,
+        fields: dict[str, str],
+        collections: dict[str, str] | None = None,
+    ) -> None:
+        self.fields = list(fields)
+        self._fields_by_tag: dict[str, list[tuple[str, FieldPath]]] = {}
+        # Fields that are simply the text of a direct child skip path evaluation.
+        self._text_fields: dict[str, str] = {}
+        for name, expression in fields.items():
+            path = FieldPath(expression)
+            if path.plain and len(path.steps) == 1 and path.attribute is None and path.head not in self._text_fields:
+                self._text_fields[path.head] = name
+            else:
+                self._fields_by_tag.setdefault(path.head, []).append((name, path))
+
+        self.collections = list(collections or {})
+        self._collections_by_tag: dict[str, list[tuple[str, FieldPath]]] = {}
+        for name, expression in (collections or {}).items():
+            path = FieldPath(expression)
+            if path.attribute is not None:
+                raise ValueError(f"Collection path must select elements: {expression!r}")
+            self._collections_by_tag.setdefault(path.head, []).append((name, path))
+        # Filtering children by tag inside lxml avoids creating Python proxies
+        # for the many child elements no field reads.
+        self._tags = tuple(self.tags)
+
+    @property
+    def tags(self) -> set[str]:
+        return set(self._text_fields) | set(self._fields_by_tag) | set(self._collections_by_tag)
+
+    def extract(self, node: Any) -> tuple[dict[str, str], dict[str, list[Any]]]:
+        values = dict.fromkeys(self.fields, "")
+        found: set[str] = set()
+        collected: dict[str, list[Any]] = {name: [] for name in self.collections}
+        text_fields = self._text_fields
+        fields_by_tag = self._fields_by_tag
+        collections_by_tag = self._collections_by_tag
+
+        for child in node.iterchildren(*self._tags):
+            tag = child.tag
+            name = text_fields.get(tag)
+            if name is not None and name not in found:
+                values[name] = element_text(child)
+                found.add(name)
+            entries = fields_by_tag.get(tag)
+            if entries is not None:
+                for name, path in entries:
+                    if name in found:
+                        continue
+                    value = path.first_value(child)
+                    if value is not None:
+                        values[name] = value
+                        found.add(name)
+            groups = collections_by_tag.get(tag)
+            if groups is not None:
+                for name, path in groups:
+                    collected[name].extend(path.matches(child))
+        return values, collected
+
+
+class ColumnExtractor:
+    # Extracts a repeated flat child record (e.g. every drug-interaction of a
+    # drug) column by column with compiled XPath, so thousands of elements cost
+    # a few C-level queries instead of a Python loop each. Falls back to
+    # per-element extraction when columns do not line up (a missing field or
+    # mixed content) or the node is not an lxml element.
+    #
+    # The queries run on the record's container element (the first step of
+    # its path, e.g. drug-interactions), which the parent record's extractor
+    # collects while walking the parent's children.
+
+    def __init__(self, path: str, fields: dict[str, str]) -> None:
+        self.fields = list(fields)
+        self.record = RecordExtractor(fields)
+        self._path = FieldPath(path)
+        if len(self._path.steps) < 2 or not self._path.plain or self._path.attribute is not None:
+            raise ValueError(f"Column record path needs a plain container element: {path!r}")
+        element_xpath = _xpath(path.partition("/")[2])
+        self._count = etree.XPath(f"count({element_xpath})", namespaces=NS)
+        # Equal text node counts alone do not line the columns up: a missing
+        # field next to one whose text is split (by a comment or mixed content)
+        # gives as many text nodes as elements, with the values shifted across
+        # rows. They line up when, in addition, every element has text in
+        # every field.
+        complete = " and ".join(f"{_xpath(expression)}/text()" for expression in fields.values())
+        self._complete = etree.XPath(f"count({element_xpath}[{complete}])", namespaces=NS)
+        self._columns = [
+            etree.XPath(f"{element_xpath}/{_xpath(expression)}/text()", namespaces=NS, smart_strings=False)
+            for expression in fields.values()
+        ]
+
+    def extract(self, node: Any) -> dict[str, list[str]]:
+        containers = list(node.iterchildren(self._path.head))
+        if len(containers) == 1:
+            return self.extract_container(containers[0])
+        columns: dict[str, list[str]] = {name: [] for name in self.fields}
+        for container in containers:
+            for name, values in self.extract_container(container).items():
+                columns[name].extend(values)
+        return columns
+
+    def extract_container(self, container: Any) -> dict[str, list[str]]:
+        if isinstance(container, etree._Element):
+            count = int(self._count(container))
+            columns = [column(container) for column in self._columns]
+            if all(len(values) == count for values in columns) and int(self._complete(container)) == count:
+                return {
+                    name: [value.strip() for value in values]
+                    for name, values in zip(self.fields, columns)
+                }
+        return self.extract_elements(list(self._path.matches(container)))
+
+    def extract_elements(self, elements: list[Any]) -> dict[str, list[str]]:
+        columns: dict[str, list[str]] = {name: [] for name in self.fields}
+        for element in elements:
+            values, _ = self.record.extract(element)
+            for name in self.fields:
+                columns[name].append(values[name])
+        return columns
+
+
+Extractor = Union[RecordExtractor, ColumnExtractor]
+
+
+def build_record_extractors(
+    schema: DrugBankSchema,
+    records: list[str] | None = None,
+) -> dict[str, Extractor]:
+    selected = list(schema.records) if records is None else records
+    for name in selected:
+        if name not in schema.records:
+            raise ValueError(f"Unknown record: {name}")
+
+    # A parent record collects the elements of its nested child records, or
+    # the container element of flat ones, in its one pass over its children,
+    # so selecting more records never adds another walk over the parent.
+    extractors: dict[str, Extractor] = {}
+    for name in selected:
+        record = schema.records[name]
+        if record.parent is not None and is_flat_record(record):
+            extractors[name] = ColumnExtractor(record.path, record.fields)
+            continue
+        collections = {}
+        for child in selected:
+            child_record = schema.records[child]
+            if child_record.parent != name:
+                continue
+            flat = is_flat_record(child_record)
+            collections[child] = child_record.path.partition("/")[0] if flat else child_record.path
+        extractors[name] = RecordExtractor(record.fields, collections)
+    return extractors
+
+
+def validate_record(record: RecordSchema, fields: dict[str, str]) -> None:
+    for field_name, expression in record.fields.items():
+        if field_name not in fields:
+            raise ValueError(f"Record {record.name} uses field not defined in fields.yml: {field_name}")
+        FieldPath(expression)
+
+
+def is_flat_record(record: RecordSchema) -> bool:
+    # Column extraction needs plain single-element fields and a plain
+    # container step above the repeated element.
+    record_path = FieldPath(record.path)
+    if len(record_path.steps) < 2 or not record_path.plain:
+        return False
+    paths = [FieldPath(expression) for expression in record.fields.values()]
+    return all(path.plain and len(path.steps) == 1 and path.attribute is None for path in paths)
+
+
+def _compile_step(part: str, expression: str) -> PathStep:
+    match = _STEP.match(part)
+    if match is None:
+        raise ValueError(f"Unsupported field path step {part!r} in {expression!r}")
+    tag = qualified(match.group("tag"))
+    if match.group("attr"):
+        return PathStep(tag, attribute=(match.group("attr"), match.group("value")))
+    if match.group("child"):
+        return PathStep(tag, child_text=(qualified(match.group("child")), match.group("value")))
+    return PathStep(tag)
+
+
+def _descend(node: Any, steps: tuple[PathStep, ...], index: int) -> Iterator[Any]:
+    if index == len(steps):
+        yield node
+        return
+    step = steps[index]
+    for child in node.iterchildren(step.tag):
+        if step.accepts(child):
+            yield from _descend(child, steps, index + 1)
+
+
+def _first_match(node: Any, steps: tuple[PathStep, ...], index: int) -> Any:
+    if index == len(steps):
+        return node
+    step = steps[index]
+    for child in node.iterchildren(step.tag):
+        if step.accepts(child):
+            match = _first_match(child, steps, index + 1)
+            if match is not None:
+                return match
+    return None
+
+
+def _xpath(expression: str) -> str:
+    return "/".join(f"db:{part}" for part in expression.split("/"))
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+from typing import Any, Iterable, Mapping, Union
+
+from .extractors import FieldPath, element_text
+from .models import DRUG_GROUPS, DRUG_TYPES, DrugFilter
+
+Where = Union[DrugFilter, Mapping[str, Any]]
+
+_PATHS = {
+    "ids": "drugbank-id[@primary='true']",
+    "groups": "groups/group",
+    "target_organisms": "targets/target/organism",
+}
+_PRIMARY_ID = FieldPath(_PATHS["ids"])
+_GROUP = FieldPath(_PATHS["groups"])
+_TARGET_ORGANISM = FieldPath(_PATHS["target_organisms"])
+
+
+def drug_filter(where: Where | None) -> DrugFilter | None:
+    # Accepts a DrugFilter or a mapping of its field names to one value or a
+    # list of values, e.g. {"groups": "approved", "types": ["small molecule"]}.
+    if where is None or isinstance(where, DrugFilter):
+        selected = where
+    else:
+        unknown = sorted(set(where) - {"ids", "groups", "types", "target_organisms"})
+        if unknown:
+            raise ValueError(f"Unknown where key: {unknown[0]}")
+        selected = DrugFilter(**{name: _values(value) for name, value in where.items() if value is not None})
+    if selected is None or not selected.as_dict():
+        return None
+    for group in selected.groups or ():
+        if group not in DRUG_GROUPS:
+            raise ValueError(f"Unknown drug group: {group}")
+    for drug_type in selected.types or ():
+        if drug_type not in DRUG_TYPES:
+            raise ValueError(f"Unknown drug type: {drug_type}")
+    return selected
+
+
+def filter_paths(where: DrugFilter | None) -> list[str]:
+    # Element paths below <drug> the predicate reads; the type filter only
+    # needs the drug's own attribute.
+    if where is None:
+        return []
+    return [path for name, path in _PATHS.items() if getattr(where, name) is not None]
+
+
+class DrugPredicate:
+    # Evaluates a DrugFilter on a parsed <drug> element before any record
+    # extraction, cheapest check first: the type attribute, the primary id,
+    # the groups and finally the target organisms.
+
+    def __init__(self, where: DrugFilter) -> None:
+        self.where = where
+
+    def accepts(self, node: Any) -> bool:
+        where = self.where
+        if where.types is not None and node.get("type") not in where.types:
+            return False
+        if where.ids is not None and _primary_id(node) not in where.ids:
+            return False
+        if where.groups is not None and not _any_text(node, _GROUP, where.groups):
+            return False
+        if where.target_organisms is not None:
+            return _any_text(node, _TARGET_ORGANISM, where.target_organisms)
+        return True
+
+
+def _values(value: str | Iterable[str]) -> frozenset[str]:
+    return frozenset([value] if isinstance(value, str) else value)
+
+
+def _primary_id(node: Any) -> str | None:
+    for child in node.iterchildren(_PRIMARY_ID.head):
+        value = _PRIMARY_ID.first_value(child)
+        if value is not None:
+            return value
+    return None
+
+
+def _any_text(node: Any, path: FieldPath, values: frozenset[str]) -> bool:
+    for child in node.iterchildren(path.head):
+        for match in path.matches(child):
+            if element_text(match) in values:
+                return True
+    return False
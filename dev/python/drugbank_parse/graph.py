@@ -0,0 +1,271 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, fields
+from pathlib import Path
+from typing import Any, Iterable, Sequence, Union
+
+try:
+    import numpy as np
+except ImportError as error:
+    raise ImportError("The drug-target graph requires numpy: pip install 'drugbank-parse[graph]'") from error
+
+from .models import ColumnarTable, ParseResult, StringPool, Table
+
+GRAPH_VERSION = 1
+GRAPH_MANIFEST = "graph.json"
+
+Nodes = Union[int, Sequence[int], "np.ndarray"]
+
+
+@dataclass
+class DrugTargetGraph:
+    # Bipartite drug-target graph over dense ids: drug i is drug_ids[i] and
+    # target j is target_ids[j], both sorted. Edges are stored as CSR in both
+    # directions, the targets of drug i being
+    # drug_target_indices[drug_target_indptr[i]:drug_target_indptr[i + 1]],
+    # and optionally the drug-drug interactions as CSR over the same drug ids.
+    drug_ids: np.ndarray
+    target_ids: np.ndarray
+    drug_target_indptr: np.ndarray
+    drug_target_indices: np.ndarray
+    target_drug_indptr: np.ndarray
+    target_drug_indices: np.ndarray
+    interaction_indptr: np.ndarray | None = None
+    interaction_indices: np.ndarray | None = None
+
+    @property
+    def drug_count(self) -> int:
+        return len(self.drug_ids)
+
+    @property
+    def target_count(self) -> int:
+        return len(self.target_ids)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.drug_target_indices)
+
+    def drug_index(self, drug_ids: str | Iterable[str]) -> Any:
+        return _lookup(self.drug_ids, drug_ids, "drug")
+
+    def target_index(self, target_ids: str | Iterable[str]) -> Any:
+        return _lookup(self.target_ids, target_ids, "target")
+
+    def targets_of(self, drugs: Nodes) -> np.ndarray:
+        # Distinct targets of any of ``drugs``, as sorted dense ids.
+        return _neighbors(self.drug_target_indptr, self.drug_target_indices, drugs)
+
+    def drugs_of(self, targets: Nodes) -> np.ndarray:
+        return _neighbors(self.target_drug_indptr, self.target_drug_indices, targets)
+
+    def interacting_drugs(self, drugs: Nodes) -> np.ndarray:
+        indptr, indices = self._interactions()
+        return _neighbors(indptr, indices, drugs)
+
+    def drug_degree(self, drugs: Nodes | None = None) -> np.ndarray:
+        return _degree(self.drug_target_indptr, drugs)
+
+    def target_degree(self, targets: Nodes | None = None) -> np.ndarray:
+        return _degree(self.target_drug_indptr, targets)
+
+    def k_hop(
+        self,
+        drugs: Nodes = (),
+        targets: Nodes = (),
+        k: int = 1,
+        interactions: bool = False,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        # Drugs and targets within ``k`` edges of the start nodes, the start
+        # nodes included, as sorted dense ids. Each hop expands the whole
+        # frontier at once; with ``interactions`` a hop also follows
+        # drug-drug interactions.
+        if k < 0:
+            raise ValueError(f"k must be at least 0, got {k}")
+        interaction_csr = self._interactions() if interactions else None
+        drug_seen = np.zeros(self.drug_count, dtype=bool)
+        target_seen = np.zeros(self.target_count, dtype=bool)
+        drug_frontier = _nodes(drugs, self.drug_count, "drug")
+        target_frontier = _nodes(targets, self.target_count, "target")
+        drug_seen[drug_frontier] = True
+        target_seen[target_frontier] = True
+        for _ in range(k):
+            # Neighbors are marked in fresh masks rather than sorted, so each
+            # hop costs a few passes over the node arrays.
+            next_drugs = np.zeros(self.drug_count, dtype=bool)
+            next_targets = np.zeros(self.target_count, dtype=bool)
+            next_targets[_gather(self.drug_target_indptr, self.drug_target_indices, drug_frontier)] = True
+            next_drugs[_gather(self.target_drug_indptr, self.target_drug_indices, target_frontier)] = True
+            if interaction_csr is not None:
+                next_drugs[_gather(*interaction_csr, drug_frontier)] = True
+            next_drugs &= ~drug_seen
+            next_targets &= ~target_seen
+            drug_frontier = np.flatnonzero(next_drugs)
+            target_frontier = np.flatnonzero(next_targets)
+            if not len(drug_frontier) and not len(target_frontier):
+                break
+            drug_seen |= next_drugs
+            target_seen |= next_targets
+        return np.flatnonzero(drug_seen), np.flatnonzero(target_seen)
+
+    def save(self, path: str | Path) -> Path:
+        # One .npy file per array, so load() can memory-map each of them.
+        directory = Path(path)
+        directory.mkdir(parents=True, exist_ok=True)
+        arrays = {}
+        for field in fields(self):
+            value = getattr(self, field.name)
+            if value is not None:
+                np.save(directory / f"{field.name}.npy", value, allow_pickle=False)
+                arrays[field.name] = len(value)
+        manifest = {"version": GRAPH_VERSION, "arrays": arrays}
+        (directory / GRAPH_MANIFEST).write_text(json.dumps(manifest, indent=2) + "\n", encoding="utf-8")
+        return directory
+
+    @classmethod
+    def load(cls, path: str | Path, mmap: bool = True) -> "DrugTargetGraph":
+        directory = Path(path)
+        manifest = json.loads((directory / GRAPH_MANIFEST).read_text(encoding="utf-8"))
+        if manifest.get("version") != GRAPH_VERSION:
+            raise ValueError(f"Unsupported drug-target graph version in {directory}: {manifest.get('version')}")
+        mode = "r" if mmap else None
+        return cls(
+            **{
+                name: np.load(directory / f"{name}.npy", mmap_mode=mode, allow_pickle=False)
+                for name in manifest["arrays"]
+            }
+        )
+
+    def _interactions(self) -> tuple[np.ndarray, np.ndarray]:
+        if self.interaction_indptr is None or self.interaction_indices is None:
+            raise ValueError("Graph was built without interactions; pass interactions=True when building it")
+        return self.interaction_indptr, self.interaction_indices
+
+
+def build_drug_target_graph(result: ParseResult, interactions: bool = False) -> DrugTargetGraph:
+    # Columnar tables are read straight from their pool codes, so building
+    # runs in NumPy without decoding a row; row tables are coded first.
+    if "drug_target" not in result.tables:
+        raise KeyError("Drug-target graph needs the drug_target table; parse with the core module")
+    if interactions and "drug_interactions" not in result.tables:
+        raise KeyError("Interaction edges need the drug_interactions table; parse with the interactions module")
+
+    edges = result.tables["drug_target"]
+    drug_columns = [_column(edges, "drug_id")]
+    target_columns = [_column(edges, "target_id")]
+    if "drugs" in result.tables:
+        drug_columns.append(_column(result.tables["drugs"], "drug_id"))
+    if "targets" in result.tables:
+        target_columns.append(_column(result.tables["targets"], "target_id"))
+    if interactions:
+        pairs = result.tables["drug_interactions"]
+        drug_columns.extend([_column(pairs, "drug_id"), _column(pairs, "interacting_drug_id")])
+
+    drug_ids, drug_codes = _dense_ids(drug_columns)
+    target_ids, target_codes = _dense_ids(target_columns)
+    drug_target_indptr, drug_target_indices = _csr(drug_codes[0], target_codes[0], len(drug_ids))
+    target_drug_indptr, target_drug_indices = _csr(target_codes[0], drug_codes[0], len(target_ids))
+    graph = DrugTargetGraph(
+        drug_ids=drug_ids,
+        target_ids=target_ids,
+        drug_target_indptr=drug_target_indptr,
+        drug_target_indices=drug_target_indices,
+        target_drug_indptr=target_drug_indptr,
+        target_drug_indices=target_drug_indices,
+    )
+    if interactions:
+        graph.interaction_indptr, graph.interaction_indices = _csr(drug_codes[-2], drug_codes[-1], len(drug_ids))
+    return graph
+
+
+def _column(table: Table, column: str) -> tuple[np.ndarray, np.ndarray]:
+    # The column's distinct values and, per row, the position of its value.
+    if isinstance(table, ColumnarTable):
+        position = table.columns.index(column)
+        codes = np.frombuffer(table.codes[position], dtype=np.uintc)
+        values = table.pools[position].values
+    else:
+        pool = StringPool()
+        codes = np.fromiter((pool.code(row.get(column, "")) for row in table), dtype=np.int64, count=len(table))
+        values = pool.values
+    if not len(codes):
+        return np.array([], dtype=str), codes.astype(np.int64)
+    used, inverse = np.unique(codes, return_inverse=True)
+    return np.asarray(values, dtype=str)[used], inverse.reshape(-1)
+
+
+def _dense_ids(columns: list[tuple[np.ndarray, np.ndarray]]) -> tuple[np.ndarray, list[np.ndarray]]:
+    # Sorted distinct non-empty values across the columns, and each column's
+    # rows mapped onto them; empty values map to -1.
+    labels = np.unique(np.concatenate([values for values, _ in columns]))
+    labels = labels[labels != ""]
+    mapped = []
+    for values, codes in columns:
+        positions = np.searchsorted(labels, values).astype(np.int64)
+        positions[values == ""] = -1
+        mapped.append(positions[codes])
+    return labels, mapped
+
+
+def _csr(sources: np.ndarray, targets: np.ndarray, size: int) -> tuple[np.ndarray, np.ndarray]:
+    # Distinct edges grouped by source: indptr of size + 1 offsets and the
+    # sorted targets of each source.
+    keep = (sources >= 0) & (targets >= 0)
+    sources, targets = sources[keep], targets[keep]
+    order = np.lexsort((targets, sources))
+    sources, targets = sources[order], targets[order]
+    if len(sources):
+        distinct = np.ones(len(sources), dtype=bool)
+        distinct[1:] = (sources[1:] != sources[:-1]) | (targets[1:] != targets[:-1])
+        sources, targets = sources[distinct], targets[distinct]
+    indptr = np.zeros(size + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=size), out=indptr[1:])
+    return indptr, targets.astype(np.int32)
+
+
+def _lookup(labels: np.ndarray, ids: str | Iterable[str], kind: str) -> Any:
+    single = isinstance(ids, str)
+    wanted = np.asarray([ids] if single else list(ids), dtype=str)
+    positions = np.searchsorted(labels, wanted)
+    found = positions < len(labels)
+    found[found] = labels[positions[found]] == wanted[found]
+    if not found.all():
+        raise KeyError(f"Unknown {kind} ids: {', '.join(wanted[~found])}")
+    return int(positions[0]) if single else positions
+
+
+def _checked(nodes: Nodes, size: int, kind: str) -> np.ndarray:
+    array = np.asarray(nodes, dtype=np.int64).reshape(-1)
+    if len(array) and (array.min() < 0 or array.max() >= size):
+        raise IndexError(f"{kind} ids must be in 0..{size - 1}")
+    return array
+
+
+def _nodes(nodes: Nodes, size: int, kind: str) -> np.ndarray:
+    return np.unique(_checked(nodes, size, kind))
+
+
+def _neighbors(indptr: np.ndarray, indices: np.ndarray, nodes: Nodes) -> np.ndarray:
+    return np.unique(_gather(indptr, indices, _nodes(nodes, len(indptr) - 1, "node"))).astype(np.int64)
+
+
+def _gather(indptr: np.ndarray, indices: np.ndarray, nodes: np.ndarray) -> np.ndarray:
+    # Neighbors of ``nodes``, repeats included: every CSR row is sliced at
+    # once by offsetting one arange instead of looping over the rows.
+    if len(nodes) == 1:
+        node = int(nodes[0])
+        return indices[indptr[node] : indptr[node + 1]]
+    starts = indptr[nodes]
+    lengths = indptr[nodes + 1] - starts
+    total = int(lengths.sum())
+    if total == 0:
+        return indices[:0]
+    offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return indices[np.arange(total) + offsets]
+
+
+def _degree(indptr: np.ndarray, nodes: Nodes | None) -> np.ndarray:
+    degrees = np.diff(indptr)
+    if nodes is None:
+        return degrees
+    return degrees[_checked(nodes, len(indptr) - 1, "node")]
@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import BinaryIO, Iterable
+
+from .inputs import is_plain_xml, source_path
+from .models import ParseResult
+from .parser import parse_drug_records
+from .records import CHUNK_SIZE, iter_drug_spans, read_xml_header
+
+INDEX_SUFFIX = ".dbidx"
+INDEX_VERSION = 1
+
+_PRIMARY_ID = re.compile(rb"<drugbank-id\s+primary=[\"']true[\"']\s*>\s*([^<]*?)\s*</drugbank-id>")
+
+
+@dataclass(frozen=True)
+class IndexEntry:
+    offset: int
+    length: int
+    digest: str
+
+
+@dataclass
+class DrugIndex:
+    size: int
+    mtime_ns: int
+    sha256: str
+    header: bytes
+    entries: dict[str, IndexEntry] = field(default_factory=dict)
+
+    def matches(self, path: str | Path, verify: bool = False) -> bool:
+        # Size and mtime are enough by default: hashing the release costs about
+        # as much as rebuilding the index. ``verify`` also compares the sha256,
+        # which is stored mainly so the parse cache can reuse it as the input
+        # fingerprint.
+        stat = os.stat(path)
+        if stat.st_size != self.size or stat.st_mtime_ns != self.mtime_ns:
+            return False
+        return not verify or _file_sha256(path) == self.sha256
+
+    def ranges(self, drug_ids: Iterable[str]) -> list[tuple[int, int]]:
+        requested = list(dict.fromkeys(drug_ids))
+        missing = [drug_id for drug_id in requested if drug_id not in self.entries]
+        if missing:
+            raise KeyError(f"Drug ids not found in index: {', '.join(missing)}")
+        entries = sorted((self.entries[drug_id] for drug_id in requested), key=lambda entry: entry.offset)
+        return [(entry.offset, entry.offset + entry.length) for entry in entries]
+
+    def save(self, path: str | Path) -> Path:
+        index_path = Path(path)
+        data = {
+            "version": INDEX_VERSION,
+            "size": self.size,
+            "mtime_ns": self.mtime_ns,
+            "sha256": self.sha256,
+            "header": self.header.decode("latin-1"),
+            "entries": {
+                drug_id: [entry.offset, entry.length, entry.digest]
+                for drug_id, entry in self.entries.items()
+            },
+        }
+        tmp_path = index_path.with_name(index_path.name + ".tmp")
+        tmp_path.write_text(json.dumps(data, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp_path, index_path)
+        return index_path
+
+    @classmethod
+    def load(cls, path: str | Path) -> "DrugIndex":
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+        if data.get("version") != INDEX_VERSION:
+            raise ValueError(f"Unsupported drug index version in {path}: {data.get('version')}")
+        return cls(
+            size=int(data["size"]),
+            mtime_ns=int(data["mtime_ns"]),
+            sha256=data["sha256"],
+            header=data["header"].encode("latin-1"),
+            entries={
+                drug_id: IndexEntry(offset, length, digest)
+                for drug_id, (offset, length, digest) in data["entries"].items()
+            },
+        )
+
+
+def default_index_path(xml_path: str | Path) -> Path:
+    path = Path(xml_path)
+    return path.with_name(path.name + INDEX_SUFFIX)
+
+
+def build_drug_index(
+    xml_path: str | Path,
+    index_path: str | Path | None = None,
+    save: bool = True,
+) -> DrugIndex:
+    path = source_path(xml_path)
+    if not is_plain_xml(path):
+        raise ValueError(f"Drug indexes store byte offsets and need an uncompressed XML file: {path}")
+
+    stat = path.stat()
+    entries: dict[str, IndexEntry] = {}
+    with path.open("rb") as raw, path.open("rb") as records:
+        handle = _HashingReader(raw)
+        header = read_xml_header(handle)
+        for offset, length in iter_drug_spans(handle):
+            records.seek(offset)
+            record = records.read(length)
+            match = _PRIMARY_ID.search(record)
+            if match is None:
+                continue
+            drug_id = match.group(1).decode("utf-8")
+            digest = hashlib.blake2b(record, digest_size=16).hexdigest()
+            entries.setdefault(drug_id, IndexEntry(offset, length, digest))
+
+    index = DrugIndex(
+        size=stat.st_size,
+        mtime_ns=stat.st_mtime_ns,
+        sha256=handle.hexdigest(),
+        header=header,
+        entries=entries,
+    )
+    if save:
+        index.save(index_path if index_path is not None else default_index_path(path))
+    return index
+
+
+def load_drug_index(
+    xml_path: str | Path,
+    index_path: str | Path | None = None,
+    verify: bool = False,
+) -> DrugIndex | None:
+    path = Path(index_path) if index_path is not None else default_index_path(xml_path)
+    if not path.exists():
+        return None
+    try:
+        index = DrugIndex.load(path)
+    except (OSError, ValueError, KeyError):
+        return None
+    return index if index.matches(xml_path, verify=verify) else None
+
+
+def ensure_drug_index(
+    xml_path: str | Path,
+    index_path: str | Path | None = None,
+) -> DrugIndex:
+    index = load_drug_index(xml_path, index_path)
+    if index is None:
+        index = build_drug_index(xml_path, index_path)
+    return index
+
+
+def lookup_drugs(
+    xml_path: str | Path,
+    drug_ids: Iterable[str],
+    profile: str = "core",
+    modules: list[str] | None = None,
+    index: DrugIndex | None = None,
+    layout: str = "columnar",
+) -> ParseResult:
+    path = Path(xml_path)
+    if not path.exists():
+        raise FileNotFoundError(f"Input XML file does not exist: {path}")
+    drug_index = index if index is not None else ensure_drug_index(path)
+
+    return parse_drug_records(
+        path,
+        drug_index.ranges(drug_ids),
+        profile=profile,
+        modules=modules,
+        header=drug_index.header,
+        layout=layout,
+    )
+
+
+def _file_sha256(path: str | Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class _HashingReader:
+    # Hashes every byte the span scanner reads, so building the index costs a
+    # single pass over the file. The scanner rewinds to 0 before reading.
+
+    def __init__(self, handle: BinaryIO) -> None:
+        self._handle = handle
+        self._hash = hashlib.sha256()
+
+    def seek(self, offset: int) -> None:
+        if offset != 0:
+            raise ValueError("Hashing reader can only rewind to the start of the file")
+        self._handle.seek(0)
+        self._hash = hashlib.sha256()
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._handle.read(size)
+        self._hash.update(data)
+        return data
+
+    def hexdigest(self) -> str:
+        return self._hash.hexdigest()
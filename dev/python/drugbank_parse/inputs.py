@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import bz2
+import gzip
+import lzma
+import os
+import queue
+import threading
+import zipfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any, Iterator, Union
+
+if TYPE_CHECKING:
+    from .progress import ProgressMeter
+
+XmlSource = Union[str, Path, IO[bytes]]
+
+COMPRESSED_SUFFIXES = (".gz", ".bz2", ".xz", ".zst", ".zip")
+PREFETCH_CHUNK_SIZE = 1024 * 1024
+PREFETCH_DEPTH = 8
+
+
+def is_path_source(source: Any) -> bool:
+    return isinstance(source, (str, os.PathLike))
+
+
+def is_plain_xml(source: Any) -> bool:
+    return is_path_source(source) and Path(source).suffix.lower() not in COMPRESSED_SUFFIXES
+
+
+def source_path(source: str | Path) -> Path:
+    path = Path(source)
+    if not path.exists():
+        raise FileNotFoundError(f"Input XML file does not exist: {path}")
+    return path
+
+
+@contextmanager
+def open_xml_source(
+    source: XmlSource,
+    prefetch: bool = True,
+    progress: ProgressMeter | None = None,
+) -> Iterator[IO[bytes]]:
+    # File objects belong to the caller and are read as-is, never closed.
+    # ``progress`` follows the offset into the file on disk, before any
+    # decompression.
+    if not is_path_source(source):
+        yield source if progress is None else progress.reader(source)
+        return
+
+    path = source_path(source)
+    suffix = path.suffix.lower()
+    with path.open("rb") as handle:
+        if progress is not None:
+            progress.track(handle.tell, path.stat().st_size)
+        if suffix not in COMPRESSED_SUFFIXES:
+            yield handle
+            return
+
+        with _open_compressed(handle, path, suffix) as raw:
+            if not prefetch:
+                yield raw
+                return
+            reader = PrefetchReader(raw)
+            try:
+                yield reader
+            finally:
+                reader.close()
+
+
+class PrefetchReader:
+    # Reads ``raw`` on a background thread into a bounded queue, so
+    # decompression (zlib, bz2, lzma and zstd release the GIL) overlaps with
+    # XML parsing and record extraction on the calling thread.
+
+    def __init__(
+        self,
+        raw: IO[bytes],
+        chunk_size: int = PREFETCH_CHUNK_SIZE,
+        depth: int = PREFETCH_DEPTH,
+    ) -> None:
+        self._queue: queue.Queue[bytes | BaseException] = queue.Queue(maxsize=depth)
+        self._stop = threading.Event()
+        self._view = memoryview(b"")
+        self._position = 0
+        self._done = False
+        self._thread = threading.Thread(
+            target=self._fill,
+            args=(raw, chunk_size),
+            name="drugbank-prefetch",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            return b"".join(iter(lambda: self.read(PREFETCH_CHUNK_SIZE), b""))
+        while self._position >= len(self._view) and not self._done:
+            item = self._queue.get()
+            if isinstance(item, BaseException):
+                self._done = True
+                raise item
+            if not item:
+                self._done = True
+            self._view = memoryview(item)
+            self._position = 0
+        data = bytes(self._view[self._position : self._position + size])
+        self._position += len(data)
+        return data
+
+    def close(self) -> None:
+        self._stop.set()
+        while self._thread.is_alive():
+            try:
+                self._queue.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        self._thread.join()
+
+    def _fill(self, raw: IO[bytes], chunk_size: int) -> None:
+        try:
+            while not self._stop.is_set():
+                chunk = raw.read(chunk_size)
+                self._put(chunk)
+                if not chunk:
+                    return
+        except BaseException as error:
+            self._put(error)
+
+    def _put(self, item: bytes | BaseException) -> None:
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+
+@contextmanager
+def _open_compressed(handle: IO[bytes], path: Path, suffix: str) -> Iterator[IO[bytes]]:
+    if suffix == ".zip":
+        with zipfile.ZipFile(handle) as archive:
+            with archive.open(_zip_member(archive, path)) as member:
+                yield member
+    elif suffix == ".zst":
+        zstandard = import_zstandard()
+        with zstandard.ZstdDecompressor().stream_reader(handle, closefd=False) as member:
+            yield member
+    elif suffix == ".gz":
+        with gzip.GzipFile(fileobj=handle, mode="rb") as member:
+            yield member
+    else:
+        opener = {".bz2": bz2.BZ2File, ".xz": lzma.LZMAFile}[suffix]
+        with opener(handle, "rb") as member:
+            yield member
+
+
+def _zip_member(archive: zipfile.ZipFile, path: Path) -> zipfile.ZipInfo:
+    members = [
+        info
+        for info in archive.infolist()
+        if not info.is_dir() and info.filename.lower().endswith(".xml")
+    ]
+    if len(members) != 1:
+        raise ValueError(f"Expected exactly one XML file in {path}, found {len(members)}")
+    return members[0]
+
+
+def import_zstandard() -> Any:
+    try:
+        import zstandard
+    except ImportError as error:
+        raise ImportError(
+            "Reading or writing .zst files requires zstandard. Install it with: pip install 'drugbank-parse[zstd]'"
+        ) from error
+    return zstandard
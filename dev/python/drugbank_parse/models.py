@@ -1,6 +1,30 @@
 from __future__ import annotations
 
+import sys
+from array import array
 from dataclasses import dataclass, field
+from typing import Any, Iterable, Iterator, Sequence, Union
+
+PARSE_LAYOUTS = ("columnar", "rows")
+# Rows decoded per block when reading a columnar table back as rows.
+DECODE_BLOCK_SIZE = 64 * 1024
+DRUG_GROUPS = (
+    "approved",
+    "experimental",
+    "illicit",
+    "investigational",
+    "nutraceutical",
+    "vet_approved",
+    "withdrawn",
+)
+DRUG_TYPES = ("small molecule", "biotech")
+PARSE_ENGINES = ("lxml", "expat", "sax")
+
+
+@dataclass(frozen=True)
+class JoinSchema:
+    base: str
+    lookups: dict[str, list[str]]
 
 
 @dataclass(frozen=True)
@@ -9,6 +33,18 @@ class TableSchema:
     description: str
     columns: list[str]
     required: list[str]
+    keys: list[str] = field(default_factory=list)
+    storage: str = "rows"
+    pools: dict[str, str] = field(default_factory=dict)
+    join: JoinSchema | None = None
+
+
+@dataclass(frozen=True)
+class RecordSchema:
+    name: str
+    path: str
+    fields: dict[str, str]
+    parent: str | None = None
 
 
 @dataclass(frozen=True)
@@ -16,16 +52,408 @@ class DrugBankSchema:
     version: int
     tables: dict[str, TableSchema]
     fields: dict[str, str]
+    records: dict[str, RecordSchema] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class DrugFilter:
+    # A drug is kept when it passes every predicate that is set; a predicate
+    # passes when any of its values matches. target_organisms matches the
+    # organism of any of the drug's targets.
+    ids: frozenset[str] | None = None
+    groups: frozenset[str] | None = None
+    types: frozenset[str] | None = None
+    target_organisms: frozenset[str] | None = None
+
+    def as_dict(self) -> dict[str, list[str]]:
+        return {
+            name: sorted(values)
+            for name, values in (
+                ("ids", self.ids),
+                ("groups", self.groups),
+                ("types", self.types),
+                ("target_organisms", self.target_organisms),
+            )
+            if values is not None
+        }
+
+
+@dataclass(frozen=True)
+class ParseProgress:
+    # Byte offsets count the input as stored on disk, so compressed releases
+    # report compressed bytes. total_bytes is None for file objects.
+    bytes_read: int
+    total_bytes: int | None
+    drugs: int
+    elapsed_seconds: float
+    done: bool = False
+
+    @property
+    def percent(self) -> float | None:
+        if not self.total_bytes:
+            return None
+        return min(100.0, 100.0 * self.bytes_read / self.total_bytes)
+
+    @property
+    def mb_per_second(self) -> float:
+        return self.bytes_read / (1024 * 1024) / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+    @property
+    def drugs_per_second(self) -> float:
+        return self.drugs / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+    @property
+    def eta_seconds(self) -> float | None:
+        if self.done:
+            return 0.0
+        if not self.total_bytes or not self.bytes_read:
+            return None
+        remaining = max(0, self.total_bytes - self.bytes_read)
+        return remaining * self.elapsed_seconds / self.bytes_read
+
+
+class StringPool:
+    def __init__(self, strings: dict[str, str] | None = None) -> None:
+        self.values: list[str] = []
+        self._codes: dict[str, int] = {}
+        self._strings = strings
+
+    @classmethod
+    def from_values(cls, values: list[str]) -> "StringPool":
+        pool = cls()
+        pool.__setstate__(values)
+        return pool
+
+    def code(self, value: str) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            if self._strings is not None:
+                value = self._strings.setdefault(value, value)
+            code = len(self.values)
+            self._codes[value] = code
+            self.values.append(value)
+        return code
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __sizeof__(self) -> int:
+        return object.__sizeof__(self) + sys.getsizeof(self.values) + sys.getsizeof(self._codes)
+
+    def __getstate__(self) -> list[str]:
+        return self.values
+
+    def __setstate__(self, values: list[str]) -> None:
+        self.values = values
+        self._codes = {value: code for code, value in enumerate(values)}
+        self._strings = None
+
+
+class ColumnarTable:
+    # Rows stored as one array of pool codes per column, so a table of millions
+    # of rows costs a few bytes per cell plus each distinct string once. Columns
+    # mapped to the same pool name share their strings.
+
+    def __init__(
+        self,
+        columns: list[str],
+        pools: dict[str, str] | None = None,
+        shared_pools: dict[str, StringPool] | None = None,
+        strings: dict[str, str] | None = None,
+    ) -> None:
+        # Named pools come from ``shared_pools`` when given, so several tables
+        # of one result can share e.g. a single pool of drug ids. New pool
+        # values are interned through ``strings``.
+        self.columns = list(columns)
+        shared = {} if shared_pools is None else shared_pools
+        self.pools = []
+        for column in self.columns:
+            pool_name = (pools or {}).get(column)
+            if pool_name is None:
+                self.pools.append(StringPool(strings))
+            else:
+                self.pools.append(shared.setdefault(pool_name, StringPool(strings)))
+        self.codes = [array("I") for _ in self.columns]
+
+    def append(self, row: dict[str, str]) -> None:
+        for codes, pool, column in zip(self.codes, self.pools, self.columns):
+            codes.append(pool.code(row.get(column, "")))
+
+    def extend(self, rows: Iterable[dict[str, str]]) -> None:
+        for row in rows:
+            self.append(row)
+
+    def iter_rows(self, columns: Sequence[str] | None = None) -> Iterator[tuple[str, ...]]:
+        # Value tuples in ``columns`` order (columns the table lacks read as
+        # ""), decoded a block of rows at a time without building row dicts.
+        selected = self.columns if columns is None else list(columns)
+        positions = {column: index for index, column in enumerate(self.columns)}
+        total = len(self)
+        for start in range(0, total, DECODE_BLOCK_SIZE):
+            end = min(start + DECODE_BLOCK_SIZE, total)
+            block = []
+            for column in selected:
+                index = positions.get(column)
+                if index is None:
+                    block.append([""] * (end - start))
+                else:
+                    block.append(list(map(self.pools[index].values.__getitem__, self.codes[index][start:end])))
+            yield from zip(*block)
+
+    def __len__(self) -> int:
+        return len(self.codes[0]) if self.codes else 0
+
+    def __iter__(self) -> Iterator[dict[str, str]]:
+        columns = self.columns
+        for values in self.iter_rows():
+            yield dict(zip(columns, values))
+
+    def __getitem__(self, index: int | slice) -> Any:
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(len(self)))]
+        return {
+            column: pool.values[codes[index]]
+            for column, pool, codes in zip(self.columns, self.pools, self.codes)
+        }
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (ColumnarTable, JoinedTable, list)):
+            return len(self) == len(other) and all(left == right for left, right in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"ColumnarTable(columns={self.columns!r}, rows={len(self)})"
+
+
+class TableJoin:
+    # Compiled join of a virtual table: one output row per base row, each
+    # column taken from the base table when it has it, otherwise from the first
+    # lookup table that does. Lookups are hash maps on their join keys keeping
+    # the first row per key; unmatched lookups read as "".
+
+    def __init__(self, name: str, schema: DrugBankSchema) -> None:
+        table = schema.tables[name]
+        if table.join is None:
+            raise ValueError(f"Table {name} is not defined as a join")
+        self.name = name
+        self.columns = list(table.columns)
+        self.base = table.join.base
+        base_columns = schema.tables[self.base].columns
+
+        self.lookups: list[tuple[str, list[str], list[str]]] = []
+        sources: dict[str, tuple[int, str]] = {}
+        for column in self.columns:
+            if column in base_columns:
+                sources[column] = (0, column)
+        for lookup, keys in table.join.lookups.items():
+            values = [
+                column
+                for column in self.columns
+                if column not in sources and column in schema.tables[lookup].columns
+            ]
+            for column in values:
+                sources[column] = (len(self.lookups) + 1, column)
+            self.lookups.append((lookup, list(keys), values))
+
+        self.base_columns = [column for column in self.columns if sources.get(column, (None,))[0] == 0]
+        for _, keys, _ in self.lookups:
+            self.base_columns.extend(key for key in keys if key not in self.base_columns)
+        self._key_positions = [
+            [self.base_columns.index(key) for key in keys] for _, keys, _ in self.lookups
+        ]
+        self._defaults = [("",) * len(values) for _, _, values in self.lookups]
+        self._plan = []
+        for column in self.columns:
+            source, name = sources[column]
+            if source == 0:
+                self._plan.append((0, self.base_columns.index(name)))
+            else:
+                self._plan.append((source, self.lookups[source - 1][2].index(name)))
+
+    @property
+    def tables(self) -> list[str]:
+        return [self.base] + [lookup for lookup, _, _ in self.lookups]
+
+    def new_maps(self) -> list[dict[tuple[str, ...], tuple[str, ...]]]:
+        return [{} for _ in self.lookups]
+
+    def remember(self, maps: list[dict], table: str, values: Sequence[str]) -> None:
+        # ``values`` are the lookup's keys followed by the columns it supplies.
+        for position, (lookup, keys, _) in enumerate(self.lookups):
+            if lookup == table:
+                maps[position].setdefault(tuple(values[: len(keys)]), tuple(values[len(keys) :]))
+
+    def lookup_columns(self, table: str) -> list[str]:
+        for lookup, keys, values in self.lookups:
+            if lookup == table:
+                return keys + values
+        return []
+
+    def build_maps(self, tables: dict[str, "Table"]) -> list[dict]:
+        maps = self.new_maps()
+        for lookup, keys, values in self.lookups:
+            for row in iter_table_rows(tables.get(lookup, []), keys + values):
+                self.remember(maps, lookup, row)
+        return maps
+
+    def join_row(self, base: Sequence[str], maps: list[dict]) -> tuple[str, ...]:
+        sources = [base]
+        for positions, lookup, default in zip(self._key_positions, maps, self._defaults):
+            sources.append(lookup.get(tuple([base[position] for position in positions]), default))
+        return tuple([sources[source][position] for source, position in self._plan])
+
+
+class JoinedTable:
+    # Virtual table computed from the other tables of a result whenever it is
+    # read, so its rows are never stored.
+
+    def __init__(self, join: TableJoin, tables: dict[str, "Table"]) -> None:
+        self.join = join
+        self.columns = join.columns
+        self._tables = tables
+
+    def append(self, row: dict[str, str]) -> None:
+        raise ValueError(f"Table {self.join.name} is joined from {self.join.base} and does not store rows")
+
+    def iter_rows(self, columns: Sequence[str] | None = None) -> Iterator[tuple[str, ...]]:
+        join = self.join
+        maps = join.build_maps(self._tables)
+        base = iter_table_rows(self._tables.get(join.base, []), join.base_columns)
+        if columns is None or list(columns) == self.columns:
+            for values in base:
+                yield join.join_row(values, maps)
+            return
+        positions = {column: index for index, column in enumerate(self.columns)}
+        picks = [positions.get(column) for column in columns]
+        for values in base:
+            row = join.join_row(values, maps)
+            yield tuple(["" if pick is None else row[pick] for pick in picks])
+
+    def __len__(self) -> int:
+        return len(self._tables.get(self.join.base, []))
+
+    def __iter__(self) -> Iterator[dict[str, str]]:
+        columns = self.columns
+        for values in self.iter_rows():
+            yield dict(zip(columns, values))
+
+    def __getitem__(self, index: int | slice) -> Any:
+        rows = list(self)
+        return rows[index]
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (ColumnarTable, JoinedTable, list)):
+            return len(self) == len(other) and all(left == right for left, right in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"JoinedTable(name={self.join.name!r}, base={self.join.base!r}, rows={len(self)})"
+
+
+Table = Union[list[dict[str, str]], ColumnarTable, JoinedTable]
 
 
 @dataclass
 class ParseResult:
-    tables: dict[str, list[dict[str, str]]] = field(default_factory=dict)
+    tables: dict[str, Table] = field(default_factory=dict)
+    # Every distinct value stored in row tables, so rows repeating the same
+    # drug name, indication or source (or rows decoded from a cache or merged
+    # from worker shards) reference one string object instead of copies.
+    strings: dict[str, str] = field(default_factory=dict, repr=False, compare=False)
+    pools: dict[str, StringPool] = field(default_factory=dict, repr=False, compare=False)
+
+    @classmethod
+    def for_tables(
+        cls,
+        tables: list[str],
+        schema: DrugBankSchema,
+        layout: str = "columnar",
+    ) -> "ParseResult":
+        # The "rows" layout keeps plain lists of row dicts except for tables
+        # whose schema storage is columnar.
+        if layout not in PARSE_LAYOUTS:
+            raise ValueError(f"Unknown parse layout: {layout}")
+        result = cls()
+        for table in tables:
+            table_schema = schema.tables[table]
+            if table_schema.join is not None:
+                result.tables[table] = JoinedTable(TableJoin(table, schema), result.tables)
+            elif layout == "columnar" or table_schema.storage == "columnar":
+                result.tables[table] = ColumnarTable(
+                    table_schema.columns,
+                    table_schema.pools,
+                    shared_pools=result.pools,
+                    strings=result.strings,
+                )
+            else:
+                result.tables[table] = []
+        return result
+
+    def open(self, tables: list[str]) -> None:
+        for table in tables:
+            self.tables.setdefault(table, [])
 
     def add_row(self, table: str, row: dict[str, str]) -> None:
-        if table not in self.tables:
+        rows = self.tables.get(table)
+        if rows is None:
             raise KeyError(f"Table is not enabled for this parse result: {table}")
-        self.tables[table].append(row)
+        if isinstance(rows, list):
+            strings = self.strings
+            rows.append({column: strings.setdefault(value, value) for column, value in row.items()})
+        else:
+            rows.append(row)
 
-    def rows(self, table: str) -> list[dict[str, str]]:
+    def rows(self, table: str) -> Table:
         return self.tables.get(table, [])
+
+    def close(self) -> None:
+        pass
+
+    def memory_usage(self) -> dict[str, dict[str, int]]:
+        # Approximate bytes per table: "structure" for lists, row dicts, code
+        # arrays and string pools, "strings" for the distinct string objects the
+        # table references. "total" counts pools and strings shared between
+        # tables once. Joined tables hold no rows of their own.
+        usage: dict[str, dict[str, int]] = {}
+        all_strings: dict[int, int] = {}
+        all_pools: dict[int, int] = {}
+        total_structure = 0
+        for name, rows in self.tables.items():
+            strings: dict[int, int] = {}
+            structure = sys.getsizeof(rows)
+            if isinstance(rows, ColumnarTable):
+                structure += sum(sys.getsizeof(codes) for codes in rows.codes)
+                total_structure += structure
+                pools = {id(pool): pool for pool in rows.pools}
+                for key, pool in pools.items():
+                    all_pools[key] = sys.getsizeof(pool)
+                    structure += all_pools[key]
+                    _add_strings(strings, pool.values)
+            elif isinstance(rows, list):
+                for row in rows:
+                    structure += sys.getsizeof(row)
+                    _add_strings(strings, row.values())
+                total_structure += structure
+            else:
+                total_structure += structure
+            all_strings.update(strings)
+            usage[name] = {"rows": len(rows), "structure": structure, "strings": sum(strings.values())}
+        usage["total"] = {
+            "rows": sum(entry["rows"] for entry in usage.values()),
+            "structure": total_structure + sum(all_pools.values()),
+            "strings": sum(all_strings.values()),
+        }
+        return usage
+
+
+def iter_table_rows(rows: Table, columns: Sequence[str]) -> Iterator[tuple[str, ...]]:
+    if isinstance(rows, list):
+        return (tuple([row.get(column, "") for column in columns]) for row in rows)
+    return rows.iter_rows(columns)
+
+
+def _add_strings(sizes: dict[int, int], values: Iterable[Any]) -> None:
+    for value in values:
+        key = id(value)
+        if key not in sizes:
+            sizes[key] = sys.getsizeof(value)
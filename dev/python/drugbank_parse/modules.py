@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+from typing import Any, Callable
+
+from .extractors import Extractor
+from .sinks import RowSink
+
+SOURCE = "DrugBank"
+
+# Emits one module's rows for one drug. Receives the drug record's field
+# values, the child elements the drug extractor collected for every selected
+# record (a flat record such as "interaction" collects its container element),
+# the sink and the record extractors. The records and tables a module needs
+# are declared for it in profiles.yml.
+ModuleHandler = Callable[[dict[str, str], dict[str, list[Any]], RowSink, dict[str, Extractor]], None]
+
+_HANDLERS: dict[str, ModuleHandler] = {}
+
+
+def register_module(name: str) -> Callable[[ModuleHandler], ModuleHandler]:
+    def decorator(handler: ModuleHandler) -> ModuleHandler:
+        _HANDLERS[name] = handler
+        return handler
+
+    return decorator
+
+
+def module_handlers(modules: list[str]) -> list[tuple[str, ModuleHandler]]:
+    for name in modules:
+        if name not in _HANDLERS:
+            raise ValueError(f"No handler registered for module: {name}")
+    return [(name, _HANDLERS[name]) for name in modules]
+
+
+@register_module("core")
+def emit_core_rows(
+    drug: dict[str, str],
+    collected: dict[str, list[Any]],
+    sink: RowSink,
+    extractors: dict[str, Extractor],
+) -> None:
+    drug_id = drug["drug_id"]
+    sink.add_row(
+        "drugs",
+        {
+            "drug_id": drug_id,
+            "drug_name": drug["drug_name"],
+            "inchi": drug["inchi"],
+            "source": SOURCE,
+        },
+    )
+    sink.add_row(
+        "drug_indication",
+        {
+            "drug_id": drug_id,
+            "indication": drug["indication"],
+            "source": SOURCE,
+        },
+    )
+
+    target_extractor = extractors["target"]
+    for target_node in collected["target"]:
+        target, _ = target_extractor.extract(target_node)
+        target_id = target["target_id"]
+        if not target_id:
+            continue
+
+        sink.add_row(
+            "targets",
+            {
+                "target_id": target_id,
+                "target_name": target["target_name"],
+                "gene_name": target["gene_name"],
+                "organism": target["organism"],
+                "source": SOURCE,
+            },
+        )
+        sink.add_row(
+            "drug_target",
+            {
+                "drug_id": drug_id,
+                "target_id": target_id,
+                "source": SOURCE,
+            },
+        )
+
+
+@register_module("interactions")
+def emit_interaction_rows(
+    drug: dict[str, str],
+    collected: dict[str, list[Any]],
+    sink: RowSink,
+    extractors: dict[str, Extractor],
+) -> None:
+    drug_id = drug["drug_id"]
+    extractor = extractors["interaction"]
+    for container in collected["interaction"]:
+        columns = extractor.extract_container(container)
+        for interacting_drug_id, description in zip(columns["interacting_drug_id"], columns["description"]):
+            if not interacting_drug_id:
+                continue
+            sink.add_row(
+                "drug_interactions",
+                {
+                    "drug_id": drug_id,
+                    "interacting_drug_id": interacting_drug_id,
+                    "description": description,
+                    "source": SOURCE,
+                },
+            )
@@ -1,152 +1,414 @@
 from __future__ import annotations
 
+import os
+import time
+from collections import deque
 from pathlib import Path
+from typing import IO, TYPE_CHECKING, Callable
 
-from lxml import etree
+from .cache import ParseCache
+from .engines import check_engine, iter_drug_elements
+from .extractors import build_record_extractors
+from .filters import DrugPredicate, Where, drug_filter
+from .inputs import XmlSource, is_path_source, is_plain_xml, open_xml_source, source_path
+from .models import DrugFilter, ParseResult, Table
+from .modules import module_handlers
+from .profiles import resolve_modules, resolve_records, resolve_tables
+from .progress import ProgressCallback, ProgressMeter
+from .pruning import PrunedReader, build_prune_plan
+from .records import RecordReader, iter_drug_spans, plan_shards, read_xml_header
+from .schema import load_schema
+from .sinks import DeduplicatingSink, JoiningSink, RowSink, abort_sink, joined_tables, stored_tables
+from .stats import CountingReader, ParseStats, TimedSink
 
-from .models import ParseResult
-from .profiles import resolve_modules, resolve_tables
+if TYPE_CHECKING:
+    from concurrent.futures import Future
 
-DRUGBANK_NS = "http://www.drugbank.ca"
-NS = {"db": DRUGBANK_NS}
-SOURCE = "DrugBank"
+SHARDS_PER_WORKER = 4
+# Input bytes of the shards submitted but not yet merged. Shards are cut small
+# enough that twice the worker count fits, so a streamed sharded parse holds
+# the rows of at most this much XML whatever the release size.
+SHARD_WINDOW_BYTES = 256 * 1024 * 1024
 
 
 def parse_drugbank_xml(
+    path: XmlSource,
+    profile: str = "core",
+    modules: list[str] | None = None,
+    workers: int = 1,
+    cache: ParseCache | str | Path | None = None,
+    layout: str = "columnar",
+    stats: ParseStats | None = None,
+    progress: ProgressCallback | None = None,
+    where: Where | None = None,
+    prune: bool = True,
+    engine: str = "lxml",
+) -> ParseResult:
+    if is_path_source(path):
+        path = source_path(path)
+    check_engine(engine)
+    selected_modules = resolve_modules(profile=profile, modules=modules)
+    tables = resolve_tables(selected_modules)
+    drugs = drug_filter(where)
+
+    # Every engine produces the same tables, so the engine is not part of the
+    # cache key.
+    parse_cache = None
+    if cache is not None:
+        if not is_path_source(path):
+            raise ValueError("The parse cache is keyed by the input file and needs a path, not a file object")
+        parse_cache = cache if isinstance(cache, ParseCache) else ParseCache(cache)
+        key = parse_cache.key(path, selected_modules, tables, where=drugs)
+        start = time.perf_counter()
+        cached = parse_cache.get(key, layout=layout)
+        if cached is not None:
+            # A hit reads no XML: stats get the load time and a hit count, and
+            # progress gets a single report for the whole input.
+            if stats is not None:
+                stats.add_time("cache_load", time.perf_counter() - start)
+                stats.count("cache_hits")
+            if progress is not None:
+                meter = ProgressMeter(progress, total_bytes=os.path.getsize(path))
+                meter.drugs = len(cached.tables.get("drugs", ()))
+                meter.finish()
+            return cached
+
+    # Joined tables are views over the stored tables and are never filled.
+    schema = load_schema()
+    joined_tables(tables, schema)
+    result = ParseResult.for_tables(tables, schema, layout=layout)
+    _stream_tables(
+        path, result, selected_modules, stored_tables(tables, schema), workers, stats, progress, drugs, prune, engine
+    )
+    if parse_cache is not None:
+        parse_cache.put(key, result)
+    return result
+
+
+def stream_drugbank_xml(
+    path: XmlSource,
+    sink: RowSink,
+    profile: str = "core",
+    modules: list[str] | None = None,
+    workers: int = 1,
+    stats: ParseStats | None = None,
+    progress: ProgressCallback | None = None,
+    where: Where | None = None,
+    prune: bool = True,
+    engine: str = "lxml",
+    on_drug: Callable[[], None] | None = None,
+) -> list[str]:
+    # ``on_drug`` is called after each drug, once its rows have reached the
+    # sink. Sharded parses hand back whole shards, so it needs one worker.
+    if is_path_source(path):
+        path = source_path(path)
+
+    if workers < 1:
+        raise ValueError(f"workers must be at least 1, got {workers}")
+    if on_drug is not None and workers > 1:
+        raise ValueError(f"on_drug needs a single worker, got workers={workers}")
+    check_engine(engine)
+
+    selected_modules = resolve_modules(profile=profile, modules=modules)
+    tables = resolve_tables(selected_modules)
+    drugs = drug_filter(where)
+    schema = load_schema()
+    output = JoiningSink(sink, joined_tables(tables, schema))
+    output.open(tables)
+    try:
+        _stream_tables(
+            path,
+            output,
+            selected_modules,
+            stored_tables(tables, schema),
+            workers,
+            stats,
+            progress,
+            drugs,
+            prune,
+            engine,
+            on_drug,
+        )
+    except BaseException:
+        abort_sink(sink)
+        raise
+    output.close()
+    return tables
+
+
+def _stream_tables(
+    path: XmlSource,
+    sink: RowSink,
+    selected_modules: list[str],
+    tables: list[str],
+    workers: int,
+    stats: ParseStats | None = None,
+    progress: ProgressCallback | None = None,
+    where: DrugFilter | None = None,
+    prune: bool = True,
+    engine: str = "lxml",
+    on_drug: Callable[[], None] | None = None,
+) -> None:
+    if workers < 1:
+        raise ValueError(f"workers must be at least 1, got {workers}")
+
+    # The sink is opened and closed by the caller.
+    output = DeduplicatingSink(sink if stats is None else TimedSink(sink, stats), stats=stats)
+    # Sharding seeks to record offsets, so compressed inputs and file objects
+    # are always parsed as a single stream.
+    meter = ProgressMeter(progress) if progress is not None else None
+    if workers > 1 and tables and is_plain_xml(path):
+        _parse_sharded(Path(path), selected_modules, tables, output, workers, stats, meter, where, prune, engine)
+    elif is_plain_xml(path) and meter is None and not prune and engine == "lxml":
+        _parse_stream(str(path), selected_modules, output, stats, where=where, prune=False, on_drug=on_drug)
+    else:
+        # Pruning, progress and the expat and sax engines work on a file
+        # object, so plain XML is then read through one rather than by lxml
+        # itself; both parse at the same speed.
+        with open_xml_source(path, progress=meter) as handle:
+            # Plain files are counted by their size below.
+            source = handle if stats is None or is_plain_xml(path) else CountingReader(handle, stats)
+            _parse_stream(source, selected_modules, output, stats, meter, where, prune, engine, on_drug)
+    if stats is not None and is_plain_xml(path):
+        stats.count("bytes", os.path.getsize(path))
+    if meter is not None:
+        meter.finish()
+
+
+def parse_drug_records(
     path: str | Path,
+    ranges: list[tuple[int, int]],
     profile: str = "core",
     modules: list[str] | None = None,
+    header: bytes | None = None,
+    layout: str = "columnar",
 ) -> ParseResult:
+    # The drug records in ``ranges``, with the tables, layout and joined views
+    # parse_drugbank_xml gives for the same drugs.
     xml_path = Path(path)
     if not xml_path.exists():
         raise FileNotFoundError(f"Input XML file does not exist: {xml_path}")
 
     selected_modules = resolve_modules(profile=profile, modules=modules)
     tables = resolve_tables(selected_modules)
-    result = ParseResult(tables={table: [] for table in tables})
+    schema = load_schema()
+    joined_tables(tables, schema)
+    result = ParseResult.for_tables(tables, schema, layout=layout)
+    _stream_records(xml_path, ranges, result, selected_modules, header)
+    return result
 
-    context = etree.iterparse(
-        str(xml_path),
-        events=("end",),
-        tag=f"{{{DRUGBANK_NS}}}drug",
-        recover=False,
-    )
 
-    for _, drug_node in context:
-        if "core" in selected_modules:
-            _extract_core_drug(drug_node, result)
-        while drug_node.getprevious() is not None:
-            del drug_node.getparent()[0]
-        drug_node.clear()
+def stream_drug_records(
+    path: str | Path,
+    ranges: list[tuple[int, int]],
+    sink: RowSink,
+    profile: str = "core",
+    modules: list[str] | None = None,
+    header: bytes | None = None,
+) -> list[str]:
+    xml_path = Path(path)
+    if not xml_path.exists():
+        raise FileNotFoundError(f"Input XML file does not exist: {xml_path}")
 
-    if "targets" in result.tables:
-        _deduplicate_table(result, "targets", key_fields=("target_id",))
-    return result
+    selected_modules = resolve_modules(profile=profile, modules=modules)
+    tables = resolve_tables(selected_modules)
+    output = JoiningSink(sink, joined_tables(tables, load_schema()))
+    output.open(tables)
+    try:
+        _stream_records(xml_path, ranges, output, selected_modules, header)
+    except BaseException:
+        abort_sink(sink)
+        raise
+    output.close()
+    return tables
 
 
-def _extract_core_drug(drug_node: etree._Element, result: ParseResult) -> None:
-    drug_id = _first_text(drug_node, "db:drugbank-id[@primary='true']")
-    if not drug_id:
+def _stream_records(
+    xml_path: Path,
+    ranges: list[tuple[int, int]],
+    sink: RowSink,
+    selected_modules: list[str],
+    header: bytes | None = None,
+) -> None:
+    # The sink is opened and closed by the caller.
+    if not ranges:
         return
+    if header is None:
+        with xml_path.open("rb") as handle:
+            header = read_xml_header(handle)
+    with RecordReader(str(xml_path), header, ranges) as reader:
+        _parse_stream(reader, selected_modules, DeduplicatingSink(sink))
 
-    drug_name = _first_text(drug_node, "db:name")
-    indication = _first_text(drug_node, "db:indication")
-    inchi = _calculated_property(drug_node, "InChI")
-
-    drug_row = {
-        "drug_id": drug_id,
-        "drug_name": drug_name,
-        "inchi": inchi,
-        "source": SOURCE,
-    }
-    result.add_row("drugs", drug_row)
-    result.add_row(
-        "drug_indication",
-        {
-            "drug_id": drug_id,
-            "indication": indication,
-            "source": SOURCE,
-        },
-    )
 
-    for target_node in drug_node.xpath("db:targets/db:target", namespaces=NS):
-        target_id = _target_id(target_node)
-        if not target_id:
-            continue
-
-        target_name = _first_text(target_node, "db:name")
-        organism = _first_text(target_node, "db:organism")
-        gene_name = _first_text(target_node, "db:polypeptide/db:gene-name")
-
-        result.add_row(
-            "targets",
-            {
-                "target_id": target_id,
-                "target_name": target_name,
-                "gene_name": gene_name,
-                "organism": organism,
-                "source": SOURCE,
-            },
-        )
-        result.add_row(
-            "drug_target",
-            {
-                "drug_id": drug_id,
-                "target_id": target_id,
-                "source": SOURCE,
-            },
-        )
-        result.add_row(
-            "target_drug_indication",
-            {
-                "target_id": target_id,
-                "gene_name": gene_name,
-                "drug_id": drug_id,
-                "drug_name": drug_name,
-                "inchi": inchi,
-                "indication": indication,
-                "source": SOURCE,
-            },
-        )
+def _parse_stream(
+    source: str | IO[bytes],
+    selected_modules: list[str],
+    sink: RowSink,
+    stats: ParseStats | None = None,
+    progress: ProgressMeter | None = None,
+    where: DrugFilter | None = None,
+    prune: bool = True,
+    engine: str = "lxml",
+    on_drug: Callable[[], None] | None = None,
+) -> int:
+    if prune:
+        # Subtrees no selected record or filter reads are cut out of each
+        # <drug> before the XML parser sees it, so they are never tokenized
+        # into elements.
+        plan = build_prune_plan(load_schema(), resolve_records(selected_modules), where)
+        source = PrunedReader(source, plan, stats)
+    # lxml keeps the document tree, so each drug is cleared once it is done;
+    # the expat and sax engines hand out one detached tree per drug.
+    lxml_tree = engine == "lxml"
+
+    # One extractor pass over each drug's children collects the subtrees of
+    # every selected module's records; each module then only sees those.
+    extractors = build_record_extractors(load_schema(), resolve_records(selected_modules))
+    drug_extractor = extractors.get("drug")
+    handlers = [(f"module.{name}", handler) for name, handler in module_handlers(selected_modules)]
+    # Filters run on the parsed <drug> before extraction, so rejected drugs
+    # cost only tokenizing and the predicate checks.
+    predicate = DrugPredicate(where) if where is not None else None
 
+    # With stats, timestamps are taken between the steps of each drug; the
+    # time from the end of one drug to the start of the next is tokenizing.
+    clock = time.perf_counter
+    mark = clock() if stats is not None else 0.0
+    drugs = 0
+    for drug_node in iter_drug_elements(source, engine):
+        drugs += 1
+        if stats is not None:
+            now = clock()
+            stats.add_time("tokenize", now - mark)
+            mark = now
+        if predicate is not None and not predicate.accepts(drug_node):
+            if stats is not None:
+                mark = _lap(stats, "filter", mark)
+                stats.count("drugs_filtered")
+        elif drug_extractor is not None:
+            if predicate is not None and stats is not None:
+                mark = _lap(stats, "filter", mark)
+            drug, collected = drug_extractor.extract(drug_node)
+            if stats is not None:
+                mark = _lap(stats, "extract.drug", mark)
+                stats.count("drugs")
+                stats.count("targets", len(collected.get("target", ())))
+            if drug["drug_id"]:
+                for stage, handler in handlers:
+                    handler(drug, collected, sink, extractors)
+                    if stats is not None:
+                        mark = _lap(stats, stage, mark)
+            elif stats is not None:
+                stats.count("drugs_skipped")
+        if lxml_tree:
+            while drug_node.getprevious() is not None:
+                del drug_node.getparent()[0]
+            drug_node.clear()
+            if stats is not None:
+                mark = _lap(stats, "cleanup", mark)
+        if progress is not None:
+            progress.add_drugs()
+        if on_drug is not None:
+            on_drug()
+    return drugs
 
-def _target_id(target_node: etree._Element) -> str:
-    polypeptide = target_node.find("db:polypeptide", namespaces=NS)
-    if polypeptide is not None:
-        return polypeptide.get("id", "") or ""
-    return ""
 
+def _lap(stats: ParseStats, stage: str, mark: float) -> float:
+    now = time.perf_counter()
+    stats.add_time(stage, now - mark)
+    return now
+
+
+def _parse_sharded(
+    xml_path: Path,
+    selected_modules: list[str],
+    tables: list[str],
+    sink: RowSink,
+    workers: int,
+    stats: ParseStats | None = None,
+    progress: ProgressMeter | None = None,
+    where: DrugFilter | None = None,
+    prune: bool = True,
+    engine: str = "lxml",
+) -> None:
+    with xml_path.open("rb") as handle:
+        header = read_xml_header(handle)
+        shard_bytes = min(
+            os.path.getsize(xml_path) // (workers * SHARDS_PER_WORKER),
+            SHARD_WINDOW_BYTES // (workers * 2),
+        )
+        shards = plan_shards(iter_drug_spans(handle), max(1, shard_bytes))
+
+    from concurrent.futures import ProcessPoolExecutor
 
-def _first_text(node: etree._Element, xpath: str) -> str:
-    values = node.xpath(xpath, namespaces=NS)
-    if not values:
-        return ""
-    value = values[0]
-    if isinstance(value, etree._Element):
-        return " ".join(value.itertext()).strip()
-    return str(value).strip()
+    profile = stats is not None
+    if progress is not None:
+        # Workers report nothing until their shard is done, so progress moves
+        # by whole shards as they are merged.
+        progress.total_bytes = os.path.getsize(xml_path)
+        progress.advance(shards[0][0] if shards else 0)
+    with ProcessPoolExecutor(max_workers=min(workers, max(1, len(shards)))) as executor:
+        pending: deque[tuple[Future, int]] = deque()
+        in_flight = 0
+        for start, end in shards:
+            future = executor.submit(
+                _parse_shard,
+                str(xml_path),
+                header,
+                start,
+                end,
+                selected_modules,
+                tables,
+                profile,
+                where,
+                prune,
+                engine,
+            )
+            pending.append((future, end - start))
+            in_flight += end - start
+            # Finished shards wait in memory until merged in order, so the
+            # oldest is merged once the window is full.
+            while len(pending) > 1 and in_flight > SHARD_WINDOW_BYTES:
+                in_flight -= pending[0][1]
+                _merge_shard(*pending.popleft(), sink, stats, progress)
+        while pending:
+            _merge_shard(*pending.popleft(), sink, stats, progress)
 
 
-def _calculated_property(drug_node: etree._Element, kind: str) -> str:
-    properties = drug_node.xpath("db:calculated-properties/db:property", namespaces=NS)
-    for property_node in properties:
-        property_kind = _first_text(property_node, "db:kind")
-        if property_kind == kind:
-            return _first_text(property_node, "db:value")
-    return ""
+def _parse_shard(
+    path: str,
+    header: bytes,
+    start: int,
+    end: int,
+    selected_modules: list[str],
+    tables: list[str],
+    profile: bool = False,
+    where: DrugFilter | None = None,
+    prune: bool = True,
+    engine: str = "lxml",
+) -> tuple[dict[str, Table], ParseStats | None, int]:
+    result = ParseResult.for_tables(tables, load_schema())
+    stats = ParseStats() if profile else None
+    with RecordReader(path, header, [(start, end)]) as reader:
+        output = DeduplicatingSink(result, stats=stats)
+        drugs = _parse_stream(reader, selected_modules, output, stats, where=where, prune=prune, engine=engine)
+    return result.tables, stats, drugs
 
 
-def _deduplicate_table(
-    result: ParseResult,
-    table: str,
-    key_fields: tuple[str, ...],
+def _merge_shard(
+    future: Future,
+    size: int,
+    sink: RowSink,
+    stats: ParseStats | None = None,
+    progress: ProgressMeter | None = None,
 ) -> None:
-    seen = set()
-    rows = []
-    for row in result.rows(table):
-        key = tuple(row.get(field, "") for field in key_fields)
-        if key in seen:
-            continue
-        seen.add(key)
-        rows.append(row)
-    result.tables[table] = rows
+    tables, shard_stats, drugs = future.result()
+    start = time.perf_counter()
+    for table, rows in tables.items():
+        for row in rows:
+            sink.add_row(table, row)
+    if stats is not None and shard_stats is not None:
+        stats.merge(shard_stats)
+        stats.add_time("merge", time.perf_counter() - start)
+    if progress is not None:
+        progress.advance(size, drugs)
@@ -2,21 +2,13 @@ from __future__ import annotations
 
 from pathlib import Path
 
-import yaml
-
-from .schema import default_schema_dir
+from .schema import default_schema_dir, read_schema_file
 
 
 def load_profiles(schema_dir: str | Path | None = None) -> dict:
+    # Cached per process like the table schema; callers must not modify it.
     base = Path(schema_dir) if schema_dir is not None else default_schema_dir()
-    path = base / "profiles.yml"
-    if not path.exists():
-        raise FileNotFoundError(f"Profile schema file does not exist: {path}")
-    with path.open("r", encoding="utf-8") as handle:
-        data = yaml.safe_load(handle)
-    if not isinstance(data, dict):
-        raise ValueError(f"Profile schema file is empty or invalid: {path}")
-    return data
+    return read_schema_file(base.resolve() / "profiles.yml", kind="Profile schema")
 
 
 def resolve_modules(
@@ -52,3 +44,19 @@ def resolve_tables(
             if table not in tables:
                 tables.append(table)
     return tables
+
+
+def resolve_records(
+    modules: list[str],
+    schema_dir: str | Path | None = None,
+) -> list[str]:
+    data = load_profiles(schema_dir)
+    known_modules = data.get("modules", {})
+    records: list[str] = []
+    for module in modules:
+        if module not in known_modules:
+            raise ValueError(f"Unknown module: {module}")
+        for record in known_modules[module].get("records", []):
+            if record not in records:
+                records.append(record)
+    return records
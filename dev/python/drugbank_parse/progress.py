@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import sys
+import time
+from typing import IO, Callable
+
+from .models import ParseProgress
+
+PROGRESS_INTERVAL = 1.0
+
+ProgressCallback = Callable[[ParseProgress], None]
+
+
+class ProgressMeter:
+    # Tracks how far a parse has read into its input and calls ``callback`` at
+    # most once per ``interval`` seconds, plus once when the parse finishes.
+    # Between reports it only bumps a counter and reads the clock once per
+    # drug, which is negligible next to extracting the drug.
+
+    def __init__(
+        self,
+        callback: ProgressCallback,
+        total_bytes: int | None = None,
+        interval: float = PROGRESS_INTERVAL,
+    ) -> None:
+        self.callback = callback
+        self.total_bytes = total_bytes
+        self.interval = interval
+        self.bytes_read = 0
+        self.drugs = 0
+        self._position: Callable[[], int] | None = None
+        self._start = time.perf_counter()
+        self._next_report = self._start + interval
+
+    def track(self, position: Callable[[], int], total_bytes: int | None) -> None:
+        # ``position`` returns the current offset into the input file and is
+        # only called when a report is due.
+        self._position = position
+        self.total_bytes = total_bytes
+
+    def reader(self, handle: IO[bytes]) -> IO[bytes]:
+        return _MeteredReader(handle, self)
+
+    def add_drugs(self, count: int = 1) -> None:
+        self.drugs += count
+        now = time.perf_counter()
+        if now >= self._next_report:
+            self._report(now)
+
+    def advance(self, size: int, drugs: int = 0) -> None:
+        self.bytes_read += size
+        self.add_drugs(drugs)
+
+    def finish(self) -> None:
+        if self.total_bytes is not None:
+            self.bytes_read = self.total_bytes
+        self._position = None
+        self._report(time.perf_counter(), done=True)
+
+    def _report(self, now: float, done: bool = False) -> None:
+        self._next_report = now + self.interval
+        if self._position is not None:
+            self.bytes_read = self._position()
+        self.callback(
+            ParseProgress(
+                bytes_read=self.bytes_read,
+                total_bytes=self.total_bytes,
+                drugs=self.drugs,
+                elapsed_seconds=now - self._start,
+                done=done,
+            )
+        )
+
+
+class _MeteredReader:
+    # Counts bytes read from a file object whose size is unknown.
+
+    def __init__(self, handle: IO[bytes], meter: ProgressMeter) -> None:
+        self._handle = handle
+        self._meter = meter
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._handle.read(size)
+        self._meter.bytes_read += len(data)
+        return data
+
+
+def format_progress(progress: ParseProgress) -> str:
+    megabytes = progress.bytes_read / (1024 * 1024)
+    parts = []
+    if progress.total_bytes:
+        parts.append(f"{progress.percent:5.1f}%")
+        parts.append(f"{megabytes:,.1f}/{progress.total_bytes / (1024 * 1024):,.1f} MB")
+    else:
+        parts.append(f"{megabytes:,.1f} MB")
+    parts.append(f"{progress.mb_per_second:,.1f} MB/s")
+    parts.append(f"{progress.drugs:,} drugs ({progress.drugs_per_second:,.0f}/s)")
+    if progress.done:
+        parts.append(f"done in {_clock(progress.elapsed_seconds)}")
+    elif progress.eta_seconds is not None:
+        parts.append(f"ETA {_clock(progress.eta_seconds)}")
+    return "  ".join(parts)
+
+
+def print_progress(progress: ParseProgress, stream: IO[str] | None = None) -> None:
+    # Rewrites one line on a terminal and prints one line per report otherwise,
+    # so redirected logs stay readable.
+    output = stream if stream is not None else sys.stderr
+    line = format_progress(progress)
+    if output.isatty():
+        output.write(f"\r{line:<79}" + ("\n" if progress.done else ""))
+    else:
+        output.write(line + "\n")
+    output.flush()
+
+
+def _clock(seconds: float) -> str:
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}"
@@ -0,0 +1,365 @@
+from __future__ import annotations
+
+import re
+from typing import IO, Dict, Optional
+
+from .extractors import FieldPath, is_flat_record
+from .filters import filter_paths
+from .models import DrugBankSchema, DrugFilter
+from .stats import ParseStats
+
+# Tag trie of the elements kept below each top-level <drug>: a child tag maps
+# to the trie of its own kept children, or to None when the whole element is
+# kept (a field's text). Tags are the unprefixed local names in the input.
+PrunePlan = Dict[bytes, Optional["PrunePlan"]]
+
+WHOLE_ELEMENT_BYTES = 4096
+# Pruning costs about half of what building and clearing the dropped elements
+# costs, so once this many drug bytes show less than PRUNE_MIN_SAVING of them
+# pruned, the rest of the input is passed through unpruned.
+PRUNE_SAMPLE_BYTES = 8 * 1024 * 1024
+PRUNE_MIN_SAVING = 0.5
+# A drug still incomplete after this many buffered bytes is passed through
+# with the rest of the input instead of being buffered to its end.
+PRUNE_MAX_DRUG_BYTES = 64 * 1024 * 1024
+
+# The next markup token: an end tag, a comment, CDATA section or processing
+# instruction, or a start tag with its name and self-closing slash.
+_TOKEN = re.compile(rb"<(?:(/)|([!?])|([^\s/>!?]+)(?:[^>\"']|\"[^\"]*\"|'[^']*')*?(/?)>)")
+_DRUG_START = re.compile(rb"<drug[\s/>]")
+# Bytes held back at a chunk end so a split "<drug" start is seen whole.
+_DRUG_START_TAIL = 6
+_END_TOKENS: dict[bytes, tuple[bytes, bytes]] = {}
+_SKIP_PATTERNS: dict[bytes, re.Pattern[bytes]] = {}
+
+
+def build_prune_plan(
+    schema: DrugBankSchema,
+    records: list[str],
+    where: DrugFilter | None = None,
+) -> PrunePlan:
+    # Every field of the selected records and every filter path, spelled out
+    # from the drug element down.
+    plan: PrunePlan = {}
+    for name in records:
+        record = schema.records[name]
+        if record.parent is not None and is_flat_record(record):
+            # Flat records are read by column queries on their container,
+            # and their small elements cost more to prune than to parse.
+            container = _record_prefix(schema, record.parent) + _tags(FieldPath(record.path))[:1]
+            _insert(plan, container, whole=True)
+            continue
+        prefix = _record_prefix(schema, name)
+        if record.parent is not None:
+            _insert(plan, prefix, whole=False)
+        for expression in record.fields.values():
+            _insert_path(plan, prefix, FieldPath(expression))
+    for expression in filter_paths(where):
+        _insert_path(plan, [], FieldPath(expression))
+    return plan
+
+
+def prune_drug(data: bytes, plan: PrunePlan) -> bytes:
+    # ``data`` is one complete <drug> element. Returns it with every child
+    # outside the plan removed, so the XML parser never builds those subtrees.
+    parts, _ = _prune_drug(data, 0, plan)
+    return b"".join(parts)
+
+
+class PrunedReader:
+    # File-like view of an XML stream with each top-level <drug> passed
+    # through prune_drug; everything between drugs is passed through as is.
+    # Inputs without unprefixed <drug> elements come out unchanged. A drug is
+    # pruned once its end tag is in the buffer; a truncated last drug is
+    # passed through as is, so the XML parser reports it. Comments, CDATA
+    # sections and processing instructions between drugs are passed through
+    # whole. Plans that keep most of each drug stop pruning after
+    # PRUNE_SAMPLE_BYTES, and a drug larger than PRUNE_MAX_DRUG_BYTES stops
+    # pruning there.
+
+    def __init__(
+        self,
+        handle: IO[bytes],
+        plan: PrunePlan,
+        stats: ParseStats | None = None,
+        chunk_size: int = 262144,
+    ) -> None:
+        self._handle = handle
+        self._plan = plan
+        self._stats = stats
+        self._chunk_size = chunk_size
+        self._buffer = b""
+        self._output: list[bytes] = []
+        self._pending = b""
+        self._offset = 0
+        self._eof = False
+        self._sampled = 0
+        self._kept = 0
+        self._passthrough = False
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            return b"".join(iter(lambda: self.read(self._chunk_size), b""))
+        while len(self._pending) - self._offset < size and not self._eof:
+            self._fill()
+        data = self._pending[self._offset : self._offset + size]
+        self._offset += len(data)
+        return data
+
+    def close(self) -> None:
+        self._handle.close()
+
+    def __enter__(self) -> "PrunedReader":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def _fill(self) -> None:
+        # A drug that did not fit is pruned again from its start once more data
+        # arrives; reading at least what is buffered doubles the buffer each
+        # time, so large drugs are retried only a few times.
+        chunk = self._handle.read(max(self._chunk_size, len(self._buffer)))
+        self._eof = not chunk
+        buffer = self._buffer + chunk
+        position = 0
+        while not self._passthrough:
+            match = _DRUG_START.search(buffer, position)
+            markup = _next_markup(buffer, position, match.start() if match is not None else len(buffer))
+            if markup >= 0:
+                # A "<drug" inside the markup does not start a record.
+                try:
+                    end = _skip_markup(buffer, markup)
+                except _Truncated:
+                    if not self._eof:
+                        self._emit(buffer[position:markup])
+                        position = markup
+                        break
+                    end = len(buffer)
+                self._emit(buffer[position:end])
+                position = end
+                continue
+            if match is None:
+                # Hold back a tail that may be the start of a split "<drug".
+                keep = len(buffer) if self._eof else max(position, len(buffer) - _DRUG_START_TAIL)
+                self._emit(buffer[position:keep])
+                position = keep
+                break
+            self._emit(buffer[position : match.start()])
+            position = match.start()
+            if not self._eof and buffer.find(b"</drug>", position) < 0:
+                break
+            try:
+                parts, end = _prune_drug(buffer, position, self._plan)
+            except _Truncated:
+                if not self._eof:
+                    break
+                self._emit(buffer[position:])
+                position = len(buffer)
+                break
+            pruned = b"".join(parts)
+            if self._stats is not None:
+                self._stats.count("bytes_pruned", end - position - len(pruned))
+            self._emit(pruned)
+            self._sampled += end - position
+            self._kept += len(pruned)
+            if self._sampled >= PRUNE_SAMPLE_BYTES:
+                self._passthrough = self._kept > self._sampled * (1 - PRUNE_MIN_SAVING)
+            position = end
+
+        if len(buffer) - position > PRUNE_MAX_DRUG_BYTES:
+            self._passthrough = True
+        if self._passthrough:
+            self._emit(buffer[position:])
+            position = len(buffer)
+        self._buffer = buffer[position:]
+        if self._output:
+            self._pending = self._pending[self._offset :] + b"".join(self._output)
+            self._offset = 0
+            self._output = []
+
+    def _emit(self, data: bytes) -> None:
+        if data:
+            self._output.append(data)
+
+
+class _Truncated(ValueError):
+    # Raised when a record runs past the end of the buffer.
+    pass
+
+
+def _prune_drug(data: bytes, position: int, plan: PrunePlan) -> tuple[list[bytes], int]:
+    # Prunes the <drug> element starting at ``position`` and returns the kept
+    # pieces and the offset just past its end tag.
+    start = _TOKEN.match(data, position)
+    if start is None:
+        raise _Truncated("Unterminated <drug> start tag")
+    if not start.group(3) or start.group(4):
+        return [data[position : start.end()]], start.end()
+    parts = [data[position : start.end()]]
+    close = _keep_children(data, start.end(), plan, parts)
+    end = data.find(b">", close) + 1
+    if end == 0:
+        raise _Truncated("Unterminated </drug> end tag")
+    parts.append(data[close:end])
+    return parts, end
+
+
+def _record_prefix(schema: DrugBankSchema, name: str) -> list[bytes]:
+    # Element path from the drug to the record, e.g. [targets, target].
+    prefix: list[bytes] = []
+    record = schema.records[name]
+    while record.parent is not None:
+        prefix[:0] = _tags(FieldPath(record.path))
+        record = schema.records[record.parent]
+    return prefix
+
+
+def _insert_path(plan: PrunePlan, prefix: list[bytes], path: FieldPath) -> None:
+    tags = prefix + _tags(path)
+    # Steps such as property[kind='InChI'] also need the child they test.
+    for index, step in enumerate(path.steps):
+        if step.child_text is not None:
+            _insert(plan, tags[: len(prefix) + index + 1] + [_local(step.child_text[0])], whole=True)
+    _insert(plan, tags, whole=path.attribute is None)
+
+
+def _insert(plan: PrunePlan, tags: list[bytes], whole: bool) -> None:
+    node = plan
+    for index, tag in enumerate(tags):
+        if tag in node and node[tag] is None:
+            return
+        if whole and index == len(tags) - 1:
+            node[tag] = None
+            return
+        child = node.get(tag)
+        if child is None:
+            child = node[tag] = {}
+        node = child
+
+
+def _tags(path: FieldPath) -> list[bytes]:
+    return [_local(step.tag) for step in path.steps]
+
+
+def _local(tag: str) -> bytes:
+    return tag.rpartition("}")[2].encode("utf-8")
+
+
+def _keep_children(data: bytes, position: int, plan: PrunePlan, parts: list[bytes]) -> int:
+    # Copies the children of an element whose start tag ends at ``position``
+    # that the plan keeps, and returns the offset of the element's end tag.
+    # Text between the kept children is dropped; no field reads it. This runs
+    # once per child of every kept element, so it sticks to C-level searches.
+    search = _TOKEN.search
+    find = data.find
+    append = parts.append
+    while True:
+        token = search(data, position)
+        if token is None:
+            raise _Truncated("Unterminated element in DrugBank XML record")
+        close, markup, tag, empty = token.groups()
+        if close:
+            return token.start()
+        if markup:
+            position = _skip_markup(data, token.start())
+            continue
+        child = plan.get(tag, False)
+        end = token.end()
+        if empty:
+            if child is not False:
+                append(data[token.start() : end])
+        elif child is False or child is None:
+            # Usually the next "</tag>" closes the element: no element of the
+            # same name and no comment or CDATA section comes before it.
+            close_tag, open_tag = _end_tokens(tag)
+            stop = find(close_tag, end)
+            if stop < 0 or find(open_tag, end, stop) >= 0 or find(b"<!", end, stop) >= 0:
+                stop = _skip_element(data, tag, end)
+            else:
+                stop += len(close_tag)
+            if child is None:
+                append(data[token.start() : stop])
+            end = stop
+        else:
+            # Small elements are copied whole: walking their children costs
+            # more than letting the XML parser build the few it does not need.
+            close_tag, open_tag = _end_tokens(tag)
+            stop = find(close_tag, end)
+            if (
+                0 <= stop - end < WHOLE_ELEMENT_BYTES
+                and find(open_tag, end, stop) < 0
+                and find(b"<!", end, stop) < 0
+            ):
+                end = stop + len(close_tag)
+                append(data[token.start() : end])
+                position = end
+                continue
+            append(data[token.start() : end])
+            stop = _keep_children(data, end, child, parts)
+            end = find(b">", stop) + 1
+            if end == 0:
+                raise _Truncated("Unterminated end tag in DrugBank XML record")
+            append(data[stop:end])
+        position = end
+
+
+def _end_tokens(tag: bytes) -> tuple[bytes, bytes]:
+    tokens = _END_TOKENS.get(tag)
+    if tokens is None:
+        tokens = _END_TOKENS[tag] = (b"</" + tag + b">", b"<" + tag)
+    return tokens
+
+
+def _skip_element(data: bytes, tag: bytes, position: int) -> int:
+    # Returns the offset just past the end tag matching a start tag of
+    # ``tag`` that ends at ``position``, counting nested elements of the same
+    # name and stepping over comments and CDATA sections.
+    pattern = _SKIP_PATTERNS.get(tag)
+    if pattern is None:
+        pattern = _SKIP_PATTERNS[tag] = re.compile(rb"<(/?)" + re.escape(tag) + rb"[\s/>]|<!--|<!\[CDATA\[")
+    depth = 1
+    while True:
+        match = pattern.search(data, position)
+        if match is None:
+            raise _Truncated(f"Unterminated <{tag.decode('utf-8', 'replace')}> in DrugBank XML record")
+        if match.group(1) is None:
+            position = _skip_markup(data, match.start())
+        elif match.group(1):
+            depth -= 1
+            position = data.find(b">", match.start()) + 1
+            if position == 0:
+                raise _Truncated(f"Unterminated </{tag.decode('utf-8', 'replace')}> in DrugBank XML record")
+            if depth == 0:
+                return position
+        else:
+            start = _TOKEN.match(data, match.start())
+            if start is None:
+                raise _Truncated(f"Unterminated <{tag.decode('utf-8', 'replace')}> in DrugBank XML record")
+            position = start.end()
+            if not start.group(4):
+                depth += 1
+
+
+def _next_markup(data: bytes, start: int, end: int) -> int:
+    # Offset of the first "<!" or "<?" in data[start:end], or -1.
+    declaration = data.find(b"<!", start, end)
+    instruction = data.find(b"<?", start, end)
+    if declaration < 0 or 0 <= instruction < declaration:
+        return instruction
+    return declaration
+
+
+def _skip_markup(data: bytes, position: int) -> int:
+    if data.startswith(b"<!--", position):
+        terminator = b"-->"
+    elif data.startswith(b"<![CDATA[", position):
+        terminator = b"]]>"
+    elif data.startswith(b"<?", position):
+        terminator = b"?>"
+    else:
+        terminator = b">"
+    end = data.find(terminator, position)
+    if end < 0:
+        raise _Truncated("Unterminated markup in DrugBank XML record")
+    return end + len(terminator)
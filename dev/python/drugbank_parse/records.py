@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import re
+from typing import BinaryIO, Iterator
+
+CHUNK_SIZE = 4 * 1024 * 1024
+ROOT_END_TAG = b"</drugbank>"
+
+_DRUG_TAG = re.compile(rb"<(/?)drug[\s/>]")
+_ROOT_TAG = re.compile(rb"<drugbank[\s>]")
+# Longest token the scanner has to see whole: "<![CDATA[".
+_TOKEN_TAIL = 9
+
+
+def read_xml_header(handle: BinaryIO, limit: int = 64 * 1024) -> bytes:
+    handle.seek(0)
+    head = handle.read(limit)
+    match = _ROOT_TAG.search(head)
+    if match is None:
+        raise ValueError("Input does not look like a DrugBank XML file: missing <drugbank> root")
+    end = head.find(b">", match.start())
+    if end < 0:
+        raise ValueError("DrugBank root start tag is not terminated within the header")
+    return head[: end + 1]
+
+
+def iter_drug_spans(
+    handle: BinaryIO,
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[tuple[int, int]]:
+    # Nested <drug> elements (pathway participants) only move the depth counter.
+    handle.seek(0)
+    depth = 0
+    start = 0
+    base = 0
+    buffer = b""
+
+    while True:
+        chunk = handle.read(chunk_size)
+        eof = not chunk
+        buffer += chunk
+        limit = len(buffer) if eof else len(buffer) - _TOKEN_TAIL
+        if limit <= 0 and not eof:
+            continue
+
+        # Comments, CDATA sections, declarations and processing instructions
+        # are skipped whole, so a "<drug" inside them is not counted.
+        position = 0
+        declaration = _find_markup(buffer, b"!", 0)
+        instruction = _find_markup(buffer, b"?", 0)
+        while True:
+            match = _DRUG_TAG.search(buffer, position)
+            token = match.start() if match is not None else len(buffer)
+            markup = instruction if declaration < 0 or 0 <= instruction < declaration else declaration
+            if 0 <= markup < token:
+                token = markup
+            if token >= limit:
+                position = max(position, limit)
+                break
+            if token == markup:
+                end = _markup_end(buffer, token)
+            else:
+                end = buffer.find(b">", token) + 1
+            if end == 0:
+                # The token ends in a later chunk.
+                if eof:
+                    raise ValueError(f"Unterminated markup at byte {base + token} of DrugBank XML")
+                position = token
+                break
+            position = end
+            if token == markup:
+                if 0 <= declaration < end:
+                    declaration = _find_markup(buffer, b"!", end)
+                if 0 <= instruction < end:
+                    instruction = _find_markup(buffer, b"?", end)
+            elif match.group(1):
+                depth -= 1
+                if depth < 0:
+                    raise ValueError(f"</drug> without a matching <drug> at byte {base + token}")
+                if depth == 0:
+                    yield start, base + end - start
+            elif buffer[end - 2 : end - 1] == b"/":
+                if depth == 0:
+                    yield base + token, end - token
+            else:
+                depth += 1
+                if depth == 1:
+                    start = base + token
+
+        if eof:
+            break
+        base += position
+        buffer = buffer[position:]
+    if depth:
+        raise ValueError(f"Unterminated <drug> at byte {start} of DrugBank XML")
+
+
+def _find_markup(data: bytes, mark: bytes, position: int) -> int:
+    # Position of the next "<!" or "<?" from ``position``, or -1. The single
+    # mark byte is searched for, which runs many times faster than searching
+    # for the two bytes, and then checked to follow a "<".
+    index = data.find(mark, position + 1)
+    while index > 0 and data[index - 1] != 0x3C:
+        index = data.find(mark, index + 1)
+    return index - 1 if index > 0 else -1
+
+
+def _markup_end(data: bytes, position: int) -> int:
+    # End of the comment, CDATA section, processing instruction or
+    # declaration at ``position``, or 0 when it is not terminated in ``data``.
+    if data.startswith(b"<!--", position):
+        terminator = b"-->"
+    elif data.startswith(b"<![CDATA[", position):
+        terminator = b"]]>"
+    elif data.startswith(b"<?", position):
+        terminator = b"?>"
+    else:
+        terminator = b">"
+    end = data.find(terminator, position)
+    return end + len(terminator) if end >= 0 else 0
+
+
+def plan_shards(
+    spans: Iterator[tuple[int, int]],
+    shard_bytes: int,
+) -> list[tuple[int, int]]:
+    shards: list[tuple[int, int]] = []
+    shard_start = -1
+    shard_end = 0
+    for offset, length in spans:
+        if shard_start < 0:
+            shard_start = offset
+        shard_end = offset + length
+        if shard_end - shard_start >= shard_bytes:
+            shards.append((shard_start, shard_end))
+            shard_start = -1
+    if shard_start >= 0:
+        shards.append((shard_start, shard_end))
+    return shards
+
+
+class RecordReader:
+    # File-like view of header + the given byte ranges + </drugbank>, so a
+    # selection of drug records parses as a standalone document.
+
+    def __init__(self, path: str, header: bytes, ranges: list[tuple[int, int]]) -> None:
+        self._handle = open(path, "rb")
+        self._ranges = list(reversed(ranges))
+        self._remaining = 0
+        self._prefix = header
+        self._suffix = ROOT_END_TAG
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            return b"".join(iter(lambda: self.read(CHUNK_SIZE), b""))
+        if self._prefix:
+            data, self._prefix = self._prefix[:size], self._prefix[size:]
+            return data
+        while self._remaining <= 0 and self._ranges:
+            start, end = self._ranges.pop()
+            self._handle.seek(start)
+            self._remaining = end - start
+        if self._remaining > 0:
+            data = self._handle.read(min(size, self._remaining))
+            self._remaining = self._remaining - len(data) if data else 0
+            return data
+        data, self._suffix = self._suffix[:size], self._suffix[size:]
+        return data
+
+    def close(self) -> None:
+        self._handle.close()
+
+    def __enter__(self) -> "RecordReader":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
@@ -1,10 +1,23 @@
 from __future__ import annotations
 
+import hashlib
+import json
 from pathlib import Path
+from typing import Any
 
-import yaml
+from .models import DrugBankSchema, JoinSchema, RecordSchema, TableSchema
 
-from .models import DrugBankSchema, TableSchema
+TABLE_STORAGE = ("rows", "columnar")
+SCHEMA_FILES = ("tables.yml", "fields.yml", "profiles.yml")
+# Parsed copies of SCHEMA_FILES, each stored with the sha256 of the YAML it
+# came from and used only while that hash still matches.
+SNAPSHOT_FILE = "schema.json"
+SNAPSHOT_FORMAT = 1
+
+# Process-wide caches, keyed by file path and checked against the file's
+# mtime and size on every lookup.
+_FILE_CACHE: dict[Path, tuple[tuple[int, int], dict]] = {}
+_SCHEMA_CACHE: dict[Path, tuple[dict, dict, DrugBankSchema]] = {}
 
 
 def default_schema_dir() -> Path:
@@ -12,33 +25,147 @@ def default_schema_dir() -> Path:
 
 
 def load_schema(schema_dir: str | Path | None = None) -> DrugBankSchema:
+    # The returned schema is shared by every caller until a schema file
+    # changes, so it must not be modified.
+    base = (Path(schema_dir) if schema_dir is not None else default_schema_dir()).resolve()
+    tables_data = read_schema_file(base / "tables.yml")
+    fields_data = read_schema_file(base / "fields.yml")
+    cached = _SCHEMA_CACHE.get(base)
+    if cached is not None and cached[0] is tables_data and cached[1] is fields_data:
+        return cached[2]
+    schema = _build_schema(tables_data, fields_data)
+    _SCHEMA_CACHE[base] = (tables_data, fields_data, schema)
+    return schema
+
+
+def read_schema_file(path: Path, kind: str = "Schema") -> dict:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        raise FileNotFoundError(f"{kind} file does not exist: {path}") from None
+    signature = (stat.st_mtime_ns, stat.st_size)
+    cached = _FILE_CACHE.get(path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    source = path.read_bytes()
+    data = _read_snapshot(path, source)
+    if data is None:
+        data = _parse_yaml(source, path, kind)
+    _FILE_CACHE[path] = (signature, data)
+    return data
+
+
+def write_schema_snapshot(schema_dir: str | Path | None = None) -> Path:
+    # Regenerate after editing any file in SCHEMA_FILES; a stale snapshot is
+    # ignored, so forgetting only costs the YAML parse.
     base = Path(schema_dir) if schema_dir is not None else default_schema_dir()
-    tables_data = _read_yaml(base / "tables.yml")
-    fields_data = _read_yaml(base / "fields.yml")
+    files = {}
+    for name in SCHEMA_FILES:
+        path = base / name
+        if path.exists():
+            source = path.read_bytes()
+            files[name] = {
+                "sha256": hashlib.sha256(source).hexdigest(),
+                "data": _parse_yaml(source, path, "Schema"),
+            }
+    snapshot = base / SNAPSHOT_FILE
+    snapshot.write_text(
+        json.dumps({"format": SNAPSHOT_FORMAT, "files": files}, indent=2) + "\n",
+        encoding="utf-8",
+    )
+    return snapshot
+
+
+def _build_schema(tables_data: dict, fields_data: dict) -> DrugBankSchema:
+    from .extractors import validate_record
 
     tables = {}
     for name, definition in tables_data["tables"].items():
+        for key in definition.get("keys", []):
+            if key not in definition["columns"]:
+                raise ValueError(f"Table {name} key is not one of its columns: {key}")
+        if definition.get("storage", "rows") not in TABLE_STORAGE:
+            raise ValueError(f"Table {name} has unknown storage: {definition['storage']}")
         tables[name] = TableSchema(
             name=name,
             description=definition.get("description", ""),
             columns=list(definition["columns"]),
             required=list(definition.get("required", [])),
+            keys=list(definition.get("keys", [])),
+            storage=definition.get("storage", "rows"),
+            pools=dict(definition.get("pools", {})),
+            join=_read_join(name, definition["join"]) if "join" in definition else None,
         )
+    for table in tables.values():
+        if table.join is not None:
+            _validate_join(table, tables)
+
+    fields = dict(fields_data.get("fields", {}))
+    records = {}
+    for name, definition in (fields_data.get("records") or {}).items():
+        records[name] = RecordSchema(
+            name=name,
+            path=definition["path"],
+            fields=dict(definition.get("fields", {})),
+            parent=definition.get("parent"),
+        )
+        validate_record(records[name], fields)
 
     return DrugBankSchema(
         version=int(tables_data["version"]),
         tables=tables,
-        fields=dict(fields_data.get("fields", {})),
+        fields=fields,
+        records=records,
     )
 
 
-def _read_yaml(path: Path) -> dict:
-    if not path.exists():
-        raise FileNotFoundError(f"Schema file does not exist: {path}")
+def _read_join(name: str, definition: dict) -> JoinSchema:
+    if not definition.get("base") or not definition.get("lookups"):
+        raise ValueError(f"Table {name} join needs a base table and lookups")
+    return JoinSchema(
+        base=definition["base"],
+        lookups={table: list(keys) for table, keys in definition["lookups"].items()},
+    )
+
+
+def _validate_join(table: TableSchema, tables: dict[str, TableSchema]) -> None:
+    join = table.join
+    for source in [join.base, *join.lookups]:
+        if source not in tables:
+            raise ValueError(f"Table {table.name} joins unknown table: {source}")
+        if tables[source].join is not None:
+            raise ValueError(f"Table {table.name} joins another joined table: {source}")
+    for lookup, keys in join.lookups.items():
+        for key in keys:
+            if key not in tables[join.base].columns or key not in tables[lookup].columns:
+                raise ValueError(f"Table {table.name} joins {lookup} on a column missing from one side: {key}")
+    available = {column for source in [join.base, *join.lookups] for column in tables[source].columns}
+    for column in table.columns:
+        if column not in available:
+            raise ValueError(f"Table {table.name} column is not provided by any joined table: {column}")
+
+
+def _read_snapshot(path: Path, source: bytes) -> dict | None:
+    snapshot = path.parent / SNAPSHOT_FILE
+    if not snapshot.exists():
+        return None
+    try:
+        data: Any = json.loads(snapshot.read_text(encoding="utf-8"))
+    except ValueError:
+        return None
+    if not isinstance(data, dict) or data.get("format") != SNAPSHOT_FORMAT:
+        return None
+    entry = data.get("files", {}).get(path.name)
+    if entry is None or entry.get("sha256") != hashlib.sha256(source).hexdigest():
+        return None
+    return entry["data"]
+
 
-    with path.open("r", encoding="utf-8") as handle:
-        data = yaml.safe_load(handle)
+def _parse_yaml(source: bytes, path: Path, kind: str) -> dict:
+    import yaml
 
+    data = yaml.safe_load(source.decode("utf-8"))
     if not isinstance(data, dict):
-        raise ValueError(f"Schema file is empty or invalid: {path}")
+        raise ValueError(f"{kind} file is empty or invalid: {path}")
     return data
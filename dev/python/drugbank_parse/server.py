@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+import csv
+import json
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Iterable
+from urllib.parse import unquote
+
+from .models import ParseResult
+
+DEFAULT_PORT = 8765
+INDEX_TABLES = ("drugs", "targets", "drug_target")
+# Percentiles in /metrics cover this many recent requests per endpoint.
+LATENCY_SAMPLES = 10000
+MAX_QUERY_BYTES = 1024 * 1024
+
+
+class LookupIndex:
+    # In-memory hash indexes over the core drugs, targets and drug_target
+    # tables: drug_id to the drug and its target ids, target_id to the target
+    # and its drug ids, and gene_name to the targets with that gene.
+
+    def __init__(
+        self,
+        drugs: Iterable[dict[str, str]],
+        targets: Iterable[dict[str, str]],
+        drug_targets: Iterable[dict[str, str]],
+    ) -> None:
+        self.drugs = {row["drug_id"]: row for row in drugs}
+        self.targets: dict[str, dict[str, str]] = {}
+        self.genes: dict[str, list[str]] = {}
+        for row in targets:
+            self.targets[row["target_id"]] = row
+            if row.get("gene_name"):
+                self.genes.setdefault(row["gene_name"], []).append(row["target_id"])
+        self.drug_targets: dict[str, list[str]] = {}
+        self.target_drugs: dict[str, list[str]] = {}
+        for row in drug_targets:
+            self.drug_targets.setdefault(row["drug_id"], []).append(row["target_id"])
+            self.target_drugs.setdefault(row["target_id"], []).append(row["drug_id"])
+        self.lookups: dict[str, Callable[[str], dict[str, Any] | None]] = {
+            "drugs": self.drug,
+            "targets": self.target,
+            "genes": self.gene,
+        }
+
+    @classmethod
+    def from_result(cls, result: ParseResult) -> "LookupIndex":
+        missing = [table for table in INDEX_TABLES if table not in result.tables]
+        if missing:
+            raise KeyError(f"Lookup index needs the core tables, missing: {', '.join(missing)}")
+        return cls(*(result.rows(table) for table in INDEX_TABLES))
+
+    @classmethod
+    def from_csv_dir(cls, directory: str | Path) -> "LookupIndex":
+        tables = []
+        for table in INDEX_TABLES:
+            path = Path(directory) / f"{table}.csv"
+            if not path.exists():
+                raise FileNotFoundError(f"Lookup index needs {path.name} in {directory}")
+            with path.open("r", encoding="utf-8", newline="") as handle:
+                tables.append(list(csv.DictReader(handle)))
+        return cls(*tables)
+
+    def drug(self, drug_id: str) -> dict[str, Any] | None:
+        drug = self.drugs.get(drug_id)
+        if drug is None:
+            return None
+        targets = self.targets
+        return {
+            "drug": drug,
+            "targets": [targets[target_id] for target_id in self.drug_targets.get(drug_id, ()) if target_id in targets],
+        }
+
+    def target(self, target_id: str) -> dict[str, Any] | None:
+        target = self.targets.get(target_id)
+        if target is None:
+            return None
+        drugs = self.drugs
+        return {
+            "target": target,
+            "drugs": [drugs[drug_id] for drug_id in self.target_drugs.get(target_id, ()) if drug_id in drugs],
+        }
+
+    def gene(self, gene_name: str) -> dict[str, Any] | None:
+        target_ids = self.genes.get(gene_name)
+        if target_ids is None:
+            return None
+        drug_ids = dict.fromkeys(
+            drug_id for target_id in target_ids for drug_id in self.target_drugs.get(target_id, ())
+        )
+        return {
+            "gene_name": gene_name,
+            "targets": [self.targets[target_id] for target_id in target_ids],
+            "drugs": [self.drugs[drug_id] for drug_id in drug_ids if drug_id in self.drugs],
+        }
+
+    def query(self, request: Any) -> dict[str, dict[str, dict[str, Any] | None]]:
+        # Batched lookups: {"drugs": [...], "targets": [...], "genes": [...]}
+        # maps each key to its lookup result, or None when it is unknown.
+        if not isinstance(request, dict):
+            raise ValueError("Query must be a JSON object")
+        unknown = sorted(set(request) - set(self.lookups))
+        if unknown:
+            raise ValueError(f"Unknown query fields: {', '.join(unknown)}")
+        result = {}
+        for kind, keys in request.items():
+            if not isinstance(keys, list) or not all(isinstance(key, str) for key in keys):
+                raise ValueError(f"Query field {kind} must be a list of strings")
+            lookup = self.lookups[kind]
+            result[kind] = {key: lookup(key) for key in keys}
+        return result
+
+    def summary(self) -> dict[str, int]:
+        return {"drugs": len(self.drugs), "targets": len(self.targets), "genes": len(self.genes)}
+
+
+class LatencyMetrics:
+    # Request, key and error counts per endpoint, with latency percentiles
+    # over the last LATENCY_SAMPLES requests. Latency is the server's time
+    # from a parsed request to an encoded response.
+
+    def __init__(self, samples: int = LATENCY_SAMPLES) -> None:
+        self.started = time.time()
+        self._samples = samples
+        self._lock = threading.Lock()
+        self._endpoints: dict[str, dict[str, Any]] = {}
+
+    def record(self, endpoint: str, seconds: float, keys: int = 1, error: bool = False) -> None:
+        with self._lock:
+            entry = self._endpoints.get(endpoint)
+            if entry is None:
+                entry = self._endpoints[endpoint] = {
+                    "requests": 0,
+                    "keys": 0,
+                    "errors": 0,
+                    "seconds": 0.0,
+                    "recent": deque(maxlen=self._samples),
+                }
+            entry["requests"] += 1
+            entry["keys"] += keys
+            entry["errors"] += error
+            entry["seconds"] += seconds
+            entry["recent"].append(seconds)
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            endpoints = {name: (dict(entry), sorted(entry["recent"])) for name, entry in self._endpoints.items()}
+        return {
+            "uptime_seconds": round(time.time() - self.started, 3),
+            "endpoints": {
+                name: {
+                    "requests": entry["requests"],
+                    "keys": entry["keys"],
+                    "errors": entry["errors"],
+                    "mean_us": round(entry["seconds"] / entry["requests"] * 1e6, 1),
+                    "p50_us": _percentile_us(recent, 0.5),
+                    "p99_us": _percentile_us(recent, 0.99),
+                    "max_us": _percentile_us(recent, 1.0),
+                }
+                for name, (entry, recent) in endpoints.items()
+            },
+        }
+
+
+class LookupServer(ThreadingHTTPServer):
+    # JSON lookups over a LookupIndex:
+    #   GET /drugs/<drug_id>, /targets/<target_id>, /genes/<gene_name>
+    #   POST /query with {"drugs": [...], "targets": [...], "genes": [...]}
+    #   GET /metrics for index sizes and per-endpoint latency
+    # Every response carries its server time in a Server-Timing header.
+
+    daemon_threads = True
+
+    def __init__(self, index: LookupIndex, host: str = "127.0.0.1", port: int = DEFAULT_PORT) -> None:
+        self.index = index
+        self.metrics = LatencyMetrics()
+        super().__init__((host, port), _LookupHandler)
+
+
+class _LookupHandler(BaseHTTPRequestHandler):
+    # Keep-alive connections and unbuffered small writes keep a lookup well
+    # under a millisecond; without TCP_NODELAY the body waits on a delayed ACK.
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server: LookupServer
+
+    def do_GET(self) -> None:
+        start = time.perf_counter()
+        path = unquote(self.path.split("?", 1)[0])
+        kind, _, key = path.strip("/").partition("/")
+        if kind == "metrics" and not key:
+            self._send(200, {"index": self.server.index.summary(), **self.server.metrics.snapshot()}, start)
+            return
+        lookup = self.server.index.lookups.get(kind)
+        if lookup is None or not key:
+            self._send(404, {"error": f"Unknown path: {path}"}, start)
+            return
+        result = lookup(key)
+        if result is None:
+            self._send(404, {"error": f"Not found in {kind}: {key}"}, start, endpoint=kind)
+        else:
+            self._send(200, result, start, endpoint=kind)
+
+    def do_POST(self) -> None:
+        start = time.perf_counter()
+        path = self.path.split("?", 1)[0]
+        if path.rstrip("/") != "/query":
+            self._send(404, {"error": f"Unknown path: {path}"}, start)
+            return
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            # The body cannot be read past, so the connection is not reused.
+            self.close_connection = True
+            self._send(400, {"error": "Invalid Content-Length"}, start, endpoint="query")
+            return
+        if length > MAX_QUERY_BYTES:
+            self.close_connection = True
+            self._send(413, {"error": f"Query body over {MAX_QUERY_BYTES} bytes"}, start, endpoint="query")
+            return
+        try:
+            request = json.loads(self.rfile.read(length) or b"null")
+            result = self.server.index.query(request)
+        except ValueError as error:
+            self._send(400, {"error": str(error)}, start, endpoint="query")
+            return
+        # Keys as requested: a key asked for twice is answered once.
+        keys = sum(len(requested) for requested in request.values())
+        self._send(200, result, start, endpoint="query", keys=keys)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        # One stderr line per request would cost more than the lookup.
+        pass
+
+    def _send(self, status: int, payload: Any, start: float, endpoint: str | None = None, keys: int = 1) -> None:
+        body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        elapsed = time.perf_counter() - start
+        # Recorded before the response goes out, so a client that has read it
+        # finds it in /metrics.
+        if endpoint is not None:
+            self.server.metrics.record(endpoint, elapsed, keys, error=status >= 400)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Server-Timing", f"app;dur={elapsed * 1000:.3f}")
+        if self.close_connection:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def _percentile_us(sorted_seconds: list[float], fraction: float) -> float | None:
+    if not sorted_seconds:
+        return None
+    position = min(len(sorted_seconds) - 1, int(fraction * len(sorted_seconds)))
+    return round(sorted_seconds[position] * 1e6, 1)
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING, Protocol
+
+from .models import DrugBankSchema, TableJoin
+
+if TYPE_CHECKING:
+    from .stats import ParseStats
+
+DEDUPLICATED_TABLES = {
+    "targets": ("target_id",),
+}
+
+
+class RowSink(Protocol):
+    def open(self, tables: list[str]) -> None: ...
+
+    def add_row(self, table: str, row: dict[str, str]) -> None: ...
+
+    def close(self) -> None: ...
+
+
+def abort_sink(sink: RowSink) -> None:
+    # After a failed parse, sinks with an abort() method discard their partial
+    # output; the others are closed as usual.
+    abort = getattr(sink, "abort", None)
+    if abort is not None:
+        abort()
+    else:
+        sink.close()
+
+
+class DeduplicatingSink:
+    # Drops repeated rows of deduplicated tables as they arrive, keeping the
+    # first occurrence in document order.
+
+    def __init__(
+        self,
+        sink: RowSink,
+        key_fields: dict[str, tuple[str, ...]] | None = None,
+        stats: ParseStats | None = None,
+    ) -> None:
+        self.sink = sink
+        self.stats = stats
+        self.key_fields = dict(DEDUPLICATED_TABLES if key_fields is None else key_fields)
+        self._seen: dict[str, set[tuple[str, ...]]] = {table: set() for table in self.key_fields}
+
+    def open(self, tables: list[str]) -> None:
+        self.sink.open(tables)
+
+    def add_row(self, table: str, row: dict[str, str]) -> None:
+        fields = self.key_fields.get(table)
+        if fields is not None:
+            start = time.perf_counter() if self.stats is not None else 0.0
+            key = tuple(row.get(field, "") for field in fields)
+            seen = self._seen[table]
+            duplicate = key in seen
+            seen.add(key)
+            if self.stats is not None:
+                self.stats.add_time("dedup", time.perf_counter() - start)
+                if duplicate:
+                    self.stats.count(f"duplicates.{table}")
+            if duplicate:
+                return
+        self.sink.add_row(table, row)
+
+    def close(self) -> None:
+        self.sink.close()
+
+
+class JoiningSink:
+    # Produces the rows of joined (virtual) tables while streaming. Lookup rows
+    # are remembered by join key, keeping only the columns the join reads, and
+    # every base row is joined as it arrives. Document-order parsing emits a
+    # drug's lookup rows before its base rows, so once a base row has been
+    # joined the next drug-level lookup row starts another drug (or, when
+    # shards are merged, another shard) and the drug-level maps are cleared.
+    # Maps of deduplicated tables are kept whole; they hold one entry per
+    # target, and target rows arrive between a drug's base rows.
+
+    def __init__(self, sink: RowSink, joins: list[TableJoin]) -> None:
+        self.sink = sink
+        self.joins = [
+            (
+                join,
+                join.new_maps(),
+                [position for position, (lookup, _, _) in enumerate(join.lookups) if lookup not in DEDUPLICATED_TABLES],
+            )
+            for join in joins
+        ]
+        self._joined: set[str] = set()
+
+    def open(self, tables: list[str]) -> None:
+        self.sink.open(tables)
+
+    def add_row(self, table: str, row: dict[str, str]) -> None:
+        self.sink.add_row(table, row)
+        for join, maps, drug_maps in self.joins:
+            columns = join.lookup_columns(table)
+            if columns:
+                if join.name in self._joined and table not in DEDUPLICATED_TABLES:
+                    self._joined.discard(join.name)
+                    for position in drug_maps:
+                        maps[position].clear()
+                join.remember(maps, table, [row.get(column, "") for column in columns])
+            if table == join.base:
+                self._joined.add(join.name)
+                values = join.join_row([row.get(column, "") for column in join.base_columns], maps)
+                self.sink.add_row(join.name, dict(zip(join.columns, values)))
+
+    def close(self) -> None:
+        self.sink.close()
+
+
+def joined_tables(tables: list[str], schema: DrugBankSchema) -> list[TableJoin]:
+    joins = []
+    for table in tables:
+        if schema.tables[table].join is None:
+            continue
+        join = TableJoin(table, schema)
+        missing = [name for name in join.tables if name not in tables]
+        if missing:
+            raise ValueError(f"Table {table} is joined from tables that are not enabled: {', '.join(missing)}")
+        joins.append(join)
+    return joins
+
+
+def stored_tables(tables: list[str], schema: DrugBankSchema) -> list[str]:
+    # Tables the parser fills, with join bases after the tables they look up so
+    # merged shards replay lookup rows first.
+    stored = [table for table in tables if schema.tables[table].join is None]
+    bases = {join.base for join in joined_tables(tables, schema)}
+    return [table for table in stored if table not in bases] + [table for table in stored if table in bases]
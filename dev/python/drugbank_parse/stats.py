@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from typing import IO, Any, Iterator
+
+from .sinks import RowSink
+
+
+class ParseStats:
+    # Cumulative seconds per stage and event counters for one parse or export.
+    # Stages of sharded parses are summed over the worker processes.
+    #
+    # Parser stages: "tokenize" (lxml reading and tokenizing the input up to
+    # the next drug), "extract.drug", "module.<name>" (record extraction and
+    # emitting that module's rows, including "dedup" and "store"), "dedup"
+    # (duplicate-row checks), "store" (handing rows to the result or sink),
+    # "cleanup" (clearing parsed elements) and "merge" (replaying worker
+    # shards). A parse served from the cache records only "cache_load" and a
+    # "cache_hits" count. Exports add "write.<table>".
+
+    def __init__(self) -> None:
+        self.timers: dict[str, float] = {}
+        self.counters: dict[str, int] = {}
+
+    def add_time(self, stage: str, seconds: float) -> None:
+        self.timers[stage] = self.timers.get(stage, 0.0) + seconds
+
+    def count(self, name: str, amount: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    @contextmanager
+    def time(self, stage: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(stage, time.perf_counter() - start)
+
+    def merge(self, other: ParseStats) -> None:
+        for stage, seconds in other.timers.items():
+            self.add_time(stage, seconds)
+        for name, amount in other.counters.items():
+            self.count(name, amount)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "timers": {stage: round(seconds, 6) for stage, seconds in sorted(self.timers.items())},
+            "counters": dict(sorted(self.counters.items())),
+        }
+
+
+class TimedSink:
+    # Times every row handed to ``sink`` under ``stage`` and counts rows per
+    # table as "rows.<table>".
+
+    def __init__(self, sink: RowSink, stats: ParseStats, stage: str = "store") -> None:
+        self.sink = sink
+        self.stats = stats
+        self.stage = stage
+
+    def open(self, tables: list[str]) -> None:
+        self.sink.open(tables)
+
+    def add_row(self, table: str, row: dict[str, str]) -> None:
+        start = time.perf_counter()
+        self.sink.add_row(table, row)
+        self.stats.add_time(self.stage, time.perf_counter() - start)
+        self.stats.count(f"rows.{table}")
+
+    def close(self) -> None:
+        self.sink.close()
+
+
+class CountingReader:
+    # Counts the bytes the parser reads from a file object as "bytes".
+
+    def __init__(self, handle: IO[bytes], stats: ParseStats) -> None:
+        self._handle = handle
+        self._stats = stats
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._handle.read(size)
+        self._stats.count("bytes", len(data))
+        return data
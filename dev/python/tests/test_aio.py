@@ -0,0 +1,120 @@
+import asyncio
+
+import pytest
+from lxml import etree
+
+from drugbank_parse import ParseStats, aparse_drugbank_xml, parse_drugbank_xml
+from drugbank_parse.records import iter_drug_spans, read_xml_header
+
+
+def _repeated_drugs(source, target, copies):
+    data = source.read_bytes()
+    with source.open("rb") as handle:
+        header = read_xml_header(handle)
+        spans = list(iter_drug_spans(handle))
+    drugs = b"".join(data[start : start + length] for start, length in spans)
+    target.write_bytes(header + drugs * copies + b"</drugbank>\n")
+    return target
+
+
+async def _collect(batches):
+    try:
+        return [batch async for batch in batches]
+    finally:
+        await batches.aclose()
+
+
+def test_batches_hold_the_rows_of_a_full_parse(root_fixture_xml):
+    modules = ["core", "interactions"]
+    expected = parse_drugbank_xml(root_fixture_xml, modules=modules, layout="rows")
+
+    batches = asyncio.run(_collect(aparse_drugbank_xml(root_fixture_xml, modules=modules)))
+
+    assert len(batches) == 2
+    assert [batch["drugs"][0]["drug_id"] for batch in batches] == ["DB00001", "DB00014"]
+    for table, rows in expected.tables.items():
+        assert [row for batch in batches for row in batch.get(table, [])] == list(rows)
+
+
+def test_batch_drugs_groups_consecutive_drugs(root_fixture_xml, tmp_path):
+    xml_path = _repeated_drugs(root_fixture_xml, tmp_path / "drugs.xml", 5)
+
+    batches = asyncio.run(_collect(aparse_drugbank_xml(xml_path, batch_drugs=4)))
+
+    assert [len(batch["drugs"]) for batch in batches] == [4, 4, 2]
+
+
+def test_where_filters_batches(root_fixture_xml):
+    batches = asyncio.run(_collect(aparse_drugbank_xml(root_fixture_xml, where={"ids": ["DB00014"]})))
+
+    assert [[row["drug_id"] for row in batch["drugs"]] for batch in batches] == [["DB00014"]]
+
+
+def test_a_slow_consumer_holds_back_the_parser(root_fixture_xml, tmp_path):
+    xml_path = _repeated_drugs(root_fixture_xml, tmp_path / "drugs.xml", 50)
+    stats = ParseStats()
+
+    async def consume():
+        batches = aparse_drugbank_xml(xml_path, stats=stats, max_pending=2)
+        try:
+            await batches.__anext__()
+            await asyncio.sleep(0.2)
+            return stats.counters["drugs"]
+        finally:
+            await batches.aclose()
+
+    # One batch handed over, two waiting and one blocked in the parser.
+    assert asyncio.run(consume()) <= 4
+
+
+def test_leaving_early_stops_the_parser(root_fixture_xml, tmp_path):
+    xml_path = _repeated_drugs(root_fixture_xml, tmp_path / "drugs.xml", 50)
+    stats = ParseStats()
+
+    async def consume():
+        batches = aparse_drugbank_xml(xml_path, stats=stats, max_pending=1)
+        try:
+            async for _ in batches:
+                break
+        finally:
+            await batches.aclose()
+
+    asyncio.run(consume())
+
+    assert stats.counters["drugs"] < 10
+
+
+def test_cancelling_the_consumer_stops_the_parser(root_fixture_xml, tmp_path):
+    xml_path = _repeated_drugs(root_fixture_xml, tmp_path / "drugs.xml", 50)
+    stats = ParseStats()
+
+    async def consume(started):
+        async for _ in aparse_drugbank_xml(xml_path, stats=stats, max_pending=1):
+            started.set()
+            await asyncio.sleep(10)
+
+    async def cancel():
+        started = asyncio.Event()
+        task = asyncio.create_task(consume(started))
+        await started.wait()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel())
+
+    assert stats.counters["drugs"] < 10
+
+
+def test_parse_errors_reach_the_consumer(root_fixture_xml, tmp_path):
+    data = root_fixture_xml.read_bytes()
+    truncated = tmp_path / "truncated.xml"
+    truncated.write_bytes(data[: len(data) - 5000])
+
+    with pytest.raises(etree.XMLSyntaxError):
+        asyncio.run(_collect(aparse_drugbank_xml(truncated)))
+
+
+def test_invalid_batching_is_rejected(root_fixture_xml):
+    with pytest.raises(ValueError, match="max_pending must be at least 1, got 0"):
+        asyncio.run(_collect(aparse_drugbank_xml(root_fixture_xml, max_pending=0)))
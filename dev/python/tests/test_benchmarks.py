@@ -4,10 +4,14 @@ import importlib.util
 import json
 from pathlib import Path
 
+import pytest
 
-def load_python_benchmark(project_root: Path):
-    path = project_root / "dev" / "benchmarks" / "python_benchmark.py"
-    spec = importlib.util.spec_from_file_location("python_benchmark", path)
+from drugbank_parse import parse_drugbank_xml
+
+
+def load_python_benchmark(project_root: Path, name: str = "python_benchmark"):
+    path = project_root / "dev" / "benchmarks" / f"{name}.py"
+    spec = importlib.util.spec_from_file_location(name, path)
     module = importlib.util.module_from_spec(spec)
     assert spec.loader is not None
     spec.loader.exec_module(module)
@@ -40,6 +44,10 @@ def test_python_benchmark_writes_metrics_json(project_root, root_fixture_xml, tm
         "drug_indication": 2,
         "target_drug_indication": 3,
     }
+    assert saved["memory_usage"]["total"]["rows"] == 13
+    assert saved["memory_usage"]["drugs"]["strings"] > 0
+    assert saved["stats"]["counters"]["targets"] == 3
+    assert "module.core" in saved["stats"]["timers"]
     assert sorted(saved["written_files"]) == [
         "drug_indication.csv",
         "drug_target.csv",
@@ -47,3 +55,164 @@ def test_python_benchmark_writes_metrics_json(project_root, root_fixture_xml, tm
         "target_drug_indication.csv",
         "targets.csv",
     ]
+
+
+def test_extractor_benchmark_reports_per_drug_timings(project_root, root_fixture_xml, tmp_path):
+    benchmark = load_python_benchmark(project_root, "extractor_benchmark")
+    metrics_path = tmp_path / "extractor.json"
+
+    metrics = benchmark.run_benchmark(
+        input_path=root_fixture_xml,
+        metrics_path=metrics_path,
+        repeat=2,
+    )
+
+    assert json.loads(metrics_path.read_text(encoding="utf-8")) == metrics
+    assert metrics["drugs"] == 2
+    assert metrics["xpath_us_per_drug"] > 0
+    assert metrics["compiled_us_per_drug"] > 0
+
+
+def test_layout_benchmark_compares_columnar_and_row_layouts(project_root, root_fixture_xml, tmp_path):
+    benchmark = load_python_benchmark(project_root, "layout_benchmark")
+    metrics_path = tmp_path / "layout.json"
+
+    metrics = benchmark.run_benchmark(input_path=root_fixture_xml, metrics_path=metrics_path)
+
+    assert json.loads(metrics_path.read_text(encoding="utf-8")) == metrics
+    assert sorted(metrics["layouts"]) == ["columnar", "rows"]
+    assert metrics["layouts"]["columnar"]["table_rows"] == metrics["layouts"]["rows"]["table_rows"]
+    assert metrics["layouts"]["columnar"]["write_seconds"] >= 0
+
+
+def test_synthetic_drugbank_is_deterministic_and_parses_to_reported_rows(project_root, tmp_path):
+    generator = load_python_benchmark(project_root, "synthetic_drugbank")
+    first = generator.write_synthetic_drugbank(tmp_path / "a.xml", 25, interactions_per_drug=4, seed=3)
+    generator.write_synthetic_drugbank(tmp_path / "b.xml", 25, interactions_per_drug=4, seed=3)
+
+    result = parse_drugbank_xml(tmp_path / "a.xml", modules=["core", "interactions"])
+
+    assert (tmp_path / "a.xml").read_bytes() == (tmp_path / "b.xml").read_bytes()
+    assert {table: len(rows) for table, rows in result.tables.items()} == first["table_rows"]
+
+
+def test_scaling_benchmark_sweeps_sizes(project_root, tmp_path):
+    benchmark = load_python_benchmark(project_root, "scaling_benchmark")
+    metrics_path = tmp_path / "scaling.json"
+
+    metrics = benchmark.run_benchmark(
+        metrics_path=metrics_path,
+        sizes=[10, 40],
+        workdir=tmp_path / "work",
+        generator_options={"interactions_per_drug": 2},
+    )
+
+    assert json.loads(metrics_path.read_text(encoding="utf-8")) == metrics
+    assert [run["drugs"] for run in metrics["runs"]] == [10, 40]
+    for run in metrics["runs"]:
+        assert run["rows_match_generator"]
+        assert run["drugs_per_second"] > 0
+        assert run["mb_per_second"] > 0
+        assert run["table_rows"]["drug_interactions"] == run["drugs"] * 2
+
+
+def test_startup_benchmark_measures_cold_start(project_root, root_fixture_xml, tmp_path):
+    benchmark = load_python_benchmark(project_root, "startup_benchmark")
+    metrics_path = tmp_path / "startup.json"
+
+    metrics = benchmark.run_benchmark(root_fixture_xml, metrics_path, repeats=1)
+
+    assert json.loads(metrics_path.read_text(encoding="utf-8")) == metrics
+    for name in ("python_seconds", "import_seconds", "help_seconds", "first_parse_seconds"):
+        assert metrics[name] > 0
+    assert set(metrics["schema_load_ms"]) == {"yaml", "snapshot", "cached"}
+
+
+def test_module_benchmark_compares_single_and_combined_parses(project_root, root_fixture_xml, tmp_path):
+    benchmark = load_python_benchmark(project_root, "module_benchmark")
+    metrics_path = tmp_path / "modules.json"
+
+    metrics = benchmark.run_benchmark(root_fixture_xml, metrics_path)
+
+    assert json.loads(metrics_path.read_text(encoding="utf-8")) == metrics
+    assert metrics["modules"] == ["core", "interactions"]
+    assert set(metrics["combined"]["module_seconds"]) == {"core", "interactions"}
+    assert metrics["combined"]["table_rows"]["drugs"] == metrics["runs"]["core"]["table_rows"]["drugs"]
+
+
+def test_filter_benchmark_compares_filters_with_tokenizing(project_root, root_fixture_xml, tmp_path):
+    benchmark = load_python_benchmark(project_root, "filter_benchmark")
+    metrics_path = tmp_path / "filters.json"
+
+    metrics = benchmark.run_benchmark(root_fixture_xml, metrics_path, filters={"ids": {"ids": ["DB00014"]}})
+
+    assert json.loads(metrics_path.read_text(encoding="utf-8")) == metrics
+    assert metrics["tokenize_only_seconds"] > 0
+    assert metrics["runs"]["unfiltered"]["drugs"] == 2
+    assert metrics["runs"]["ids"]["drugs"] == 1
+
+
+def test_prune_benchmark_compares_full_and_pruned_parses(project_root, root_fixture_xml, tmp_path):
+    benchmark = load_python_benchmark(project_root, "prune_benchmark")
+    metrics_path = tmp_path / "prune.json"
+
+    metrics = benchmark.run_benchmark(root_fixture_xml, metrics_path, repeats=1)
+
+    assert json.loads(metrics_path.read_text(encoding="utf-8")) == metrics
+    assert set(metrics["runs"]) == {"full", "pruned"}
+    assert metrics["rows_match"]
+    assert metrics["runs"]["pruned"]["table_rows"]["drugs"] == 2
+
+
+def test_engine_benchmark_checks_and_times_every_engine(project_root, root_fixture_xml, tmp_path):
+    benchmark = load_python_benchmark(project_root, "engine_benchmark")
+    metrics_path = tmp_path / "engines.json"
+
+    metrics = benchmark.run_benchmark(root_fixture_xml, metrics_path, repeats=1)
+
+    assert json.loads(metrics_path.read_text(encoding="utf-8")) == metrics
+    assert set(metrics["runs"]) == {"lxml", "expat", "sax"}
+    assert metrics["conformant"]
+    assert metrics["rows_match"]
+    assert metrics["runs"]["sax"]["drugs_per_second"] > 0
+
+
+def test_async_benchmark_compares_batches_with_a_blocking_parse(project_root, root_fixture_xml, tmp_path):
+    benchmark = load_python_benchmark(project_root, "async_benchmark")
+    metrics_path = tmp_path / "async.json"
+
+    metrics = benchmark.run_benchmark(root_fixture_xml, metrics_path)
+
+    assert json.loads(metrics_path.read_text(encoding="utf-8")) == metrics
+    assert metrics["batches"] == 2
+    assert metrics["rows_match"]
+    assert metrics["first_batch_seconds"] <= metrics["async_seconds"]
+
+
+def test_serve_benchmark_times_single_and_batched_lookups(project_root, root_fixture_xml, tmp_path):
+    benchmark = load_python_benchmark(project_root, "serve_benchmark")
+    metrics_path = tmp_path / "serve.json"
+
+    metrics = benchmark.run_benchmark(root_fixture_xml, metrics_path, requests=40, clients=2, batch_size=4)
+
+    assert json.loads(metrics_path.read_text(encoding="utf-8")) == metrics
+    assert metrics["single"]["requests"] == 40
+    assert metrics["batched"]["requests"] == 10
+    assert metrics["batched"]["batch_size"] == 2
+    assert metrics["server_endpoints"]["query"]["keys"] == 20
+    assert metrics["in_process_lookup_us"] > 0
+
+
+def test_graph_benchmark_matches_python_adjacency(project_root, root_fixture_xml, tmp_path):
+    pytest.importorskip("numpy")
+    benchmark = load_python_benchmark(project_root, "graph_benchmark")
+    metrics_path = tmp_path / "graph.json"
+
+    metrics = benchmark.run_benchmark(root_fixture_xml, metrics_path, queries=5, hops=2)
+
+    assert json.loads(metrics_path.read_text(encoding="utf-8")) == metrics
+    assert metrics["results_match"] is True
+    assert metrics["targets"] == 3
+    assert metrics["drug_target_edges"] == 3
+    assert metrics["interaction_edges"] > 0
+    assert metrics["saved_mb"] > 0
@@ -0,0 +1,101 @@
+import os
+import time
+
+import pytest
+
+from drugbank_parse import ParseCache, ParseStats, parse_drugbank_xml
+from drugbank_parse.cache import CACHE_SUFFIX
+
+
+def test_cache_hit_returns_identical_tables(root_fixture_xml, tmp_path):
+    cache_dir = tmp_path / "cache"
+    expected = parse_drugbank_xml(root_fixture_xml)
+
+    first = parse_drugbank_xml(root_fixture_xml, cache=cache_dir)
+    entries = list(cache_dir.glob(f"*{CACHE_SUFFIX}"))
+    second = parse_drugbank_xml(root_fixture_xml, cache=cache_dir)
+
+    assert len(entries) == 1
+    assert first.tables == expected.tables
+    assert second.tables == expected.tables
+
+
+def test_cache_hit_reports_stats_and_progress(root_fixture_xml, tmp_path):
+    parse_drugbank_xml(root_fixture_xml, cache=tmp_path)
+    stats = ParseStats()
+    reports = []
+
+    parse_drugbank_xml(root_fixture_xml, cache=tmp_path, stats=stats, progress=reports.append)
+
+    assert stats.counters == {"cache_hits": 1}
+    assert list(stats.timers) == ["cache_load"]
+    assert len(reports) == 1
+    assert reports[0].done
+    assert reports[0].drugs == 2
+    assert reports[0].bytes_read == reports[0].total_bytes == root_fixture_xml.stat().st_size
+
+
+def test_cache_key_depends_on_modules_and_package_version(root_fixture_xml, tmp_path, monkeypatch):
+    cache = ParseCache(tmp_path)
+    core_key = cache.key(root_fixture_xml, ["core"], ["drugs"])
+
+    assert cache.key(root_fixture_xml, [], []) != core_key
+    monkeypatch.setattr("drugbank_parse.cache.__version__", "999")
+    assert cache.key(root_fixture_xml, ["core"], ["drugs"]) != core_key
+
+
+def test_cache_evicts_entries_from_other_versions_and_by_size(root_fixture_xml, tmp_path, monkeypatch):
+    cache = ParseCache(tmp_path)
+    result = parse_drugbank_xml(root_fixture_xml)
+    stale = cache.put("stale", result)
+
+    monkeypatch.setattr("drugbank_parse.cache.__version__", "999")
+    older = cache.put("older", result)
+    os.utime(older, (time.time() - 60, time.time() - 60))
+    assert not stale.exists()
+
+    cache.max_bytes = older.stat().st_size + 1
+    newer = cache.put("newer", result)
+
+    assert newer.exists()
+    assert not older.exists()
+    assert cache.get("newer").tables == result.tables
+
+
+def test_cache_expires_entries_by_age_even_when_hit(root_fixture_xml, tmp_path, monkeypatch):
+    cache = ParseCache(tmp_path, max_age_seconds=3600)
+    written = time.time() - 7200
+    monkeypatch.setattr("drugbank_parse.cache.time.time", lambda: written)
+    path = cache.put("entry", parse_drugbank_xml(root_fixture_xml))
+    monkeypatch.undo()
+    # A recent hit refreshes the mtime, which does not extend the entry's age.
+    os.utime(path)
+
+    assert cache.get("entry") is None
+    assert not path.exists()
+
+
+@pytest.mark.parametrize("layout", ["columnar", "rows"])
+def test_cache_hit_restores_layout_and_shared_pools(root_fixture_xml, tmp_path, layout):
+    modules = ["core", "interactions"]
+    parse_drugbank_xml(root_fixture_xml, modules=modules, cache=tmp_path)
+    expected = parse_drugbank_xml(root_fixture_xml, modules=modules, layout=layout)
+
+    cached = parse_drugbank_xml(root_fixture_xml, modules=modules, layout=layout, cache=tmp_path)
+
+    assert [type(rows) for rows in cached.tables.values()] == [type(rows) for rows in expected.tables.values()]
+    assert cached.tables == expected.tables
+    interactions = cached.tables["drug_interactions"]
+    assert interactions.pools[0] is interactions.pools[1] is cached.pools["drug_ids"]
+    if layout == "columnar":
+        assert cached.tables["drugs"].pools[0] is cached.pools["drug_ids"]
+
+
+def test_truncated_cache_entry_is_parsed_again(root_fixture_xml, tmp_path):
+    first = parse_drugbank_xml(root_fixture_xml, cache=tmp_path)
+    (path,) = tmp_path.glob(f"*{CACHE_SUFFIX}")
+    data = path.read_bytes()
+    path.write_bytes(data[:-4])
+
+    assert parse_drugbank_xml(root_fixture_xml, cache=tmp_path).tables == first.tables
+    assert path.read_bytes()[-4:] == data[-4:]
@@ -1,3 +1,8 @@
+import gzip
+import json
+
+import pytest
+
 from drugbank_parse.cli import main
 
 
@@ -14,3 +19,98 @@ def test_cli_writes_core_tables(root_fixture_xml, tmp_path):
     assert exit_code == 0
     assert (tmp_path / "drugs.csv").exists()
     assert (tmp_path / "target_drug_indication.csv").exists()
+
+
+@pytest.mark.parametrize("workers", ["0", "-2"])
+def test_cli_rejects_non_positive_workers(root_fixture_xml, tmp_path, capsys, workers):
+    with pytest.raises(SystemExit) as error:
+        main(["--input", str(root_fixture_xml), "--outdir", str(tmp_path), "--workers", workers])
+
+    assert error.value.code == 2
+    assert f"--workers must be at least 1, got {workers}" in capsys.readouterr().err
+
+
+def test_cli_stream_mode_writes_core_tables(root_fixture_xml, tmp_path):
+    exit_code = main([
+        "--input",
+        str(root_fixture_xml),
+        "--outdir",
+        str(tmp_path),
+        "--stream",
+    ])
+
+    assert exit_code == 0
+    assert (tmp_path / "targets.csv").exists()
+    assert (tmp_path / "drug_indication.csv").exists()
+
+
+def test_cli_reuses_parse_cache(root_fixture_xml, tmp_path):
+    arguments = [
+        "--input",
+        str(root_fixture_xml),
+        "--outdir",
+        str(tmp_path / "out"),
+        "--cache-dir",
+        str(tmp_path / "cache"),
+    ]
+
+    assert main(arguments) == 0
+    assert main(arguments) == 0
+    assert len(list((tmp_path / "cache").glob("*.dbcache"))) == 1
+    assert (tmp_path / "out" / "drugs.csv").exists()
+
+
+def test_cli_stream_mode_writes_sqlite_database(root_fixture_xml, tmp_path):
+    exit_code = main([
+        "--input",
+        str(root_fixture_xml),
+        "--outdir",
+        str(tmp_path),
+        "--format",
+        "sqlite",
+        "--stream",
+    ])
+
+    assert exit_code == 0
+    assert (tmp_path / "drugbank.sqlite").exists()
+
+
+def test_cli_reads_gzip_input(root_fixture_xml, tmp_path):
+    compressed = tmp_path / "drugbank.xml.gz"
+    compressed.write_bytes(gzip.compress(root_fixture_xml.read_bytes()))
+
+    exit_code = main(["--input", str(compressed), "--outdir", str(tmp_path / "out")])
+
+    assert exit_code == 0
+    assert (tmp_path / "out" / "drugs.csv").exists()
+
+
+def test_cli_writes_gzip_compressed_csvs(root_fixture_xml, tmp_path):
+    exit_code = main([
+        "--input",
+        str(root_fixture_xml),
+        "--outdir",
+        str(tmp_path),
+        "--compression",
+        "gzip",
+        "--stream",
+    ])
+
+    assert exit_code == 0
+    assert gzip.decompress((tmp_path / "drugs.csv.gz").read_bytes()).startswith(b"drug_id,drug_name,inchi,source\r\n")
+
+
+def test_cli_prints_stats_to_stderr(root_fixture_xml, tmp_path, capsys):
+    exit_code = main(["--input", str(root_fixture_xml), "--outdir", str(tmp_path), "--stats"])
+
+    stats = json.loads(capsys.readouterr().err)
+    assert exit_code == 0
+    assert stats["counters"]["rows.drugs"] == 2
+    assert "tokenize" in stats["timers"]
+
+
+def test_cli_reports_progress_to_stderr(root_fixture_xml, tmp_path, capsys):
+    exit_code = main(["--input", str(root_fixture_xml), "--outdir", str(tmp_path), "--progress"])
+
+    assert exit_code == 0
+    assert "100.0%" in capsys.readouterr().err
@@ -0,0 +1,105 @@
+import csv
+
+import pytest
+
+from drugbank_parse import (
+    build_drug_index,
+    diff_drugbank_release,
+    parse_drugbank_xml,
+    write_drugbank_tables,
+)
+from drugbank_parse.cli import main
+from drugbank_parse.records import iter_drug_spans, read_xml_header
+from drugbank_parse.schema import load_schema
+
+
+@pytest.fixture
+def releases(root_fixture_xml, tmp_path):
+    old_xml = tmp_path / "old.xml"
+    old_xml.write_bytes(root_fixture_xml.read_bytes())
+    old_outdir = tmp_path / "old"
+    write_drugbank_tables(parse_drugbank_xml(old_xml), old_outdir)
+    build_drug_index(old_xml)
+
+    with old_xml.open("rb") as handle:
+        header = read_xml_header(handle)
+        spans = list(iter_drug_spans(handle))
+    data = old_xml.read_bytes()
+    lepirudin, goserelin = [data[offset : offset + length] for offset, length in spans]
+    changed = goserelin.replace(b"<name>Goserelin</name>", b"<name>Goserelin acetate</name>", 1)
+    added = lepirudin.replace(b">DB00001</drugbank-id>", b">DB99999</drugbank-id>", 1)
+    new_xml = tmp_path / "new.xml"
+    new_xml.write_bytes(header + b"\n" + changed + b"\n" + added + b"\n</drugbank>\n")
+    return old_xml, old_outdir, new_xml
+
+
+def read_csv(path):
+    with path.open("r", encoding="utf-8", newline="") as handle:
+        return list(csv.DictReader(handle))
+
+
+def test_diff_reports_added_removed_and_changed_drugs(releases, tmp_path):
+    old_xml, old_outdir, new_xml = releases
+
+    summary = diff_drugbank_release(old_xml.with_name("old.xml.dbidx"), old_outdir, new_xml, tmp_path / "delta")
+
+    assert summary["drugs"] == {"insert": 1, "delete": 1, "update": 1}
+    assert summary["targets"] == {"insert": 0, "delete": 0, "update": 0}
+    assert summary["drug_target"] == {"insert": 1, "delete": 1, "update": 0}
+    assert read_csv(tmp_path / "delta" / "drugs.delete.csv") == [{"drug_id": "DB00001"}]
+    assert [row["drug_name"] for row in read_csv(tmp_path / "delta" / "drugs.update.csv")] == ["Goserelin acetate"]
+    assert (tmp_path / "delta" / "release.dbidx").exists()
+
+
+def test_applying_delta_reproduces_full_parse(releases, tmp_path):
+    old_xml, old_outdir, new_xml = releases
+    delta_dir = tmp_path / "delta"
+    diff_drugbank_release(old_xml.with_name("old.xml.dbidx"), old_outdir, new_xml, delta_dir)
+    expected = parse_drugbank_xml(new_xml)
+
+    schema = load_schema()
+    for table_name in expected.tables:
+        table = schema.tables[table_name]
+        rows = {tuple(row[key] for key in table.keys): row for row in read_csv(old_outdir / f"{table_name}.csv")}
+        for row in read_csv(delta_dir / f"{table_name}.delete.csv"):
+            del rows[tuple(row[key] for key in table.keys)]
+        for kind in ("insert", "update"):
+            for row in read_csv(delta_dir / f"{table_name}.{kind}.csv"):
+                rows[tuple(row[key] for key in table.keys)] = row
+
+        assert sorted(rows.values(), key=lambda row: tuple(row.values())) == sorted(
+            expected.rows(table_name), key=lambda row: tuple(row.values())
+        )
+
+
+def test_delta_covers_the_tables_of_a_full_parse(releases, tmp_path):
+    old_xml, old_outdir, new_xml = releases
+    modules = ["core", "interactions"]
+    write_drugbank_tables(parse_drugbank_xml(old_xml, modules=modules), old_outdir)
+
+    summary = diff_drugbank_release(
+        old_xml.with_name("old.xml.dbidx"), old_outdir, new_xml, tmp_path / "delta", modules=modules
+    )
+
+    assert list(summary) == list(parse_drugbank_xml(new_xml, modules=modules).tables)
+    assert summary["drug_interactions"]["delete"] > 0
+
+
+def test_cli_diff_subcommand(releases, tmp_path, capsys):
+    old_xml, old_outdir, new_xml = releases
+
+    exit_code = main([
+        "diff",
+        "--previous-index",
+        str(old_xml.with_name("old.xml.dbidx")),
+        "--previous-outdir",
+        str(old_outdir),
+        "--input",
+        str(new_xml),
+        "--outdir",
+        str(tmp_path / "delta"),
+    ])
+
+    assert exit_code == 0
+    assert "drugs: insert=1, delete=1, update=1" in capsys.readouterr().out
+    assert (tmp_path / "delta" / "target_drug_indication.insert.csv").exists()
@@ -0,0 +1,91 @@
+import io
+from xml.parsers.expat import ExpatError
+from xml.sax import SAXParseException
+
+import pytest
+
+from drugbank_parse import engines, parse_drugbank_xml, stream_drugbank_xml, write_drugbank_tables
+from drugbank_parse.cli import main
+from drugbank_parse.engines import iter_drug_elements
+from drugbank_parse.exporters import CsvTableSink
+from drugbank_parse.extractors import element_text, qualified
+
+MIXED = (
+    b'<drugbank xmlns="http://www.drugbank.ca"><drug type="biotech">'
+    b"<description>A <b>bold</b> and <i>italic</i> tail</description></drug></drugbank>"
+)
+
+
+@pytest.mark.parametrize("engine", ["lxml", "expat", "sax"])
+def test_engine_core_csvs_match_expected_fixture(root_fixture_xml, tmp_path, project_root, engine):
+    result = parse_drugbank_xml(root_fixture_xml, engine=engine)
+    write_drugbank_tables(result, tmp_path)
+
+    expected_dir = project_root / "dev" / "fixtures" / "expected" / "core"
+    for expected_path in expected_dir.glob("*.csv"):
+        actual = (tmp_path / expected_path.name).read_text(encoding="utf-8")
+        assert actual == expected_path.read_text(encoding="utf-8")
+
+
+@pytest.mark.parametrize("engine", ["expat", "sax"])
+@pytest.mark.parametrize("prune", [True, False])
+@pytest.mark.parametrize("workers", [1, 2])
+def test_engines_match_lxml(root_fixture_xml, engine, prune, workers):
+    modules = ["core", "interactions"]
+    expected = parse_drugbank_xml(root_fixture_xml, modules=modules, layout="rows")
+    result = parse_drugbank_xml(
+        root_fixture_xml, modules=modules, layout="rows", engine=engine, prune=prune, workers=workers
+    )
+
+    assert result.tables == expected.tables
+
+
+@pytest.mark.parametrize("engine", ["expat", "sax"])
+def test_engines_join_text_split_across_reads(root_fixture_xml, monkeypatch, engine):
+    monkeypatch.setattr(engines, "READ_SIZE", 7)
+    expected = parse_drugbank_xml(root_fixture_xml, layout="rows")
+
+    result = parse_drugbank_xml(root_fixture_xml, layout="rows", engine=engine, prune=False)
+
+    assert result.tables == expected.tables
+
+
+@pytest.mark.parametrize("engine", ["expat", "sax"])
+def test_stream_elements_read_mixed_content_like_lxml(engine):
+    (expected,) = iter_drug_elements(io.BytesIO(MIXED))
+    (drug,) = iter_drug_elements(io.BytesIO(MIXED), engine)
+
+    description = next(drug.iterchildren(qualified("description")))
+    assert drug.get("type") == "biotech"
+    assert len(description) == 2
+    assert element_text(description) == element_text(expected[0])
+    assert list(description.itertext()) == ["A ", "bold", " and ", "italic", " tail"]
+
+
+def test_stream_drugbank_xml_accepts_an_engine(root_fixture_xml, tmp_path):
+    sink = CsvTableSink(tmp_path)
+
+    stream_drugbank_xml(root_fixture_xml, sink, engine="expat")
+
+    assert len((tmp_path / "drugs.csv").read_text(encoding="utf-8").splitlines()) == 3
+
+
+def test_unknown_engine_is_rejected(root_fixture_xml):
+    with pytest.raises(ValueError, match="Unknown engine: minidom"):
+        parse_drugbank_xml(root_fixture_xml, engine="minidom")
+
+
+@pytest.mark.parametrize(("engine", "error"), [("expat", ExpatError), ("sax", SAXParseException)])
+def test_engines_report_truncated_input(root_fixture_xml, engine, error):
+    data = root_fixture_xml.read_bytes()
+
+    with pytest.raises(error):
+        parse_drugbank_xml(io.BytesIO(data[: len(data) - 5000]), engine=engine)
+
+
+def test_cli_engine_writes_the_same_tables(root_fixture_xml, tmp_path):
+    for engine in ("lxml", "sax"):
+        assert main(["--input", str(root_fixture_xml), "--outdir", str(tmp_path / engine), "--engine", engine]) == 0
+
+    for path in (tmp_path / "lxml").iterdir():
+        assert (tmp_path / "sax" / path.name).read_bytes() == path.read_bytes()
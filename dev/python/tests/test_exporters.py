@@ -1,6 +1,18 @@
 import csv
+import gzip
+import sqlite3
 
-from drugbank_parse import parse_drugbank_xml, write_drugbank_tables
+import pytest
+
+from drugbank_parse import (
+    ArrowTableSink,
+    CsvTableSink,
+    parse_drugbank_xml,
+    stream_drugbank_xml,
+    write_drugbank_sqlite,
+    write_drugbank_tables,
+)
+from drugbank_parse.exporters import table_sink
 
 
 def test_write_drugbank_tables_creates_core_csvs(root_fixture_xml, tmp_path):
@@ -49,3 +61,173 @@ def test_exported_core_csvs_match_expected_fixture(root_fixture_xml, tmp_path, p
         expected_path = expected_dir / filename
         actual_path = tmp_path / filename
         assert actual_path.read_text(encoding="utf-8") == expected_path.read_text(encoding="utf-8")
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_streamed_core_csvs_match_expected_fixture(root_fixture_xml, tmp_path, project_root, workers):
+    sink = CsvTableSink(tmp_path)
+
+    tables = stream_drugbank_xml(root_fixture_xml, sink, workers=workers)
+
+    assert [path.name for path in sink.paths] == [f"{table}.csv" for table in tables]
+    expected_dir = project_root / "dev" / "fixtures" / "expected" / "core"
+    for path in sink.paths:
+        expected_path = expected_dir / path.name
+        assert path.read_text(encoding="utf-8") == expected_path.read_text(encoding="utf-8")
+
+
+@pytest.mark.parametrize("output_format", ["parquet", "arrow"])
+def test_columnar_exports_match_csv_export(root_fixture_xml, tmp_path, output_format):
+    pytest.importorskip("pyarrow")
+    from pyarrow import ipc, parquet
+
+    result = parse_drugbank_xml(root_fixture_xml)
+    write_drugbank_tables(result, tmp_path / "csv")
+
+    written = write_drugbank_tables(result, tmp_path / output_format, format=output_format)
+
+    assert sorted(path.name for path in written) == [
+        f"{table}.{output_format}"
+        for table in sorted(["drugs", "targets", "drug_target", "drug_indication", "target_drug_indication"])
+    ]
+    for path in written:
+        if output_format == "parquet":
+            table = parquet.read_table(path)
+        else:
+            table = ipc.open_file(path).read_all()
+        with (tmp_path / "csv" / f"{path.stem}.csv").open("r", encoding="utf-8", newline="") as handle:
+            expected_rows = list(csv.reader(handle))
+        assert table.column_names == expected_rows[0]
+        assert [list(row.values()) for row in table.to_pylist()] == expected_rows[1:]
+        assert all(str(field.type).startswith("dictionary") for field in table.schema)
+
+
+def test_arrow_sink_writes_multiple_row_groups(root_fixture_xml, tmp_path):
+    pytest.importorskip("pyarrow")
+    from pyarrow import ipc
+
+    sink = ArrowTableSink(tmp_path, format="arrow", row_group_size=1)
+    stream_drugbank_xml(root_fixture_xml, sink)
+
+    reader = ipc.open_file(tmp_path / "drug_target.arrow")
+    assert reader.num_record_batches == 3
+    assert reader.read_all().column("target_id").to_pylist() == ["P00734", "P22888", "P30968"]
+
+
+def test_arrow_sink_writes_new_dictionary_values_as_deltas(tmp_path):
+    pytest.importorskip("pyarrow")
+    from pyarrow import ipc
+
+    sink = ArrowTableSink(tmp_path, format="arrow", row_group_size=2)
+    sink.open(["drug_target"])
+    target_ids = ["P1", "P2", "P1", "P1", "P3", "P2", "P4"]
+    for target_id in target_ids:
+        sink.add_row("drug_target", {"drug_id": "DB1", "target_id": target_id, "source": "DrugBank"})
+    sink.close()
+
+    reader = ipc.open_file(tmp_path / "drug_target.arrow")
+    table = reader.read_all()
+    assert table.column("target_id").to_pylist() == target_ids
+    assert table.column("target_id").chunk(3).dictionary.to_pylist() == ["P1", "P2", "P3", "P4"]
+    assert reader.stats.num_dictionary_deltas == 2
+    assert reader.stats.num_replaced_dictionaries == 0
+
+
+def test_unknown_output_format_fails_clearly(root_fixture_xml, tmp_path):
+    result = parse_drugbank_xml(root_fixture_xml)
+
+    with pytest.raises(ValueError, match="Unknown output format"):
+        write_drugbank_tables(result, tmp_path, format="xlsx")
+
+
+@pytest.mark.parametrize("compression", ["gzip", "zstd"])
+def test_compressed_csvs_decompress_to_plain_csv_bytes(root_fixture_xml, tmp_path, compression):
+    if compression == "zstd":
+        zstandard = pytest.importorskip("zstandard")
+        decompress = lambda data: zstandard.ZstdDecompressor().stream_reader(data).read()
+    else:
+        decompress = gzip.decompress
+    result = parse_drugbank_xml(root_fixture_xml)
+    plain = write_drugbank_tables(result, tmp_path / "plain")
+
+    written = write_drugbank_tables(result, tmp_path / "compressed", compression=compression)
+
+    suffix = ".gz" if compression == "gzip" else ".zst"
+    assert [path.name for path in written] == [path.name + suffix for path in plain]
+    for plain_path, compressed_path in zip(plain, written):
+        assert decompress(compressed_path.read_bytes()) == plain_path.read_bytes()
+
+
+def test_compressed_csv_spans_several_blocks(root_fixture_xml, tmp_path, monkeypatch):
+    monkeypatch.setattr("drugbank_parse.exporters.COMPRESSION_BLOCK_SIZE", 64)
+    result = parse_drugbank_xml(root_fixture_xml)
+    plain = write_drugbank_tables(result, tmp_path / "plain")
+
+    written = write_drugbank_tables(result, tmp_path / "compressed", compression="gzip")
+
+    for plain_path, compressed_path in zip(plain, written):
+        assert gzip.decompress(compressed_path.read_bytes()) == plain_path.read_bytes()
+
+
+def test_compression_is_rejected_for_columnar_formats(tmp_path):
+    with pytest.raises(ValueError, match="CSV output only"):
+        table_sink(tmp_path, format="parquet", compression="gzip")
+
+
+def test_write_drugbank_sqlite_loads_tables_and_indexes(root_fixture_xml, tmp_path):
+    result = parse_drugbank_xml(root_fixture_xml)
+
+    db_path = write_drugbank_sqlite(result, tmp_path / "drugbank.sqlite")
+
+    with sqlite3.connect(db_path) as connection:
+        counts = {
+            table: connection.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0]
+            for table in result.tables
+        }
+        drugs = connection.execute("SELECT * FROM drugs ORDER BY drug_id").fetchall()
+        indexes = {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        plan = connection.execute(
+            "EXPLAIN QUERY PLAN SELECT drug_id FROM drug_target WHERE target_id = 'P00734'"
+        ).fetchall()
+
+    assert counts == {table: len(rows) for table, rows in result.tables.items()}
+    assert drugs == [tuple(row.values()) for row in result.rows("drugs")]
+    assert "idx_drug_target_target_id" in indexes
+    assert "idx_target_drug_indication_drug_id" in indexes
+    assert "idx_drug_target_target_id" in str(plan)
+
+
+def test_write_drugbank_sqlite_streams_from_xml(root_fixture_xml, tmp_path):
+    db_path = write_drugbank_sqlite(root_fixture_xml, tmp_path / "stream.sqlite")
+    expected = parse_drugbank_xml(root_fixture_xml)
+
+    with sqlite3.connect(db_path) as connection:
+        rows = connection.execute("SELECT * FROM target_drug_indication").fetchall()
+
+    assert sorted(rows) == sorted(tuple(row.values()) for row in expected.rows("target_drug_indication"))
+
+
+def test_failed_sqlite_stream_leaves_no_database(root_fixture_xml, tmp_path):
+    data = root_fixture_xml.read_bytes()
+    truncated = tmp_path / "truncated.xml"
+    truncated.write_bytes(data[: data.rindex(b"<drug ")])
+
+    with pytest.raises(Exception):
+        write_drugbank_sqlite(truncated, tmp_path / "broken.sqlite")
+
+    assert list(tmp_path.iterdir()) == [truncated]
+
+
+def test_failed_sqlite_stream_keeps_an_existing_database(root_fixture_xml, tmp_path):
+    db_path = write_drugbank_sqlite(root_fixture_xml, tmp_path / "drugbank.sqlite")
+    data = root_fixture_xml.read_bytes()
+    truncated = tmp_path / "truncated.xml"
+    truncated.write_bytes(data[: data.rindex(b"<drug ")])
+
+    with pytest.raises(Exception):
+        write_drugbank_sqlite(truncated, db_path)
+
+    with sqlite3.connect(db_path) as connection:
+        drug_ids = [row[0] for row in connection.execute("SELECT drug_id FROM drugs ORDER BY drug_id")]
+    assert drug_ids == ["DB00001", "DB00014"]
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["drugbank.sqlite", "truncated.xml"]
@@ -0,0 +1,121 @@
+import pytest
+from lxml import etree
+
+from drugbank_parse.extractors import ColumnExtractor, FieldPath, RecordExtractor, build_record_extractors
+from drugbank_parse.schema import load_schema
+
+DRUG_XML = b"""<drug xmlns="http://www.drugbank.ca">
+  <drugbank-id>BTD00024</drugbank-id>
+  <drugbank-id primary="true">DB00001</drugbank-id>
+  <name> Lepirudin </name>
+  <calculated-properties>
+    <property><kind>logP</kind><value>1.2</value></property>
+    <property><kind>InChI</kind><value>InChI=1S/X</value></property>
+  </calculated-properties>
+  <targets>
+    <target><name>Prothrombin</name><polypeptide id="P00734"><gene-name>F2</gene-name></polypeptide></target>
+    <target><name>Unknown</name></target>
+  </targets>
+</drug>"""
+
+
+def test_field_path_supports_attribute_and_child_predicates():
+    drug = etree.fromstring(DRUG_XML)
+
+    primary = FieldPath("drugbank-id[@primary='true']")
+    inchi = FieldPath("calculated-properties/property[kind='InChI']/value")
+
+    assert [primary.first_value(child) for child in drug if child.tag == primary.head] == [None, "DB00001"]
+    assert inchi.first_value(drug[3]) == "InChI=1S/X"
+
+
+def test_field_path_rejects_unsupported_steps():
+    with pytest.raises(ValueError, match="Unsupported field path step"):
+        FieldPath("targets//target")
+    with pytest.raises(ValueError, match="at least one element"):
+        FieldPath("@id")
+
+
+def test_record_extractor_fills_fields_and_collections_in_one_pass():
+    drug = etree.fromstring(DRUG_XML)
+    extractor = RecordExtractor(
+        {"drug_id": "drugbank-id[@primary='true']", "drug_name": "name", "indication": "indication"},
+        collections={"target": "targets/target"},
+    )
+
+    values, collected = extractor.extract(drug)
+
+    assert values == {"drug_id": "DB00001", "drug_name": "Lepirudin", "indication": ""}
+    assert len(collected["target"]) == 2
+
+
+def test_schema_record_extractors_read_targets():
+    extractors = build_record_extractors(load_schema())
+    drug = etree.fromstring(DRUG_XML)
+
+    _, collected = extractors["drug"].extract(drug)
+    targets = [extractors["target"].extract(node)[0] for node in collected["target"]]
+
+    assert targets == [
+        {"target_id": "P00734", "target_name": "Prothrombin", "gene_name": "F2", "organism": ""},
+        {"target_id": "", "target_name": "Unknown", "gene_name": "", "organism": ""},
+    ]
+
+
+def test_column_extractor_falls_back_when_a_field_is_missing():
+    drug = etree.fromstring(
+        b"""<drug xmlns="http://www.drugbank.ca"><drug-interactions>
+        <drug-interaction><drugbank-id>DB1</drugbank-id><description>a</description></drug-interaction>
+        <drug-interaction><drugbank-id>DB2</drugbank-id></drug-interaction>
+        </drug-interactions></drug>"""
+    )
+    extractor = ColumnExtractor(
+        "drug-interactions/drug-interaction",
+        {"interacting_drug_id": "drugbank-id", "description": "description"},
+    )
+
+    assert extractor.extract(drug) == {"interacting_drug_id": ["DB1", "DB2"], "description": ["a", ""]}
+
+
+@pytest.mark.parametrize("missing", [b"", b"<description/>"])
+def test_column_extractor_keeps_values_on_their_rows_when_text_is_split(missing):
+    # The missing or empty description and the one split by a comment give as
+    # many text nodes as elements, so counting text nodes alone would shift "b".
+    drug = etree.fromstring(
+        b"""<drug xmlns="http://www.drugbank.ca"><drug-interactions>
+        <drug-interaction><drugbank-id>DB1</drugbank-id>"""
+        + missing
+        + b"""</drug-interaction>
+        <drug-interaction><drugbank-id>DB2</drugbank-id><description>a<!-- x -->b</description></drug-interaction>
+        <drug-interaction><drugbank-id>DB3</drugbank-id><description>c</description></drug-interaction>
+        </drug-interactions></drug>"""
+    )
+    extractor = ColumnExtractor(
+        "drug-interactions/drug-interaction",
+        {"interacting_drug_id": "drugbank-id", "description": "description"},
+    )
+
+    assert extractor.extract(drug) == {"interacting_drug_id": ["DB1", "DB2", "DB3"], "description": ["", "a b", "c"]}
+
+
+def test_drug_extractor_collects_interaction_container_in_its_pass():
+    drug = etree.fromstring(
+        b"""<drug xmlns="http://www.drugbank.ca"><drugbank-id primary="true">DB9</drugbank-id>
+        <drug-interactions><drug-interaction><drugbank-id>DB1</drugbank-id><description>a</description>
+        </drug-interaction></drug-interactions></drug>"""
+    )
+    extractors = build_record_extractors(load_schema(), ["drug", "target", "interaction"])
+
+    _, collected = extractors["drug"].extract(drug)
+
+    assert extractors["drug"].collections == ["target", "interaction"]
+    assert [node.tag for node in collected["interaction"]] == ["{http://www.drugbank.ca}drug-interactions"]
+    assert extractors["interaction"].extract_container(collected["interaction"][0]) == {
+        "interacting_drug_id": ["DB1"],
+        "description": ["a"],
+    }
+
+
+def test_column_extractor_needs_a_container_step():
+    with pytest.raises(ValueError, match="container"):
+        ColumnExtractor("drug-interaction", {"interacting_drug_id": "drugbank-id"})
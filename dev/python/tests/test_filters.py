@@ -0,0 +1,93 @@
+import csv
+
+import pytest
+
+from drugbank_parse import ParseCache, ParseStats, parse_drugbank_xml
+from drugbank_parse.cli import main
+from drugbank_parse.filters import drug_filter
+from drugbank_parse.models import DrugFilter
+
+
+def test_drug_filter_normalizes_mappings():
+    where = drug_filter({"ids": "DB00001", "groups": ["approved"], "types": None})
+
+    assert where == DrugFilter(ids=frozenset({"DB00001"}), groups=frozenset({"approved"}))
+    assert drug_filter({}) is None
+    assert drug_filter(None) is None
+
+
+@pytest.mark.parametrize(
+    ("where", "message"),
+    [
+        ({"organism": "Humans"}, "Unknown where key: organism"),
+        ({"groups": "approve"}, "Unknown drug group: approve"),
+        ({"types": "small-molecule"}, "Unknown drug type: small-molecule"),
+    ],
+)
+def test_drug_filter_rejects_unknown_values(where, message):
+    with pytest.raises(ValueError, match=message):
+        drug_filter(where)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_parse_keeps_only_drugs_of_the_requested_type(root_fixture_xml, workers):
+    result = parse_drugbank_xml(root_fixture_xml, workers=workers, where={"types": "small molecule"})
+
+    assert [row["drug_id"] for row in result.rows("drugs")] == ["DB00014"]
+    assert {row["drug_id"] for row in result.rows("drug_target")} == {"DB00014"}
+    target_ids = {row["target_id"] for row in result.rows("drug_target")}
+    assert {row["target_id"] for row in result.rows("targets")} == target_ids
+
+
+@pytest.mark.parametrize(
+    ("where", "drug_ids"),
+    [
+        ({"ids": ["DB00001", "DB99999"]}, ["DB00001"]),
+        ({"groups": "approved"}, ["DB00001", "DB00014"]),
+        ({"groups": "withdrawn"}, []),
+        ({"target_organisms": "Humans", "types": "biotech"}, ["DB00001"]),
+        ({"target_organisms": "Escherichia coli"}, []),
+    ],
+)
+def test_parse_applies_drug_predicates(root_fixture_xml, where, drug_ids):
+    result = parse_drugbank_xml(root_fixture_xml, modules=["core", "interactions"], where=where)
+
+    assert [row["drug_id"] for row in result.rows("drugs")] == drug_ids
+    assert {row["drug_id"] for row in result.rows("drug_interactions")} <= set(drug_ids)
+
+
+def test_filtered_drugs_are_counted_and_not_extracted(root_fixture_xml):
+    stats = ParseStats()
+    parse_drugbank_xml(root_fixture_xml, where={"ids": "DB00014"}, stats=stats)
+
+    assert stats.counters["drugs"] == 1
+    assert stats.counters["drugs_filtered"] == 1
+    assert "filter" in stats.timers
+
+
+def test_cache_key_includes_the_filter(root_fixture_xml, tmp_path):
+    cache = ParseCache(tmp_path / "cache")
+    tables = ["drugs"]
+
+    unfiltered = cache.key(root_fixture_xml, ["core"], tables)
+    filtered = cache.key(root_fixture_xml, ["core"], tables, where=drug_filter({"ids": "DB00001"}))
+
+    assert unfiltered != filtered
+
+
+def test_cli_filters_drugs(root_fixture_xml, tmp_path):
+    exit_code = main([
+        "--input",
+        str(root_fixture_xml),
+        "--outdir",
+        str(tmp_path),
+        "--drug-id",
+        "DB00001,DB00014",
+        "--drug-type",
+        "biotech",
+    ])
+
+    with (tmp_path / "drugs.csv").open(newline="", encoding="utf-8") as handle:
+        rows = list(csv.DictReader(handle))
+    assert exit_code == 0
+    assert [row["drug_id"] for row in rows] == ["DB00001"]
@@ -0,0 +1,96 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from drugbank_parse import DrugTargetGraph, build_drug_target_graph, parse_drugbank_xml  # noqa: E402
+
+
+@pytest.fixture
+def graph(root_fixture_xml):
+    result = parse_drugbank_xml(root_fixture_xml, modules=["core", "interactions"])
+    return build_drug_target_graph(result, interactions=True)
+
+
+def _rows_adjacency(result):
+    adjacency = {}
+    for row in result.rows("drug_target"):
+        adjacency.setdefault(row["drug_id"], set()).add(row["target_id"])
+    return adjacency
+
+
+def test_csr_matches_drug_target_rows(root_fixture_xml):
+    result = parse_drugbank_xml(root_fixture_xml)
+    graph = build_drug_target_graph(result)
+
+    assert list(graph.drug_ids) == ["DB00001", "DB00014"]
+    assert list(graph.target_ids) == ["P00734", "P22888", "P30968"]
+    assert graph.drug_target_indptr.tolist() == [0, 1, 3]
+    assert graph.target_drug_indptr.tolist() == [0, 1, 2, 3]
+    assert graph.edge_count == 3
+    for drug_id, target_ids in _rows_adjacency(result).items():
+        targets = graph.targets_of(graph.drug_index(drug_id))
+        assert set(graph.target_ids[targets]) == target_ids
+
+
+@pytest.mark.parametrize("layout", ["columnar", "rows"])
+def test_layouts_build_the_same_graph(root_fixture_xml, graph, layout):
+    result = parse_drugbank_xml(root_fixture_xml, modules=["core", "interactions"], layout=layout)
+
+    built = build_drug_target_graph(result, interactions=True)
+
+    for name in ("drug_ids", "target_ids", "drug_target_indices", "target_drug_indptr", "interaction_indices"):
+        assert np.array_equal(getattr(built, name), getattr(graph, name))
+
+
+def test_neighbor_and_degree_queries(graph):
+    goserelin = graph.drug_index("DB00014")
+    targets = graph.target_index(["P22888", "P30968"])
+
+    assert graph.targets_of(goserelin).tolist() == targets.tolist()
+    assert graph.drugs_of(targets).tolist() == [goserelin]
+    assert graph.drug_degree([goserelin, graph.drug_index("DB00001")]).tolist() == [2, 1]
+    assert graph.target_degree().tolist() == [1, 1, 1]
+    assert graph.interacting_drugs(goserelin).size > 0
+    with pytest.raises(KeyError, match="Unknown drug ids: DB99999"):
+        graph.drug_index(["DB00001", "DB99999"])
+    with pytest.raises(IndexError):
+        graph.targets_of(graph.drug_count)
+
+
+def test_k_hop_expands_by_edges(graph):
+    lepirudin = graph.drug_index("DB00001")
+
+    assert [array.tolist() for array in graph.k_hop(drugs=lepirudin, k=0)] == [[lepirudin], []]
+    drugs, targets = graph.k_hop(drugs=lepirudin, k=2)
+    assert drugs.tolist() == [lepirudin]
+    assert graph.target_ids[targets].tolist() == ["P00734"]
+
+    target = graph.target_index("P22888")
+    drugs, targets = graph.k_hop(targets=target, k=2)
+    assert graph.drug_ids[drugs].tolist() == ["DB00014"]
+    assert graph.target_ids[targets].tolist() == ["P22888", "P30968"]
+
+    drugs, _ = graph.k_hop(drugs=lepirudin, k=1, interactions=True)
+    assert set(drugs.tolist()) == {lepirudin, *graph.interacting_drugs(lepirudin).tolist()}
+
+
+def test_graph_without_interactions_rejects_interaction_queries(root_fixture_xml):
+    graph = build_drug_target_graph(parse_drugbank_xml(root_fixture_xml))
+
+    with pytest.raises(ValueError, match="built without interactions"):
+        graph.k_hop(drugs=0, interactions=True)
+    with pytest.raises(KeyError, match="drug_interactions"):
+        build_drug_target_graph(parse_drugbank_xml(root_fixture_xml), interactions=True)
+
+
+def test_saved_graph_loads_memory_mapped(graph, tmp_path):
+    graph.save(tmp_path / "graph")
+
+    loaded = DrugTargetGraph.load(tmp_path / "graph")
+
+    assert isinstance(loaded.drug_target_indices, np.memmap)
+    assert loaded.drug_ids.tolist() == graph.drug_ids.tolist()
+    lepirudin = graph.drug_index("DB00001")
+    expected = graph.k_hop(drugs=lepirudin, k=3, interactions=True)
+    for loaded_nodes, nodes in zip(loaded.k_hop(drugs=lepirudin, k=3, interactions=True), expected):
+        assert np.array_equal(loaded_nodes, nodes)
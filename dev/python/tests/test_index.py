@@ -0,0 +1,92 @@
+import hashlib
+import os
+import shutil
+
+import pytest
+
+from drugbank_parse import build_drug_index, load_drug_index, lookup_drugs, parse_drugbank_xml
+from drugbank_parse.index import DrugIndex, default_index_path
+
+
+@pytest.fixture
+def fixture_copy(root_fixture_xml, tmp_path):
+    path = tmp_path / "drugbank.xml"
+    shutil.copyfile(root_fixture_xml, path)
+    return path
+
+
+def test_build_drug_index_records_offsets_and_file_fingerprint(fixture_copy):
+    index = build_drug_index(fixture_copy)
+
+    assert list(index.entries) == ["DB00001", "DB00014"]
+    assert index.size == fixture_copy.stat().st_size
+    assert index.sha256 == hashlib.sha256(fixture_copy.read_bytes()).hexdigest()
+    entry = index.entries["DB00014"]
+    with fixture_copy.open("rb") as handle:
+        handle.seek(entry.offset)
+        record = handle.read(entry.length)
+    assert record.startswith(b"<drug ") and record.endswith(b"</drug>")
+    assert default_index_path(fixture_copy).exists()
+
+
+def test_build_drug_index_skips_drug_tags_in_comments(fixture_copy):
+    data = fixture_copy.read_bytes()
+    declaration = data.index(b"?>") + 2
+    fixture_copy.write_bytes(data[:declaration] + b"\n<!-- <drug> --><?note </drug>?>" + data[declaration:])
+
+    index = build_drug_index(fixture_copy, save=False)
+
+    assert list(index.entries) == ["DB00001", "DB00014"]
+    assert lookup_drugs(fixture_copy, ["DB00014"], index=index).rows("drugs")[0]["drug_id"] == "DB00014"
+
+
+def test_saved_index_round_trips_and_goes_stale(fixture_copy):
+    index = build_drug_index(fixture_copy)
+
+    loaded = load_drug_index(fixture_copy)
+    assert loaded == index
+    assert DrugIndex.load(default_index_path(fixture_copy)) == index
+
+    stat = fixture_copy.stat()
+    os.utime(fixture_copy, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert load_drug_index(fixture_copy) is None
+
+
+def test_verified_load_rejects_same_size_edits(fixture_copy):
+    build_drug_index(fixture_copy)
+    stat = fixture_copy.stat()
+    fixture_copy.write_bytes(fixture_copy.read_bytes().replace(b"DB00014", b"DB99914"))
+    os.utime(fixture_copy, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    assert load_drug_index(fixture_copy) is not None
+    assert load_drug_index(fixture_copy, verify=True) is None
+
+
+def test_lookup_drugs_matches_full_parse_rows(fixture_copy):
+    full = parse_drugbank_xml(fixture_copy)
+
+    result = lookup_drugs(fixture_copy, ["DB00014"])
+
+    assert result.rows("drugs") == [row for row in full.rows("drugs") if row["drug_id"] == "DB00014"]
+    assert result.rows("targets") == full.rows("targets")[1:]
+    assert len(result.rows("target_drug_indication")) == 2
+
+
+@pytest.mark.parametrize("layout", ["columnar", "rows"])
+def test_lookup_drugs_matches_a_filtered_parse(fixture_copy, layout):
+    modules = ["core", "interactions"]
+    expected = parse_drugbank_xml(fixture_copy, modules=modules, layout=layout, where={"ids": "DB00014"})
+
+    result = lookup_drugs(fixture_copy, ["DB00014"], modules=modules, layout=layout)
+
+    assert list(result.tables) == list(expected.tables)
+    assert [type(rows) for rows in result.tables.values()] == [type(rows) for rows in expected.tables.values()]
+    assert result.tables == expected.tables
+
+
+def test_lookup_drugs_returns_document_order_and_rejects_unknown_ids(fixture_copy):
+    result = lookup_drugs(fixture_copy, ["DB00014", "DB00001"])
+    assert [row["drug_id"] for row in result.rows("drugs")] == ["DB00001", "DB00014"]
+
+    with pytest.raises(KeyError, match="DB99999"):
+        lookup_drugs(fixture_copy, ["DB99999"])
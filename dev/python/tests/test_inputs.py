@@ -0,0 +1,93 @@
+import bz2
+import gzip
+import io
+import lzma
+import zipfile
+
+import pytest
+
+from drugbank_parse import parse_drugbank_xml
+from drugbank_parse.inputs import PrefetchReader, open_xml_source
+
+
+def compress(xml_path, target):
+    data = xml_path.read_bytes()
+    suffix = target.suffix
+    if suffix == ".gz":
+        target.write_bytes(gzip.compress(data))
+    elif suffix == ".bz2":
+        target.write_bytes(bz2.compress(data))
+    elif suffix == ".xz":
+        target.write_bytes(lzma.compress(data))
+    elif suffix == ".zst":
+        zstandard = pytest.importorskip("zstandard")
+        target.write_bytes(zstandard.ZstdCompressor().compress(data))
+    elif suffix == ".zip":
+        with zipfile.ZipFile(target, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr("full database.xml", data)
+    return target
+
+
+@pytest.mark.parametrize("suffix", [".gz", ".bz2", ".xz", ".zst", ".zip"])
+def test_parse_compressed_input_matches_plain_xml(root_fixture_xml, tmp_path, suffix):
+    compressed = compress(root_fixture_xml, tmp_path / f"drugbank.xml{suffix}")
+
+    assert parse_drugbank_xml(compressed).tables == parse_drugbank_xml(root_fixture_xml).tables
+
+
+def test_parse_compressed_input_ignores_workers(root_fixture_xml, tmp_path):
+    compressed = compress(root_fixture_xml, tmp_path / "drugbank.xml.gz")
+
+    assert parse_drugbank_xml(compressed, workers=2).tables == parse_drugbank_xml(root_fixture_xml).tables
+
+
+def test_parse_binary_file_object(root_fixture_xml):
+    with root_fixture_xml.open("rb") as handle:
+        result = parse_drugbank_xml(handle)
+        assert not handle.closed
+
+    assert result.tables == parse_drugbank_xml(root_fixture_xml).tables
+
+
+def test_file_object_cannot_use_cache(root_fixture_xml, tmp_path):
+    with root_fixture_xml.open("rb") as handle:
+        with pytest.raises(ValueError, match="needs a path"):
+            parse_drugbank_xml(handle, cache=tmp_path / "cache")
+
+
+def test_zip_without_single_xml_member_fails_clearly(tmp_path):
+    archive_path = tmp_path / "drugbank.zip"
+    with zipfile.ZipFile(archive_path, "w") as archive:
+        archive.writestr("a.xml", b"<drugbank/>")
+        archive.writestr("b.xml", b"<drugbank/>")
+
+    with pytest.raises(ValueError, match="exactly one XML file"):
+        with open_xml_source(archive_path):
+            pass
+
+
+def test_prefetch_reader_returns_every_byte_in_order():
+    data = bytes(range(256)) * 1000
+
+    reader = PrefetchReader(io.BytesIO(data), chunk_size=1000, depth=2)
+    pieces = iter(lambda: reader.read(777), b"")
+    assert b"".join(pieces) == data
+    reader.close()
+
+
+def test_prefetch_reader_raises_read_errors():
+    class Broken(io.RawIOBase):
+        def read(self, size=-1):
+            raise OSError("disk gone")
+
+    reader = PrefetchReader(Broken())
+    with pytest.raises(OSError, match="disk gone"):
+        reader.read(10)
+    reader.close()
+
+
+def test_prefetch_reader_closes_before_end_of_input():
+    reader = PrefetchReader(io.BytesIO(b"x" * 100000), chunk_size=10, depth=1)
+
+    assert reader.read(5) == b"xxxxx"
+    reader.close()
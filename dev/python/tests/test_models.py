@@ -1,6 +1,9 @@
+import pickle
+
 import pytest
 
-from drugbank_parse.models import ParseResult
+from drugbank_parse.models import ColumnarTable, ParseResult
+from drugbank_parse.schema import load_schema
 
 
 def test_parse_result_rejects_rows_for_uninitialized_tables():
@@ -8,3 +11,79 @@ def test_parse_result_rejects_rows_for_uninitialized_tables():
 
     with pytest.raises(KeyError, match="targets"):
         result.add_row("targets", {"target_id": "P00734"})
+
+
+def test_columnar_table_shares_pools_between_mapped_columns():
+    table = ColumnarTable(
+        ["drug_id", "interacting_drug_id", "description"],
+        pools={"drug_id": "drug_ids", "interacting_drug_id": "drug_ids"},
+    )
+
+    table.append({"drug_id": "DB00001", "interacting_drug_id": "DB00014", "description": "x"})
+    table.append({"drug_id": "DB00014", "interacting_drug_id": "DB00001", "description": "x"})
+    table.append({"drug_id": "DB00001"})
+
+    assert len(table) == 3
+    assert table.pools[0] is table.pools[1]
+    assert table.pools[0].values == ["DB00001", "DB00014", ""]
+    assert table.pools[2].values == ["x", ""]
+    assert table[1] == {"drug_id": "DB00014", "interacting_drug_id": "DB00001", "description": "x"}
+    assert list(table)[2] == {"drug_id": "DB00001", "interacting_drug_id": "", "description": ""}
+
+
+def test_columnar_table_survives_pickling():
+    table = ColumnarTable(["drug_id"])
+    table.append({"drug_id": "DB00001"})
+
+    restored = pickle.loads(pickle.dumps(table))
+    restored.append({"drug_id": "DB00001"})
+
+    assert restored == [{"drug_id": "DB00001"}, {"drug_id": "DB00001"}]
+    assert len(restored.pools[0]) == 1
+
+
+def test_parse_result_interns_repeated_row_values():
+    result = ParseResult(tables={"drugs": [], "drug_indication": []})
+
+    result.add_row("drugs", {"drug_id": "DB00001", "source": "".join(["Drug", "Bank"])})
+    result.add_row("drug_indication", {"drug_id": "".join(["DB0000", "1"]), "source": "".join(["Drug", "Bank"])})
+
+    drug, indication = result.rows("drugs")[0], result.rows("drug_indication")[0]
+    assert indication["drug_id"] is drug["drug_id"]
+    assert indication["source"] is drug["source"]
+
+
+def test_memory_usage_counts_shared_strings_once():
+    result = ParseResult(tables={"drugs": [], "drug_indication": []})
+    text = "x" * 1000
+    result.add_row("drugs", {"drug_id": "DB00001", "indication": text})
+    result.add_row("drug_indication", {"drug_id": "DB00001", "indication": text})
+
+    usage = result.memory_usage()
+
+    assert usage["drugs"]["rows"] == 1
+    assert usage["drugs"]["strings"] > 1000
+    assert usage["total"]["rows"] == 2
+    assert usage["total"]["strings"] == usage["drugs"]["strings"]
+    assert usage["total"]["structure"] == usage["drugs"]["structure"] + usage["drug_indication"]["structure"]
+
+
+def test_for_tables_shares_named_pools_across_the_result():
+    result = ParseResult.for_tables(["drug_interactions"], load_schema())
+    table = result.rows("drug_interactions")
+
+    assert result.pools["drug_ids"] is table.pools[0] is table.pools[1]
+    assert table.pools[2] is not table.pools[0]
+
+
+def test_columnar_table_iterates_value_tuples_in_requested_order(monkeypatch):
+    monkeypatch.setattr("drugbank_parse.models.DECODE_BLOCK_SIZE", 2)
+    table = ColumnarTable(["drug_id", "source"])
+    for number in range(5):
+        table.append({"drug_id": f"DB{number}", "source": "DrugBank"})
+
+    rows = list(table.iter_rows(["source", "missing", "drug_id"]))
+
+    assert rows[0] == ("DrugBank", "", "DB0")
+    assert [row[2] for row in rows] == ["DB0", "DB1", "DB2", "DB3", "DB4"]
+    assert table[1:3] == [{"drug_id": "DB1", "source": "DrugBank"}, {"drug_id": "DB2", "source": "DrugBank"}]
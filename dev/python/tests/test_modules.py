@@ -0,0 +1,35 @@
+import pytest
+
+from drugbank_parse import ParseStats, parse_drugbank_xml
+from drugbank_parse.modules import emit_core_rows, module_handlers, register_module
+
+
+def test_builtin_modules_are_registered():
+    assert module_handlers(["core", "interactions"])[0] == ("core", emit_core_rows)
+
+
+def test_unregistered_module_fails_clearly():
+    with pytest.raises(ValueError, match="No handler registered for module: enzymes"):
+        module_handlers(["core", "enzymes"])
+
+
+def test_registered_handler_receives_collected_subtrees(root_fixture_xml, monkeypatch):
+    monkeypatch.setattr("drugbank_parse.modules._HANDLERS", dict(module_handlers(["core", "interactions"])))
+    seen = []
+
+    @register_module("interactions")
+    def record_interactions(drug, collected, sink, extractors):
+        seen.append((drug["drug_id"], len(collected["interaction"])))
+
+    result = parse_drugbank_xml(root_fixture_xml, modules=["interactions"])
+
+    assert len(result.rows("drug_interactions")) == 0
+    assert seen == [("DB00001", 1), ("DB00014", 1)]
+
+
+def test_each_module_is_timed_once_per_drug(root_fixture_xml):
+    stats = ParseStats()
+    parse_drugbank_xml(root_fixture_xml, modules=["core", "interactions"], stats=stats)
+
+    assert {"module.core", "module.interactions", "extract.drug"} <= set(stats.timers)
+    assert stats.counters["rows.drugs"] == 2
@@ -1,6 +1,7 @@
 import pytest
 
-from drugbank_parse import parse_drugbank_xml
+from drugbank_parse import parse_drugbank_xml, parser
+from drugbank_parse.models import ColumnarTable, JoinedTable
 
 
 def test_parse_core_result_contains_expected_tables(root_fixture_xml):
@@ -70,3 +71,54 @@ def test_missing_input_file_fails_clearly(tmp_path):
 
     with pytest.raises(FileNotFoundError, match="Input XML file does not exist"):
         parse_drugbank_xml(missing)
+
+
+def test_parse_with_workers_matches_single_process(root_fixture_xml):
+    expected = parse_drugbank_xml(root_fixture_xml)
+
+    result = parse_drugbank_xml(root_fixture_xml, workers=2)
+
+    assert result.tables == expected.tables
+
+
+def test_sharded_parse_keeps_the_shard_window_within_its_byte_budget(root_fixture_xml, monkeypatch):
+    expected = parse_drugbank_xml(root_fixture_xml)
+    merged = []
+    merge_shard = parser._merge_shard
+    monkeypatch.setattr(parser, "SHARD_WINDOW_BYTES", 1)
+    monkeypatch.setattr(parser, "_merge_shard", lambda *args: merged.append(args[1]) or merge_shard(*args))
+
+    result = parse_drugbank_xml(root_fixture_xml, workers=2)
+
+    assert len(merged) == 2
+    assert result.tables == expected.tables
+
+
+def test_parse_rejects_non_positive_workers(root_fixture_xml):
+    with pytest.raises(ValueError, match="workers"):
+        parse_drugbank_xml(root_fixture_xml, workers=0)
+
+
+def test_parse_layouts_hold_the_same_rows(root_fixture_xml):
+    columnar = parse_drugbank_xml(root_fixture_xml)
+    rows = parse_drugbank_xml(root_fixture_xml, layout="rows")
+
+    assert isinstance(columnar.rows("drugs"), ColumnarTable)
+    assert isinstance(rows.rows("drugs"), list)
+    assert columnar.tables == rows.tables
+
+
+def test_parse_rejects_unknown_layout(root_fixture_xml):
+    with pytest.raises(ValueError, match="Unknown parse layout"):
+        parse_drugbank_xml(root_fixture_xml, layout="frames")
+
+
+def test_target_drug_indication_is_joined_on_read(root_fixture_xml):
+    result = parse_drugbank_xml(root_fixture_xml)
+
+    rows = result.rows("target_drug_indication")
+    assert isinstance(rows, JoinedTable)
+    assert result.memory_usage()["target_drug_indication"]["strings"] == 0
+    assert len(rows) == len(result.rows("drug_target"))
+    with pytest.raises(ValueError, match="does not store rows"):
+        result.add_row("target_drug_indication", {"target_id": "P00734"})
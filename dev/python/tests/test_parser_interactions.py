@@ -0,0 +1,38 @@
+from drugbank_parse import parse_drugbank_xml, write_drugbank_tables
+from drugbank_parse.models import ColumnarTable
+
+
+def test_parse_interactions_module_emits_every_interaction(root_fixture_xml):
+    result = parse_drugbank_xml(root_fixture_xml, modules=["interactions"])
+
+    rows = result.rows("drug_interactions")
+    assert list(result.tables) == ["drug_interactions"]
+    assert isinstance(rows, ColumnarTable)
+    assert len(rows) == 1745
+    assert rows[0] == {
+        "drug_id": "DB00001",
+        "interacting_drug_id": "DB06605",
+        "description": "Apixaban may increase the anticoagulant activities of Lepirudin.",
+        "source": "DrugBank",
+    }
+    assert {row["drug_id"] for row in rows} == {"DB00001", "DB00014"}
+
+
+def test_interactions_and_core_modules_parse_together(root_fixture_xml):
+    core = parse_drugbank_xml(root_fixture_xml)
+
+    result = parse_drugbank_xml(root_fixture_xml, modules=["core", "interactions"])
+
+    assert {table: result.tables[table] for table in core.tables} == core.tables
+    assert len(result.rows("drug_interactions")) == 1745
+
+
+def test_interactions_stream_out_to_csv(root_fixture_xml, tmp_path):
+    result = parse_drugbank_xml(root_fixture_xml, modules=["interactions"], workers=2)
+
+    written = write_drugbank_tables(result, tmp_path)
+
+    assert [path.name for path in written] == ["drug_interactions.csv"]
+    lines = written[0].read_text(encoding="utf-8").splitlines()
+    assert lines[0] == "drug_id,interacting_drug_id,description,source"
+    assert len(lines) == 1746
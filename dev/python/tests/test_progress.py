@@ -0,0 +1,98 @@
+import gzip
+import io
+
+import pytest
+
+from drugbank_parse import ParseProgress, parse_drugbank_xml, print_progress
+from drugbank_parse.progress import ProgressMeter, format_progress
+
+
+def test_parse_progress_derives_rates_and_eta():
+    progress = ParseProgress(
+        bytes_read=25 * 1024 * 1024,
+        total_bytes=100 * 1024 * 1024,
+        drugs=500,
+        elapsed_seconds=5.0,
+    )
+
+    assert progress.percent == 25.0
+    assert progress.mb_per_second == 5.0
+    assert progress.drugs_per_second == 100.0
+    assert progress.eta_seconds == 15.0
+    assert format_progress(progress) == " 25.0%  25.0/100.0 MB  5.0 MB/s  500 drugs (100/s)  ETA 0:00:15"
+
+
+def test_parse_progress_without_total_has_no_percent_or_eta():
+    progress = ParseProgress(bytes_read=1024 * 1024, total_bytes=None, drugs=3, elapsed_seconds=0.0)
+
+    assert progress.percent is None
+    assert progress.eta_seconds is None
+    assert progress.mb_per_second == 0.0
+
+
+def test_progress_meter_throttles_reports():
+    reports = []
+    meter = ProgressMeter(reports.append, total_bytes=1000, interval=3600)
+    for _ in range(10_000):
+        meter.add_drugs()
+    meter.advance(400)
+
+    assert reports == []
+
+    meter.finish()
+
+    assert len(reports) == 1
+    assert reports[0].done
+    assert reports[0].drugs == 10_000
+    assert reports[0].bytes_read == 1000
+
+
+def test_progress_meter_reads_tracked_position_when_reporting():
+    reports = []
+    meter = ProgressMeter(reports.append, interval=0)
+    meter.track(lambda: 250, 1000)
+    meter.add_drugs()
+
+    assert reports[0].bytes_read == 250
+    assert reports[0].percent == 25.0
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_parse_reports_final_progress(root_fixture_xml, workers):
+    reports = []
+    parse_drugbank_xml(root_fixture_xml, workers=workers, progress=reports.append)
+
+    final = reports[-1]
+    assert final.done
+    assert final.total_bytes == root_fixture_xml.stat().st_size
+    assert final.bytes_read == final.total_bytes
+    # Nested pathway <drug> elements are pruned, so only the two records count.
+    assert final.drugs == 2
+
+
+def test_progress_follows_compressed_bytes(root_fixture_xml, tmp_path):
+    compressed = tmp_path / "drugbank.xml.gz"
+    compressed.write_bytes(gzip.compress(root_fixture_xml.read_bytes()))
+    reports = []
+
+    result = parse_drugbank_xml(compressed, progress=reports.append)
+
+    assert len(result.rows("drugs")) == 2
+    assert reports[-1].total_bytes == compressed.stat().st_size
+    assert reports[-1].percent == 100.0
+
+
+def test_progress_counts_bytes_of_file_objects(root_fixture_xml):
+    reports = []
+    with root_fixture_xml.open("rb") as handle:
+        parse_drugbank_xml(handle, progress=reports.append)
+
+    assert reports[-1].total_bytes is None
+    assert reports[-1].bytes_read == root_fixture_xml.stat().st_size
+
+
+def test_print_progress_writes_one_line_per_report_when_redirected():
+    stream = io.StringIO()
+    print_progress(ParseProgress(bytes_read=10, total_bytes=10, drugs=2, elapsed_seconds=1.0, done=True), stream)
+
+    assert stream.getvalue().endswith("done in 0:00:01\n")
@@ -0,0 +1,143 @@
+import io
+
+import pytest
+from lxml import etree
+
+from drugbank_parse import ParseStats, parse_drugbank_xml, pruning
+from drugbank_parse.cli import main
+from drugbank_parse.filters import drug_filter
+from drugbank_parse.profiles import resolve_records
+from drugbank_parse.pruning import PrunedReader, build_prune_plan, prune_drug
+from drugbank_parse.records import iter_drug_spans
+from drugbank_parse.schema import load_schema
+
+
+def _plan(modules, where=None):
+    return build_prune_plan(load_schema(), resolve_records(modules), drug_filter(where))
+
+
+def test_plan_keeps_only_the_paths_records_read():
+    plan = _plan(["core"])
+
+    assert plan[b"name"] is None
+    assert plan[b"calculated-properties"] == {b"property": {b"kind": None, b"value": None}}
+    assert plan[b"targets"] == {
+        b"target": {b"name": None, b"organism": None, b"polypeptide": {b"gene-name": None}}
+    }
+    assert b"drug-interactions" not in plan
+    assert b"pathways" not in plan
+
+
+def test_plan_keeps_flat_record_containers_and_filter_paths_whole():
+    plan = _plan(["interactions"], where={"groups": "approved"})
+
+    assert plan[b"drug-interactions"] is None
+    assert plan[b"groups"] == {b"group": None}
+
+
+def test_prune_drug_drops_unused_subtrees():
+    drug = (
+        b'<drug type="biotech"><drugbank-id primary="true">DB1</drugbank-id>'
+        b"<description>x <!-- </description> --> <![CDATA[<description>]]></description>"
+        b"<pathways><pathway><drugs><drug><drugbank-id>DB1</drugbank-id></drug></drugs></pathway></pathways>"
+        b"<name>A <i>b</i></name><products/>"
+        b'<targets><target><id>BE1</id><polypeptide id="P1" source="Swiss-Prot">'
+        b"<sequence>" + b"A" * 5000 + b"</sequence><gene-name>G</gene-name>"
+        b"</polypeptide></target></targets></drug>"
+    )
+
+    pruned = prune_drug(drug, _plan(["core"]))
+
+    assert pruned == (
+        b'<drug type="biotech"><drugbank-id primary="true">DB1</drugbank-id><name>A <i>b</i></name>'
+        b'<targets><target><polypeptide id="P1" source="Swiss-Prot"><gene-name>G</gene-name>'
+        b"</polypeptide></target></targets></drug>"
+    )
+
+
+@pytest.mark.parametrize("chunk_size", [7, 4096])
+def test_pruned_reader_prunes_across_chunk_boundaries(root_fixture_xml, chunk_size):
+    plan = _plan(["core"])
+    data = root_fixture_xml.read_bytes()
+
+    with PrunedReader(io.BytesIO(data), plan, chunk_size=chunk_size) as reader:
+        pruned = reader.read()
+
+    with PrunedReader(io.BytesIO(data), plan) as reader:
+        assert pruned == reader.read()
+    assert len(pruned) < len(data) // 10
+    assert etree.fromstring(pruned) is not None
+
+
+def test_pruned_reader_stops_pruning_when_little_is_dropped(root_fixture_xml, monkeypatch):
+    monkeypatch.setattr(pruning, "PRUNE_SAMPLE_BYTES", 1)
+    plan = _plan(["interactions"])
+    data = root_fixture_xml.read_bytes()
+    with root_fixture_xml.open("rb") as handle:
+        (start, length), _ = iter_drug_spans(handle)
+
+    with PrunedReader(io.BytesIO(data), plan) as reader:
+        passed = reader.read()
+
+    first = prune_drug(data[start : start + length], plan)
+    assert passed == data[:start] + first + data[start + length :]
+
+
+@pytest.mark.parametrize("chunk_size", [7, 4096])
+def test_pruned_reader_passes_markup_between_drugs_through(root_fixture_xml, chunk_size):
+    data = root_fixture_xml.read_bytes()
+    with root_fixture_xml.open("rb") as handle:
+        _, (second, _) = iter_drug_spans(handle)
+    declaration = data.index(b"?>") + 2
+    markup = b"<!-- next <drug> follows --><![CDATA[<drug>]]><?note <drug>?>"
+    marked = data[:declaration] + b"<!-- <drug> -->" + data[declaration:second] + markup + data[second:]
+
+    with PrunedReader(io.BytesIO(marked), _plan(["core"]), chunk_size=chunk_size) as reader:
+        pruned = reader.read()
+
+    assert pruned.count(markup) == 1
+    assert b"<!-- <drug> -->" in pruned
+    assert len(pruned) < len(marked) // 10
+    expected = parse_drugbank_xml(root_fixture_xml, prune=False).tables
+    assert parse_drugbank_xml(io.BytesIO(marked)).tables == expected
+
+
+def test_pruned_reader_passes_oversized_drugs_through(root_fixture_xml, monkeypatch):
+    monkeypatch.setattr(pruning, "PRUNE_MAX_DRUG_BYTES", 100)
+    data = root_fixture_xml.read_bytes()
+
+    with PrunedReader(io.BytesIO(data), _plan(["core"]), chunk_size=64) as reader:
+        assert reader.read() == data
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+@pytest.mark.parametrize("where", [None, {"target_organisms": "Humans"}])
+def test_pruned_parse_matches_full_parse(root_fixture_xml, workers, where):
+    modules = ["core", "interactions"]
+    full = parse_drugbank_xml(root_fixture_xml, modules=modules, layout="rows", where=where, prune=False)
+    pruned = parse_drugbank_xml(root_fixture_xml, modules=modules, layout="rows", where=where, workers=workers)
+
+    assert pruned.tables == full.tables
+
+
+def test_cli_no_prune_writes_the_same_tables(root_fixture_xml, tmp_path):
+    for name, extra in (("pruned", []), ("full", ["--no-prune"])):
+        assert main(["--input", str(root_fixture_xml), "--outdir", str(tmp_path / name), *extra]) == 0
+
+    for path in (tmp_path / "full").iterdir():
+        assert (tmp_path / "pruned" / path.name).read_bytes() == path.read_bytes()
+
+
+def test_pruned_parse_counts_pruned_bytes(root_fixture_xml):
+    stats = ParseStats()
+    parse_drugbank_xml(root_fixture_xml, stats=stats)
+
+    assert 0 < stats.counters["bytes_pruned"] < root_fixture_xml.stat().st_size
+
+
+def test_truncated_input_is_reported_by_the_xml_parser(root_fixture_xml):
+    data = root_fixture_xml.read_bytes()
+    truncated = io.BytesIO(data[: len(data) - 5000])
+
+    with pytest.raises(etree.XMLSyntaxError):
+        parse_drugbank_xml(truncated)
@@ -0,0 +1,100 @@
+import io
+
+import pytest
+
+from drugbank_parse import parse_drugbank_xml
+from drugbank_parse.records import RecordReader, iter_drug_spans, plan_shards, read_xml_header
+
+MARKUP_XML = (
+    b'<?xml version="1.0"?><!-- <drug> --><drugbank xmlns="http://www.drugbank.ca">'
+    b"<drug><name><![CDATA[<drug> </drug>]]></name><!-- </drug> --></drug>"
+    b'<?note <drug>?><drug type="empty"/></drugbank>'
+)
+
+
+def test_iter_drug_spans_finds_top_level_drugs_only(root_fixture_xml):
+    with root_fixture_xml.open("rb") as handle:
+        spans = list(iter_drug_spans(handle))
+        records = []
+        for offset, length in spans:
+            handle.seek(offset)
+            records.append(handle.read(length))
+
+    assert len(spans) == 2
+    assert all(record.startswith(b"<drug ") for record in records)
+    assert all(record.endswith(b"</drug>") for record in records)
+    assert b"<drugbank-id primary=\"true\">DB00001</drugbank-id>" in records[0]
+    assert b"<drugbank-id primary=\"true\">DB00014</drugbank-id>" in records[1]
+
+
+def test_iter_drug_spans_is_independent_of_chunk_size(root_fixture_xml):
+    with root_fixture_xml.open("rb") as handle:
+        expected = list(iter_drug_spans(handle))
+        assert list(iter_drug_spans(handle, chunk_size=5)) == expected
+        assert list(iter_drug_spans(handle, chunk_size=4093)) == expected
+
+
+@pytest.mark.parametrize("chunk_size", [3, 11, 4096])
+def test_iter_drug_spans_skips_comments_cdata_and_processing_instructions(chunk_size):
+    spans = list(iter_drug_spans(io.BytesIO(MARKUP_XML), chunk_size=chunk_size))
+
+    assert [MARKUP_XML[offset : offset + length] for offset, length in spans] == [
+        b"<drug><name><![CDATA[<drug> </drug>]]></name><!-- </drug> --></drug>",
+        b'<drug type="empty"/>',
+    ]
+
+
+@pytest.mark.parametrize(
+    "data, message",
+    [
+        (b"<drugbank><drug><name>x</name></drugbank>", "Unterminated <drug>"),
+        (b"<drugbank></drug></drugbank>", "without a matching <drug>"),
+        (b"<drugbank><!-- <drug> </drugbank>", "Unterminated markup"),
+    ],
+)
+def test_iter_drug_spans_rejects_unbalanced_drugs(data, message):
+    with pytest.raises(ValueError, match=message):
+        list(iter_drug_spans(io.BytesIO(data)))
+
+
+def test_sharded_parse_ignores_drug_tags_in_comments(root_fixture_xml, tmp_path):
+    data = root_fixture_xml.read_bytes()
+    declaration = data.index(b"?>") + 2
+    commented = tmp_path / "commented.xml"
+    commented.write_bytes(data[:declaration] + b"\n<!-- <drug> -->" + data[declaration:])
+
+    expected = parse_drugbank_xml(root_fixture_xml).tables
+    assert parse_drugbank_xml(commented, workers=2).tables == expected
+
+
+def test_plan_shards_groups_consecutive_spans():
+    spans = [(10, 5), (20, 5), (30, 5), (40, 5)]
+
+    assert plan_shards(iter(spans), shard_bytes=12) == [(10, 25), (30, 45)]
+    assert plan_shards(iter(spans), shard_bytes=1000) == [(10, 45)]
+
+
+def test_record_reader_wraps_range_in_root_element(root_fixture_xml):
+    with root_fixture_xml.open("rb") as handle:
+        header = read_xml_header(handle)
+        offset, length = next(iter_drug_spans(handle))
+
+    with RecordReader(str(root_fixture_xml), header, [(offset, offset + length)]) as reader:
+        data = b"".join(iter(lambda: reader.read(1000), b""))
+
+    assert header.startswith(b"<?xml")
+    assert header.endswith(b">")
+    assert data.startswith(header + b"<drug ")
+    assert data.endswith(b"</drug></drugbank>")
+
+
+def test_record_reader_chains_ranges_in_given_order(root_fixture_xml):
+    with root_fixture_xml.open("rb") as handle:
+        header = read_xml_header(handle)
+        first, second = [(offset, offset + length) for offset, length in iter_drug_spans(handle)]
+
+    with RecordReader(str(root_fixture_xml), header, [second, first]) as reader:
+        data = reader.read()
+
+    assert data.index(b">DB00014<") < data.index(b">DB00001<")
+    assert data.endswith(b"</drug></drugbank>")
@@ -1,6 +1,12 @@
+import json
+import os
 import shutil
+import subprocess
+import sys
 
-from drugbank_parse.schema import default_schema_dir, load_schema
+import pytest
+
+from drugbank_parse.schema import SNAPSHOT_FILE, default_schema_dir, load_schema, write_schema_snapshot
 
 
 def test_load_schema_returns_core_tables():
@@ -13,6 +19,7 @@ def test_load_schema_returns_core_tables():
         "drug_target",
         "drug_indication",
         "target_drug_indication",
+        "drug_interactions",
     ]
     assert schema.tables["drugs"].columns == [
         "drug_id",
@@ -20,6 +27,7 @@ def test_load_schema_returns_core_tables():
         "inchi",
         "source",
     ]
+    assert schema.tables["drug_target"].keys == ["drug_id", "target_id"]
 
 
 def test_default_schema_dir_uses_packaged_schema_data():
@@ -39,3 +47,103 @@ def test_load_schema_accepts_schema_dir_override(project_root, tmp_path):
 
     assert schema.version == 1
     assert "drugs" in schema.tables
+
+
+def test_load_schema_reads_record_field_paths():
+    schema = load_schema()
+
+    assert list(schema.records) == ["drug", "target", "interaction"]
+    assert schema.records["target"].parent == "drug"
+    assert schema.records["target"].path == "targets/target"
+    assert set(schema.records["drug"].fields) <= set(schema.fields)
+
+
+def test_record_fields_must_be_declared(project_root, tmp_path):
+    schema_dir = tmp_path / "schema"
+    shutil.copytree(project_root / "dev" / "schema", schema_dir)
+    fields_path = schema_dir / "fields.yml"
+    fields_path.write_text(
+        fields_path.read_text(encoding="utf-8").replace("      organism: organism", "      species: organism"),
+        encoding="utf-8",
+    )
+
+    with pytest.raises(ValueError, match="species"):
+        load_schema(schema_dir=schema_dir)
+
+
+def test_load_schema_reads_table_joins():
+    join = load_schema().tables["target_drug_indication"].join
+
+    assert join.base == "drug_target"
+    assert join.lookups == {"targets": ["target_id"], "drugs": ["drug_id"], "drug_indication": ["drug_id"]}
+
+
+def test_join_columns_must_come_from_joined_tables(project_root, tmp_path):
+    schema_dir = tmp_path / "schema"
+    shutil.copytree(project_root / "dev" / "schema", schema_dir)
+    tables_path = schema_dir / "tables.yml"
+    text = tables_path.read_text(encoding="utf-8")
+    tables_path.write_text(text.replace("        drug_indication:\n          - drug_id\n", ""), encoding="utf-8")
+
+    with pytest.raises(ValueError, match="indication"):
+        load_schema(schema_dir=schema_dir)
+
+
+def test_load_schema_is_cached_until_a_file_changes(project_root, tmp_path):
+    schema_dir = tmp_path / "schema"
+    shutil.copytree(project_root / "dev" / "schema", schema_dir)
+
+    first = load_schema(schema_dir=schema_dir)
+    assert load_schema(schema_dir=schema_dir) is first
+
+    tables_path = schema_dir / "tables.yml"
+    text = tables_path.read_text(encoding="utf-8")
+    tables_path.write_text(text.replace("version: 1", "version: 2"), encoding="utf-8")
+    stat = tables_path.stat()
+    os.utime(tables_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    changed = load_schema(schema_dir=schema_dir)
+    assert changed is not first
+    assert changed.version == 2
+
+
+def test_packaged_schema_snapshot_matches_yaml(tmp_path):
+    schema_dir = tmp_path / "schema_data"
+    shutil.copytree(default_schema_dir(), schema_dir)
+
+    write_schema_snapshot(schema_dir)
+
+    # Regenerate with drugbank_parse.schema.write_schema_snapshot() after
+    # editing the packaged YAML.
+    shipped = (default_schema_dir() / SNAPSHOT_FILE).read_text(encoding="utf-8")
+    assert (schema_dir / SNAPSHOT_FILE).read_text(encoding="utf-8") == shipped
+
+
+def test_stale_schema_snapshot_is_ignored(tmp_path):
+    schema_dir = tmp_path / "schema_data"
+    shutil.copytree(default_schema_dir(), schema_dir)
+    tables_path = schema_dir / "tables.yml"
+    text = tables_path.read_text(encoding="utf-8")
+    tables_path.write_text(text.replace("One row per primary DrugBank drug.", "Edited."), encoding="utf-8")
+
+    snapshot = json.loads((schema_dir / SNAPSHOT_FILE).read_text(encoding="utf-8"))
+    assert "tables.yml" in snapshot["files"]
+    assert load_schema(schema_dir=schema_dir).tables["drugs"].description == "Edited."
+
+
+def test_importing_the_package_defers_lxml_and_yaml():
+    code = (
+        "import sys, drugbank_parse; "
+        "print(sorted(name for name in ('lxml', 'yaml') if name in sys.modules)); "
+        "drugbank_parse.ParseResult"
+    )
+    package_parent = default_schema_dir().parents[1]
+    completed = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=package_parent,
+    )
+
+    assert completed.stdout.strip() == "[]"
@@ -0,0 +1,156 @@
+import http.client
+import json
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from drugbank_parse import LookupIndex, LookupServer, parse_drugbank_xml
+
+
+@pytest.fixture
+def index(root_fixture_xml):
+    return LookupIndex.from_result(parse_drugbank_xml(root_fixture_xml))
+
+
+@pytest.fixture
+def server(index):
+    with LookupServer(index, port=0) as server:
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        yield server
+        server.shutdown()
+        thread.join()
+
+
+def _request(server, method, path, body=None):
+    connection = http.client.HTTPConnection(*server.server_address[:2])
+    try:
+        connection.request(method, path, body=body)
+        response = connection.getresponse()
+        return response.status, response.getheader("Server-Timing"), json.loads(response.read())
+    finally:
+        connection.close()
+
+
+def test_index_links_drugs_targets_and_genes(index):
+    drug = index.drug("DB00001")
+    target = index.target("P22888")
+    gene = index.gene("F2")
+
+    assert drug["drug"]["drug_name"] == "Lepirudin"
+    assert [row["target_id"] for row in drug["targets"]] == ["P00734"]
+    assert [row["drug_id"] for row in target["drugs"]] == ["DB00014"]
+    assert [row["target_id"] for row in index.drug("DB00014")["targets"]] == ["P22888", "P30968"]
+    assert [row["target_id"] for row in gene["targets"]] == ["P00734"]
+    assert [row["drug_id"] for row in gene["drugs"]] == ["DB00001"]
+    assert index.drug("DB99999") is None
+    assert index.summary() == {"drugs": 2, "targets": 3, "genes": 3}
+
+
+def test_index_from_csv_tables_matches_parsed_tables(index, project_root):
+    from_csv = LookupIndex.from_csv_dir(project_root / "dev" / "fixtures" / "expected" / "core")
+
+    for drug_id in ("DB00001", "DB00014"):
+        assert from_csv.drug(drug_id) == index.drug(drug_id)
+    assert from_csv.gene("LHCGR") == index.gene("LHCGR")
+
+
+def test_index_needs_the_core_tables(root_fixture_xml):
+    result = parse_drugbank_xml(root_fixture_xml, modules=["interactions"])
+
+    with pytest.raises(KeyError, match="missing: drugs, targets, drug_target"):
+        LookupIndex.from_result(result)
+
+
+def test_batched_query_maps_every_key(index):
+    result = index.query({"drugs": ["DB00014", "DB99999"], "genes": ["LHCGR"]})
+
+    assert result["drugs"]["DB00014"] == index.drug("DB00014")
+    assert result["drugs"]["DB99999"] is None
+    assert result["genes"]["LHCGR"] == index.gene("LHCGR")
+    with pytest.raises(ValueError, match="Unknown query fields: proteins"):
+        index.query({"proteins": ["P00734"]})
+    with pytest.raises(ValueError, match="drugs must be a list of strings"):
+        index.query({"drugs": "DB00001"})
+
+
+def test_server_answers_lookups_with_timing(server, index):
+    status, timing, body = _request(server, "GET", "/targets/P00734")
+
+    assert status == 200
+    assert timing.startswith("app;dur=")
+    assert body == index.target("P00734")
+    assert _request(server, "GET", "/drugs/DB99999")[0] == 404
+    assert _request(server, "GET", "/proteins/P00734")[0] == 404
+
+
+def test_server_answers_batched_queries(server, index):
+    query = json.dumps({"drugs": ["DB00001"], "targets": ["P22888", "P00000"]})
+
+    status, _, body = _request(server, "POST", "/query", query)
+
+    assert status == 200
+    assert body == {
+        "drugs": {"DB00001": index.drug("DB00001")},
+        "targets": {"P22888": index.target("P22888"), "P00000": None},
+    }
+    assert _request(server, "POST", "/query", "{not json")[0] == 400
+
+
+@pytest.mark.parametrize("length", ["many", "-1"])
+def test_server_rejects_invalid_content_length(server, length):
+    connection = http.client.HTTPConnection(*server.server_address[:2], timeout=5)
+    try:
+        connection.putrequest("POST", "/query")
+        connection.putheader("Content-Length", length)
+        connection.endheaders(b"{}")
+        response = connection.getresponse()
+
+        assert response.status == 400
+        assert json.loads(response.read()) == {"error": "Invalid Content-Length"}
+        assert response.getheader("Connection") == "close"
+    finally:
+        connection.close()
+    assert _request(server, "GET", "/drugs/DB00001")[0] == 200
+
+
+def test_server_reports_latency_metrics(server):
+    for _ in range(3):
+        _request(server, "GET", "/drugs/DB00001")
+    _request(server, "GET", "/genes/NOPE")
+    _request(server, "POST", "/query", json.dumps({"genes": ["F2", "LHCGR", "F2"]}))
+
+    _, _, metrics = _request(server, "GET", "/metrics")
+
+    assert metrics["index"] == {"drugs": 2, "targets": 3, "genes": 3}
+    assert metrics["endpoints"]["drugs"]["requests"] == 3
+    assert metrics["endpoints"]["genes"]["errors"] == 1
+    assert metrics["endpoints"]["query"]["keys"] == 3
+    assert 0 < metrics["endpoints"]["drugs"]["p50_us"] <= metrics["endpoints"]["drugs"]["max_us"]
+
+
+def test_cli_serve_loads_csv_tables(project_root):
+    command = [
+        sys.executable,
+        "-m",
+        "drugbank_parse.cli",
+        "serve",
+        "--tables",
+        str(project_root / "dev" / "fixtures" / "expected" / "core"),
+        "--port",
+        "0",
+    ]
+    process = subprocess.Popen(command, stderr=subprocess.PIPE, text=True, cwd=project_root / "dev" / "python")
+    try:
+        banner = process.stderr.readline()
+        assert banner.startswith("Serving 2 drugs, 3 targets and 3 genes on http://127.0.0.1:")
+        port = int(banner.rsplit(":", 1)[1])
+        connection = http.client.HTTPConnection("127.0.0.1", port)
+        connection.request("GET", "/drugs/DB00014")
+        assert json.loads(connection.getresponse().read())["drug"]["drug_name"] == "Goserelin"
+        connection.close()
+    finally:
+        process.terminate()
+        process.wait()
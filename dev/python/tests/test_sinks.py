@@ -0,0 +1,92 @@
+import pytest
+
+from drugbank_parse.models import ParseResult
+from drugbank_parse.schema import load_schema
+from drugbank_parse.sinks import DeduplicatingSink, JoiningSink, joined_tables, stored_tables
+
+
+def test_deduplicating_sink_keeps_first_target_occurrence():
+    result = ParseResult()
+    sink = DeduplicatingSink(result)
+    sink.open(["targets", "drug_target"])
+
+    sink.add_row("targets", {"target_id": "P00734", "target_name": "first"})
+    sink.add_row("targets", {"target_id": "P00734", "target_name": "second"})
+    sink.add_row("drug_target", {"drug_id": "DB00001", "target_id": "P00734"})
+    sink.add_row("drug_target", {"drug_id": "DB00001", "target_id": "P00734"})
+    sink.close()
+
+    assert result.rows("targets") == [{"target_id": "P00734", "target_name": "first"}]
+    assert len(result.rows("drug_target")) == 2
+
+
+def test_joining_sink_emits_joined_rows_as_base_rows_arrive():
+    tables = ["drugs", "targets", "drug_target", "drug_indication", "target_drug_indication"]
+    result = ParseResult()
+    sink = JoiningSink(result, joined_tables(tables, load_schema()))
+    sink.open(tables)
+
+    sink.add_row("drugs", {"drug_id": "DB1", "drug_name": "One", "inchi": "I", "source": "DrugBank"})
+    sink.add_row("drug_indication", {"drug_id": "DB1", "indication": "Pain", "source": "DrugBank"})
+    sink.add_row("targets", {"target_id": "P1", "gene_name": "G1", "source": "DrugBank"})
+    sink.add_row("drug_target", {"drug_id": "DB1", "target_id": "P1", "source": "DrugBank"})
+    sink.add_row("drug_target", {"drug_id": "DB1", "target_id": "P2", "source": "DrugBank"})
+    sink.close()
+
+    assert result.rows("target_drug_indication") == [
+        {
+            "target_id": "P1",
+            "gene_name": "G1",
+            "drug_id": "DB1",
+            "drug_name": "One",
+            "inchi": "I",
+            "indication": "Pain",
+            "source": "DrugBank",
+        },
+        {
+            "target_id": "P2",
+            "gene_name": "",
+            "drug_id": "DB1",
+            "drug_name": "One",
+            "inchi": "I",
+            "indication": "Pain",
+            "source": "DrugBank",
+        },
+    ]
+
+
+def test_joining_sink_forgets_drug_rows_once_the_next_drug_starts():
+    tables = ["drugs", "targets", "drug_target", "drug_indication", "target_drug_indication"]
+    result = ParseResult()
+    sink = JoiningSink(result, joined_tables(tables, load_schema()))
+    sink.open(tables)
+    join, maps, _ = sink.joins[0]
+    lookups = [lookup for lookup, _, _ in join.lookups]
+
+    for number in range(100):
+        drug_id = f"DB{number}"
+        sink.add_row("drugs", {"drug_id": drug_id, "drug_name": f"Drug {number}", "source": "DrugBank"})
+        sink.add_row("drug_indication", {"drug_id": drug_id, "indication": f"Use {number}", "source": "DrugBank"})
+        sink.add_row("targets", {"target_id": f"P{number % 10}", "gene_name": f"G{number % 10}", "source": "DrugBank"})
+        sink.add_row("drug_target", {"drug_id": drug_id, "target_id": f"P{number % 10}", "source": "DrugBank"})
+        sink.add_row("targets", {"target_id": f"Q{number % 5}", "gene_name": f"H{number % 5}", "source": "DrugBank"})
+        sink.add_row("drug_target", {"drug_id": drug_id, "target_id": f"Q{number % 5}", "source": "DrugBank"})
+        assert len(maps[lookups.index("drugs")]) == 1
+        assert len(maps[lookups.index("drug_indication")]) == 1
+    sink.close()
+
+    assert len(maps[lookups.index("targets")]) == 15
+    rows = result.rows("target_drug_indication")
+    assert [row["drug_name"] for row in rows] == [f"Drug {number // 2}" for number in range(200)]
+    assert [row["indication"] for row in rows] == [f"Use {number // 2}" for number in range(200)]
+
+
+def test_stored_tables_skip_joined_tables_and_order_bases_last():
+    tables = ["drugs", "targets", "drug_target", "drug_indication", "target_drug_indication"]
+
+    assert stored_tables(tables, load_schema()) == ["drugs", "targets", "drug_indication", "drug_target"]
+
+
+def test_joined_tables_require_their_source_tables():
+    with pytest.raises(ValueError, match="drug_indication"):
+        joined_tables(["drugs", "targets", "drug_target", "target_drug_indication"], load_schema())
@@ -0,0 +1,52 @@
+import pytest
+
+from drugbank_parse import ParseStats, parse_drugbank_xml, stream_drugbank_xml, write_drugbank_tables
+from drugbank_parse.models import ParseResult
+
+
+def test_parse_stats_merges_timers_and_counters():
+    first = ParseStats()
+    first.add_time("tokenize", 0.5)
+    first.count("drugs", 2)
+    second = ParseStats()
+    second.add_time("tokenize", 0.25)
+    second.count("drugs")
+    second.count("targets", 3)
+
+    first.merge(second)
+
+    assert first.as_dict() == {
+        "timers": {"tokenize": 0.75},
+        "counters": {"drugs": 3, "targets": 3},
+    }
+
+
+def test_parse_stats_times_a_block():
+    stats = ParseStats()
+    with stats.time("write.drugs"):
+        pass
+
+    assert stats.timers["write.drugs"] >= 0
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_parse_records_stage_timings_and_counters(root_fixture_xml, tmp_path, workers):
+    stats = ParseStats()
+    result = parse_drugbank_xml(root_fixture_xml, workers=workers, stats=stats)
+    write_drugbank_tables(result, tmp_path, stats=stats)
+
+    assert stats.counters["bytes"] == root_fixture_xml.stat().st_size
+    assert stats.counters["drugs"] - stats.counters.get("drugs_skipped", 0) == 2
+    assert stats.counters["targets"] == 3
+    assert stats.counters["rows.drug_target"] == 3
+    for stage in ("tokenize", "extract.drug", "module.core", "write.drugs", "write.target_drug_indication"):
+        assert stage in stats.timers
+
+
+def test_stream_counts_bytes_read_from_file_objects(root_fixture_xml):
+    stats = ParseStats()
+    with root_fixture_xml.open("rb") as handle:
+        stream_drugbank_xml(handle, ParseResult(), stats=stats)
+
+    assert stats.counters["bytes"] == root_fixture_xml.stat().st_size
+    assert stats.counters["rows.drugs"] == 2